@@ -3,5 +3,7 @@ from apps.accounts.models import TeacherProfile, StudentProfile
 # Register your models here.
 
 
-admin.site.register(TeacherProfile)
-admin.site.register(StudentProfile)
\ No newline at end of file
+@admin.register(TeacherProfile, StudentProfile)
+class ProfileAdmin(admin.ModelAdmin):
+    # __str__ reads user.username.
+    list_select_related = ('user',)
\ No newline at end of file
@@ -0,0 +1,175 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import StudentProfile, TeacherProfile
+from .user_cache import user_cache
+
+ROLE_CLAIM = 'role'
+PROFILE_ID_CLAIM = 'profile_id'
+
+# The User columns kept in the auth cache: what the request path reads. The password hash is not
+# among them; only its digest is kept, for the CHECK_REVOKE_TOKEN comparison.
+CACHED_USER_FIELDS = ('id', 'username', 'first_name', 'last_name', 'email', 'is_active', 'is_staff', 'is_superuser')
+
+ROLE_TEACHER = 'teacher'
+ROLE_STUDENT = 'student'
+
+# role -> (profile model, reverse one-to-one accessor on User)
+ROLE_PROFILES = {
+    ROLE_TEACHER: (TeacherProfile, 'teacherprofile'),
+    ROLE_STUDENT: (StudentProfile, 'studentprofile'),
+}
+
+
+def role_claims(user):
+    """
+    The custom claims embedded in tokens issued for ``user``: its role and profile id, plus the
+    username and staff flag, for clients. Authentication only uses them as a hint (see
+    RoleClaimsJWTAuthentication); permissions come from the current user.
+    """
+    claims = {
+        ROLE_CLAIM: None,
+        PROFILE_ID_CLAIM: None,
+        'username': user.get_username(),
+        'is_staff': user.is_staff,
+    }
+    for role, (model, accessor) in ROLE_PROFILES.items():
+        profile_id = model.objects.filter(user=user).values_list('id', flat=True).first()
+        if profile_id is not None:
+            claims[ROLE_CLAIM] = role
+            claims[PROFILE_ID_CLAIM] = profile_id
+            break
+    return claims
+
+
+def _cache_profiles(user, role=None, profile=None):
+    # Prime both reverse one-to-one caches so hasattr(user, 'teacherprofile') and friends are
+    # answered from memory: the user's own profile, and None (-> DoesNotExist) for the other one.
+    for role_name, (model, accessor) in ROLE_PROFILES.items():
+        value = profile if role_name == role else None
+        getattr(User, accessor).related.set_cached_value(user, value)
+        if value is not None:
+            model.user.field.set_cached_value(value, user)
+
+
+def _user_entry(user):
+    # A plain-data snapshot of a user and its profile: safe to share between threads and to
+    # pickle into the shared cache, and rebuilt into fresh instances on every request. Columns
+    # outside CACHED_USER_FIELDS are left deferred on the rebuilt user.
+    entry = {
+        'user': {name: getattr(user, name) for name in CACHED_USER_FIELDS},
+        'password_digest': get_md5_hash_password(user.password),
+        'role': None,
+        'profile': None,
+    }
+    for role, (model, accessor) in ROLE_PROFILES.items():
+        profile = getattr(user, accessor, None)
+        if profile is not None:
+            entry['role'] = role
+            entry['profile'] = {field.attname: getattr(profile, field.attname) for field in model._meta.concrete_fields}
+            break
+    return entry
+
+
+def _user_from_entry(entry):
+    user = User.from_db(None, list(entry['user']), list(entry['user'].values()))
+    role, profile = entry['role'], None
+    if role is not None:
+        model, accessor = ROLE_PROFILES[role]
+        profile = model.from_db(None, list(entry['profile']), list(entry['profile'].values()))
+    _cache_profiles(user, role, profile)
+    user.role = role
+    user.profile_id = profile.id if profile is not None else None
+    return user
+
+
+class CachingJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves users through ``user_cache`` (a per-process TTL LRU with an
+    optional shared tier) instead of querying ``auth_user`` on every request.
+
+    A miss loads the user and both profiles in one query. The returned user has its profile
+    cached (``request.user.teacherprofile``/``studentprofile`` run no query) and carries
+    ``role`` and ``profile_id`` attributes. Entries are invalidated by the accounts signals
+    whenever a user or profile is saved or deleted.
+    """
+
+    def get_user(self, validated_token):
+        return _user_from_entry(self.get_user_entry(validated_token))
+
+    def get_user_entry(self, validated_token):
+        """The token user's cache entry, loading it on a miss, once check_user_entry() has passed."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        entry = user_cache.get(user_id)
+        if entry is None:
+            entry = self.load_user_entry(user_id)
+            user_cache.set(user_id, entry)
+        self.check_user_entry(entry, validated_token)
+        return entry
+
+    @staticmethod
+    def check_user_entry(entry, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not entry['user']['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry['password_digest']:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+    def load_user_entry(self, user_id):
+        accessors = [accessor for model, accessor in ROLE_PROFILES.values()]
+        try:
+            user = User.objects.select_related(*accessors).get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return _user_entry(user)
+
+
+class RoleClaimsJWTAuthentication(CachingJWTAuthentication):
+    """
+    CachingJWTAuthentication for tokens carrying ``role``/``profile_id`` claims, which async views
+    can resolve without leaving the event loop.
+
+    The claims are only a hint. The user, its staff flag and its profile always come from the
+    ``user_cache`` entry, so a demotion, a deactivation, a password change (with
+    CHECK_REVOKE_TOKEN) or a deleted profile applies at once in the process that made it and
+    within AUTH_USER_CACHE_TTL in the others, not at the token's expiry. With a warm cache
+    ``user.teacherprofile``/``user.studentprofile`` are already cached, so IsTeacher/IsStudent and
+    the views that follow run no queries of their own. The role and profile id are available as
+    ``request.user.role`` and ``request.user.profile_id``.
+    """
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views: tokens with role claims whose user is in this process'
+        cache tier are resolved without leaving the event loop; anything else runs in a worker thread.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if self.has_role_claims(validated_token):
+            entry = user_cache.local.get(validated_token[api_settings.USER_ID_CLAIM])
+            if entry is not None:
+                self.check_user_entry(entry, validated_token)
+                return _user_from_entry(entry), validated_token
+        return await sync_to_async(self.get_user)(validated_token), validated_token
+
+    @staticmethod
+    def has_role_claims(validated_token):
+        return (
+            validated_token.get(ROLE_CLAIM) in ROLE_PROFILES
+            and validated_token.get(PROFILE_ID_CLAIM) is not None
+        )
@@ -1,5 +1,9 @@
 from dj_rest_auth.registration.serializers import RegisterSerializer
+from django.contrib.auth.models import User
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from utils.fieldsets import DynamicFieldsMixin
+from .authentication import role_claims
 from .models import TeacherProfile, StudentProfile
 
 class CustomRegisterSerializer(RegisterSerializer):
@@ -14,21 +18,45 @@ class CustomRegisterSerializer(RegisterSerializer):
         data['last_name'] = self.validated_data.get('last_name', '')
         data['is_teacher'] = self.validated_data.get('is_teacher', False)
         return data
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Issues token pairs carrying the user's role and profile id (see RoleClaimsJWTAuthentication).
+    The claims are copied into access tokens derived from the refresh token.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim, value in role_claims(user).items():
+            token[claim] = value
+        return token
     
     
-class TeacherProfileSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Public identity only; what `?expand=user` shows for a profile.
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name']
+        read_only_fields = fields
+
+
+class TeacherProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TeacherProfile
         fields = ['id', 'user', 'employee_id', 'bio', 'active']
         read_only_fields = ['id', 'user','active']
+        expandable_fields = {'user': UserSerializer}
         
 
 
-class StudentProfileSerializer(serializers.ModelSerializer):
+class StudentProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = StudentProfile
         fields = ['id', 'user', 'student_id', 'active']
         read_only_fields = ['id', 'user','active']
+        expandable_fields = {'user': UserSerializer}
         
         
         
\ No newline at end of file
@@ -1,6 +1,10 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from allauth.account.signals import user_signed_up
 from .models import TeacherProfile, StudentProfile
+from .user_cache import user_cache
 
 @receiver(user_signed_up)
 def create_user_profile(sender, request, user, **kwargs):
@@ -8,4 +12,17 @@ def create_user_profile(sender, request, user, **kwargs):
     if is_teacher:
         TeacherProfile.objects.create(user=user)
     else:
-        StudentProfile.objects.create(user=user)
\ No newline at end of file
+        StudentProfile.objects.create(user=user)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=TeacherProfile)
+@receiver(post_delete, sender=TeacherProfile)
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def invalidate_auth_user_cache(sender, instance, **kwargs):
+    user_id = instance.pk if sender is User else instance.user_id
+    user_cache.invalidate(user_id)
+    # A concurrent request may re-cache the old row before this transaction commits.
+    transaction.on_commit(lambda: user_cache.invalidate(user_id))
@@ -1,8 +1,17 @@
-from rest_framework.test import APITestCase
+from asgiref.sync import async_to_sync
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory, APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
 from django.urls import reverse
+from django.test import override_settings
 from django.contrib.auth.models import User
+from apps.accounts.authentication import RoleClaimsJWTAuthentication
 from apps.accounts.models import StudentProfile, TeacherProfile
+from apps.accounts.user_cache import user_cache
+from apps.courses.models import Course
+from utils.lru import TTLLRUCache
 
 
 class AuthTests(APITestCase):
@@ -68,4 +77,212 @@ class ProfileViewTests(APITestCase):
 
     def test_unauthenticated_access_fails(self):
         response = self.client.get(self.student_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class ProfileListPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='pass123')
+        for i in range(5):
+            StudentProfile.objects.create(
+                user=User.objects.create_user(username=f'student{i}', password='pass123'),
+                student_id=f'S{i:03}',
+            )
+
+    def test_student_list_cursor_pagination(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('student-list'), {'pagination': 'cursor', 'page_size': 2})
+        ids = [p['student_id'] for p in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            ids.extend(p['student_id'] for p in response.data['results'])
+        self.assertEqual(ids, [f'S{i:03}' for i in range(5)])
+
+    def test_page_size_is_capped(self):
+        self.client.force_authenticate(user=self.user)
+        with override_settings(MAX_PAGE_SIZE=2):
+            response = self.client.get(reverse('student-list'), {'page_size': 1000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+
+class RoleClaimsAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        self.teacher_profile = TeacherProfile.objects.create(user=self.teacher_user, employee_id='T001')
+        self.student_user = User.objects.create_user(username='student1', password='pass123')
+        self.student_profile = StudentProfile.objects.create(user=self.student_user, student_id='S001')
+
+    def login(self, username):
+        response = self.client.post(reverse('rest_login'), {'username': username, 'password': 'pass123'})
+        token = response.data['access']
+        # As after the user's first request: the budgets assume a warm auth user cache.
+        RoleClaimsJWTAuthentication().get_user_entry(AccessToken(token))
+        return token
+
+    def test_login_token_carries_role_claims(self):
+        token = AccessToken(self.login('teacher1'))
+        self.assertEqual(token['role'], 'teacher')
+        self.assertEqual(token['profile_id'], self.teacher_profile.id)
+        self.assertEqual(token['username'], 'teacher1')
+
+    def test_teacher_request_skips_user_and_profile_queries(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('teacher1')}")
+        # Only the view's own SELECT on teacher profiles remains.
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('teacher-profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['employee_id'], 'T001')
+
+    def test_wrong_role_is_rejected_without_queries(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('student1')}")
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('create-course'), {'title': 'x', 'description': 'y'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_inactive_or_deleted_user_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('teacher1')}")
+        self.assertEqual(self.client.get(reverse('teacher-profile')).status_code, status.HTTP_200_OK)
+
+        self.teacher_user.is_active = False
+        self.teacher_user.save()
+        response = self.client.get(reverse('teacher-profile'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['code'], 'user_inactive')
+
+        self.teacher_user.delete()
+        response = self.client.get(reverse('teacher-profile'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['code'], 'user_not_found')
+
+    def test_demoted_staff_loses_staff_access(self):
+        self.teacher_user.is_staff = True
+        self.teacher_user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('teacher1')}")
+        self.assertEqual(self.client.get(reverse('auth-cache-stats')).status_code, status.HTTP_200_OK)
+
+        self.teacher_user.is_staff = False
+        self.teacher_user.save()
+        self.assertEqual(self.client.get(reverse('auth-cache-stats')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deleted_profile_loses_its_role(self):
+        course = Course.objects.create(title='Lab', description='.', teacher=self.teacher_profile)
+        url = reverse('teacher-all-assignments', args=[course.id])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('teacher1')}")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.teacher_profile.delete()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_changed_profile_is_used(self):
+        token = self.login('student1')
+        self.student_profile.delete()
+        TeacherProfile.objects.create(user=self.student_user, employee_id='T002')
+        RoleClaimsJWTAuthentication().get_user_entry(AccessToken(token))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(self.client.get(reverse('student-dashboard')).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse('teacher-profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['employee_id'], 'T002')
+
+    def test_changing_the_password_revokes_tokens(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('student1')}")
+        self.assertEqual(self.client.get(reverse('student-profile')).status_code, status.HTTP_200_OK)
+
+        self.student_user.set_password('changed456')
+        self.student_user.save()
+        response = self.client.get(reverse('student-profile'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['code'], 'password_changed')
+
+    def test_async_authentication_checks_the_cached_user(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {self.login('student1')}")
+        authenticate = async_to_sync(RoleClaimsJWTAuthentication().aauthenticate)
+        with self.assertNumQueries(0):
+            user, token = authenticate(request)
+        self.assertEqual(user.profile_id, self.student_profile.id)
+
+        self.student_user.is_active = False
+        self.student_user.save()
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(request)
+
+    def test_claims_profile_is_usable_by_views(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('teacher1')}")
+        response = self.client.post(reverse('create-course'), {'title': 'Claims', 'description': 'y'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.teacher_profile.courses.get().title, 'Claims')
+
+    def test_token_without_claims_falls_back_to_database(self):
+        token = AccessToken.for_user(self.student_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # User and both profiles in one query, then the view's profile lookup.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('student-profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['student_id'], 'S001')
+
+
+class AuthUserCacheTests(APITestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username='student1', password='pass123')
+        StudentProfile.objects.create(user=self.user, student_id='S001')
+        # A token without role claims always goes through the user cache.
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_second_request_is_served_from_cache(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('student-profile'))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('student-profile'))
+        self.assertEqual(response.data['student_id'], 'S001')
+        stats = user_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_saving_user_or_profile_invalidates_entry(self):
+        self.client.get(reverse('student-profile'))
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('student-profile'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = True
+        self.user.save()
+        self.client.get(reverse('student-profile'))
+        self.user.studentprofile.delete()
+        response = self.client.get(reverse('student-profile'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_entry_keeps_a_password_digest_not_the_hash(self):
+        self.client.get(reverse('student-profile'))
+        entry = user_cache.get(self.user.id)
+        self.assertNotIn('password', entry['user'])
+        self.assertNotIn(self.user.password, repr(entry))
+        self.assertEqual(entry['password_digest'], get_md5_hash_password(self.user.password))
+
+    def test_lru_evicts_oldest_and_expires_after_ttl(self):
+        now = [0]
+        lru = TTLLRUCache(maxsize=2, ttl=10, clock=lambda: now[0])
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        now[0] = 11
+        self.assertIsNone(lru.get('c'))
+        self.assertEqual(lru.stats()['evictions'], 1)
+
+    def test_stats_endpoint_is_staff_only(self):
+        response = self.client.get(reverse('auth-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('auth-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_ratio', response.data)
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from utils.lru import TTLLRUCache
+
+SHARED_KEY_PREFIX = 'accounts:auth-user:'
+
+
+class AuthUserCache:
+    """
+    Two-tier cache of resolved users for authentication, keyed by user id.
+
+    The first tier is a per-process TTL LRU. When ``shared`` is on, misses fall through to the
+    Django cache (Redis in production), so a user resolved by one worker is a cache hit in the
+    others. Signals invalidate both tiers in the process that made the change; other processes'
+    local tiers converge within ``ttl`` seconds.
+    """
+
+    def __init__(self, maxsize, ttl, shared=False):
+        self.local = TTLLRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared = shared
+        self.shared_hits = self.shared_misses = 0
+
+    @staticmethod
+    def shared_key(user_id):
+        return f'{SHARED_KEY_PREFIX}{user_id}'
+
+    def get(self, user_id):
+        entry = self.local.get(user_id)
+        if entry is not None or not self.shared:
+            return entry
+
+        entry = cache.get(self.shared_key(user_id))
+        if entry is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        self.local.set(user_id, entry)
+        return entry
+
+    def set(self, user_id, entry):
+        self.local.set(user_id, entry)
+        if self.shared:
+            cache.set(self.shared_key(user_id), entry, self.local.ttl)
+
+    def invalidate(self, user_id):
+        self.local.delete(user_id)
+        if self.shared:
+            cache.delete(self.shared_key(user_id))
+
+    def clear(self):
+        self.local.clear()
+        self.shared_hits = self.shared_misses = 0
+
+    def stats(self):
+        return {
+            **self.local.stats(),
+            'shared': self.shared,
+            'shared_hits': self.shared_hits,
+            'shared_misses': self.shared_misses,
+        }
+
+
+user_cache = AuthUserCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+    shared=getattr(settings, 'AUTH_USER_CACHE_SHARED', False),
+)
@@ -1,12 +1,17 @@
 from django.shortcuts import get_object_or_404
 from rest_framework import generics
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from .models import TeacherProfile, StudentProfile
 from .serializers import TeacherProfileSerializer, StudentProfileSerializer
+from .user_cache import user_cache
 from utils.decorators import skip_if_swagger
+from utils.fieldsets import FIELDSET_PARAMETERS
+from utils.rows import ValuesListMixin
 
 
 class UpdateTeacherProfileView(generics.UpdateAPIView):
@@ -25,13 +30,15 @@ class UpdateTeacherProfileView(generics.UpdateAPIView):
         return get_object_or_404(TeacherProfile, user=self.request.user)
 
 
-class TeacherProfileListView(generics.ListAPIView):
-    queryset = TeacherProfile.objects.filter(active=True)
+class TeacherProfileListView(ValuesListMixin, generics.ListAPIView):
+    queryset = TeacherProfile.objects.filter(active=True).order_by('id')
     serializer_class = TeacherProfileSerializer
+    keyset_ordering = ('id',)
 
     @swagger_auto_schema(
         operation_summary="List active teacher profiles",
-        operation_description="Returns a list of all active teachers in the system."
+        operation_description="Returns a list of all active teachers in the system.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -69,13 +76,15 @@ class UpdateStudentProfileView(generics.UpdateAPIView):
         return get_object_or_404(StudentProfile, user=self.request.user)
 
 
-class StudentProfileListView(generics.ListAPIView):
-    queryset = StudentProfile.objects.filter(active=True)
+class StudentProfileListView(ValuesListMixin, generics.ListAPIView):
+    queryset = StudentProfile.objects.filter(active=True).order_by('id')
     serializer_class = StudentProfileSerializer
+    keyset_ordering = ('id',)
 
     @swagger_auto_schema(
         operation_summary="List active student profiles",
-        operation_description="Returns a list of all active students in the system."
+        operation_description="Returns a list of all active students in the system.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -94,4 +103,15 @@ class StudentProfileDetailView(generics.RetrieveAPIView):
 
     @skip_if_swagger(default_return=StudentProfile())
     def get_object(self):
-        return get_object_or_404(StudentProfile, user=self.request.user)
\ No newline at end of file
+        return get_object_or_404(StudentProfile, user=self.request.user)
+
+
+class AuthUserCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Authentication user cache statistics",
+        operation_description="Staff only. Hit/miss/eviction counters of the serving worker's authentication user cache."
+    )
+    def get(self, request):
+        return Response(user_cache.stats())
@@ -4,4 +4,9 @@ from .models import Assignment, Submission
 
 
 admin.site.register(Assignment)
-admin.site.register(Submission)
\ No newline at end of file
+
+
+@admin.register(Submission)
+class SubmissionAdmin(admin.ModelAdmin):
+    # __str__ reads assignment.title and student.user.username.
+    list_select_related = ('assignment', 'student__user')
\ No newline at end of file
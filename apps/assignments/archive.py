@@ -0,0 +1,34 @@
+import posixpath
+
+from django.utils import timezone
+
+from utils.storage import open_stream
+from utils.zipstream import ZipEntry
+
+ARCHIVE_CHUNK_SIZE = 500
+
+
+def submission_file_entries(submissions, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    One ZipEntry per submitted file in ``submissions``, named ``<username>/<file name>`` (the
+    uploaded name for chunked uploads, whose stored name is a digest) and in username order. Rows are read with a server-side iterator and files are only opened when
+    their member is written, and read as a stream (see open_stream()), so nothing is held beyond
+    the current read. Files missing from storage are left out.
+    """
+    rows = (
+        submissions.order_by('student__user__username')
+        .values_list('student__user__username', 'file', 'file_name', 'submitted_at')
+        .iterator(chunk_size=chunk_size)
+    )
+    storage = submissions.model._meta.get_field('file').storage
+    for username, name, file_name, submitted_at in rows:
+        try:
+            size = storage.size(name)
+        except FileNotFoundError:
+            continue
+        yield ZipEntry(
+            name=f'{username}/{file_name or posixpath.basename(name)}',
+            size=size,
+            date_time=timezone.localtime(submitted_at).timetuple()[:6],
+            open=lambda name=name: open_stream(storage, name),
+        )
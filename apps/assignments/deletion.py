@@ -0,0 +1,121 @@
+from django.db import transaction
+from django.utils import timezone
+
+from apps.courses.cache import bump_catalog_version
+from apps.courses.models import Course
+from apps.jobs.queue import enqueue, report_progress
+from .models import Assignment, Submission
+
+PURGE_BATCH_SIZE = 1000
+
+
+def delete_course(course, user):
+    """
+    Soft-delete ``course`` and its assignments, which hides them (and their submissions) at once,
+    and queue the purge of their rows and files. Returns the purge Job, which ``user`` can follow.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        Course.all_objects.filter(pk=course.pk).update(deleted_at=now)
+        Assignment.all_objects.filter(course_id=course.pk, deleted_at__isnull=True).update(deleted_at=now)
+        # update() sends no post_save, which is what invalidates the cached catalog otherwise.
+        transaction.on_commit(bump_catalog_version)
+        return enqueue('assignments.purge_course', {'course_id': course.pk}, owner=user)
+
+
+def delete_assignment(assignment, user):
+    """Soft-delete ``assignment`` (see delete_course()) and queue its purge. Returns the Job."""
+    with transaction.atomic():
+        Assignment.all_objects.filter(pk=assignment.pk).update(deleted_at=timezone.now())
+        return enqueue('assignments.purge_assignment', {'assignment_id': assignment.pk}, owner=user)
+
+
+def _delete_files(storage, rows):
+    # Once the batch commits. Files that came through apps.uploads belong to a shared blob, which
+    # purge_uploads removes once nothing refers to it any more.
+    names = [name for _, name, blob_id in rows if name and blob_id is None]
+
+    def delete():
+        for name in names:
+            storage.delete(name)
+    transaction.on_commit(delete)
+    return len(names)
+
+
+def _purge_batches(queryset, file_field, batch_size):
+    """
+    Delete the rows of ``queryset`` (from an unfiltered manager) ``batch_size`` at a time, each
+    batch in a short transaction of its own with a raw DELETE: no cascade collection or signals,
+    since the purge already deletes the dependent rows first. Yields the number of rows and of
+    files deleted per batch.
+    """
+    model = queryset.model
+    storage = model._meta.get_field(file_field).storage
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.order_by('pk').values_list('pk', file_field, 'blob_id')[:batch_size])
+            if not rows:
+                return
+            model.all_objects.filter(pk__in=[row[0] for row in rows])._raw_delete(model.all_objects.db)
+            files = _delete_files(storage, rows)
+        yield len(rows), files
+
+
+def _purge_assignments(assignments, progress, batch_size):
+    for assignment_id in assignments.order_by('pk').values_list('pk', flat=True):
+        submissions = Submission.all_objects.filter(assignment_id=assignment_id)
+        for rows, files in _purge_batches(submissions, 'file', batch_size):
+            progress['submissions_deleted'] += rows
+            progress['files_deleted'] += files
+            report_progress(**progress)
+    for rows, files in _purge_batches(assignments, 'files', batch_size):
+        progress['assignments_deleted'] += rows
+        progress['files_deleted'] += files
+        report_progress(**progress)
+
+
+def _start_progress(assignments):
+    return {
+        'assignments_total': assignments.count(),
+        'assignments_deleted': 0,
+        'submissions_total': Submission.all_objects.filter(assignment__in=assignments).count(),
+        'submissions_deleted': 0,
+        'files_deleted': 0,
+    }
+
+
+def purge_assignment(assignment_id, batch_size=None):
+    """Delete a soft-deleted assignment's submissions, then the assignment, with their files."""
+    batch_size = batch_size or PURGE_BATCH_SIZE
+    assignments = Assignment.all_objects.filter(pk=assignment_id, deleted_at__isnull=False)
+    progress = _start_progress(assignments)
+    _purge_assignments(assignments, progress, batch_size)
+    return progress
+
+
+def purge_course(course_id, batch_size=None):
+    """
+    Delete a soft-deleted course's submissions, assignments and enrollments in batches, then the
+    course. Safe to run again after an interruption: it carries on with what is left.
+    """
+    if not Course.all_objects.filter(pk=course_id, deleted_at__isnull=False).exists():
+        return None
+    batch_size = batch_size or PURGE_BATCH_SIZE
+    assignments = Assignment.all_objects.filter(course_id=course_id)
+    progress = _start_progress(assignments)
+    _purge_assignments(assignments, progress, batch_size)
+
+    enrollments = Course.students.through.objects.filter(course_id=course_id)
+    progress['enrollments_deleted'] = 0
+    while True:
+        with transaction.atomic():
+            ids = list(enrollments.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            enrollments.model.objects.filter(pk__in=ids)._raw_delete(enrollments.db)
+        progress['enrollments_deleted'] += len(ids)
+        report_progress(**progress)
+
+    Course.all_objects.filter(pk=course_id)._raw_delete(Course.all_objects.db)
+    report_progress(**progress, course_deleted=True)
+    return progress
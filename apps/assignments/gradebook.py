@@ -0,0 +1,118 @@
+import csv
+import json
+
+from rest_framework.fields import DateTimeField
+
+from .models import Assignment, Submission
+
+GRADEBOOK_CHUNK_SIZE = 2000
+
+_datetime_field = DateTimeField()
+
+
+def _format_datetime(value):
+    return _datetime_field.to_representation(value) if value else None
+
+
+def gradebook_assignments(course):
+    return list(
+        Assignment.objects.filter(course=course)
+        .order_by('due_date', 'id')
+        .values('id', 'title', 'due_date')
+    )
+
+
+def iter_gradebook_rows(course, assignments, chunk_size=GRADEBOOK_CHUNK_SIZE):
+    """
+    Yield one row per enrolled student: ``(student, cells)`` where cells maps assignment id to
+    ``{grade, reviewed, submitted_at, late}``. Students and submissions are both walked in
+    student order with server-side iterators and merged, so memory stays flat regardless of
+    course size. Assignments without a submission are left out of ``cells``, and so are
+    submissions to assignments not in ``assignments`` (created after the header was written).
+    """
+    due_dates = {assignment['id']: assignment['due_date'] for assignment in assignments}
+    students = (
+        course.students.order_by('id')
+        .values_list('id', 'user__username', 'student_id')
+        .iterator(chunk_size=chunk_size)
+    )
+    submissions = (
+        Submission.objects.filter(assignment_id__in=list(due_dates))
+        .order_by('student_id', 'assignment_id')
+        .values_list('student_id', 'assignment_id', 'grade', 'reviewed', 'submitted_at')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    pending = next(submissions, None)
+    for profile_id, username, student_number in students:
+        # Submissions from students who have since left the course have no row.
+        while pending is not None and pending[0] < profile_id:
+            pending = next(submissions, None)
+
+        cells = {}
+        while pending is not None and pending[0] == profile_id:
+            _, assignment_id, grade, reviewed, submitted_at = pending
+            cells[assignment_id] = {
+                'grade': grade,
+                'reviewed': reviewed,
+                'submitted_at': _format_datetime(submitted_at),
+                'late': submitted_at > due_dates[assignment_id],
+            }
+            pending = next(submissions, None)
+
+        student = {'id': profile_id, 'username': username, 'student_id': student_number}
+        yield student, cells
+
+
+def build_gradebook(course):
+    assignments = gradebook_assignments(course)
+    return {
+        'course': course.id,
+        'assignments': [_assignment_header(assignment) for assignment in assignments],
+        'students': [
+            {**student, 'cells': cells}
+            for student, cells in iter_gradebook_rows(course, assignments)
+        ],
+    }
+
+
+def _assignment_header(assignment):
+    return {
+        'id': assignment['id'],
+        'title': assignment['title'],
+        'due_date': _format_datetime(assignment['due_date']),
+    }
+
+
+class _Echo:
+    """File-like object whose write() just hands back the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+CELL_FIELDS = ('grade', 'reviewed', 'submitted_at', 'late')
+
+
+def stream_gradebook_csv(course):
+    assignments = gradebook_assignments(course)
+    writer = csv.writer(_Echo())
+
+    header = ['student', 'username', 'student_id']
+    for assignment in assignments:
+        header.extend(f"{assignment['title']} [{assignment['id']}] {field}" for field in CELL_FIELDS)
+    yield writer.writerow(header)
+
+    for student, cells in iter_gradebook_rows(course, assignments):
+        row = [student['id'], student['username'], student['student_id'] or '']
+        for assignment in assignments:
+            cell = cells.get(assignment['id'])
+            row.extend(('' if cell is None or cell[field] is None else cell[field]) for field in CELL_FIELDS)
+        yield writer.writerow(row)
+
+
+def stream_gradebook_ndjson(course):
+    assignments = gradebook_assignments(course)
+    yield json.dumps({'assignments': [_assignment_header(a) for a in assignments]}) + '\n'
+    for student, cells in iter_gradebook_rows(course, assignments):
+        yield json.dumps({**student, 'cells': cells}) + '\n'
@@ -0,0 +1,150 @@
+import json
+import random
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.models import StudentProfile, TeacherProfile
+from apps.assignments.models import Assignment, Submission
+from apps.assignments.views import pending_assignments_for
+from apps.courses.models import Course
+from utils.benchmark import summarize, time_call
+
+BENCH_PREFIX = 'bench-pending'
+
+
+def legacy_pending_assignments_for(student):
+    """
+    The pre-anti-join query, kept here so the benchmark can compare against it.
+    """
+    course_assignments = Assignment.objects.filter(course__students=student)
+    submitted_assignments = Submission.objects.filter(
+        student__user_id=student.user_id
+    ).values_list('assignment_id', flat=True)
+    return course_assignments.exclude(id__in=submitted_assignments)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large synthetic data set and report p50/p99 latency of the pending-assignment "
+        "query before (exclude + id list) and after (NOT EXISTS anti-join)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submissions', type=int, default=1_000_000)
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--courses', type=int, default=100)
+        parser.add_argument('--assignments-per-course', type=int, default=40)
+        parser.add_argument('--courses-per-student', type=int, default=8)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--runs', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--skip-seed', action='store_true', help="Reuse data from a previous run.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if not options['skip_seed']:
+            self.seed(rng, options)
+
+        students = list(
+            StudentProfile.objects.filter(user__username__startswith=BENCH_PREFIX).only('id', 'user_id')
+        )
+        if not students:
+            self.stderr.write("No benchmark students found; run without --skip-seed first.")
+            return
+
+        sample = [rng.choice(students) for _ in range(options['runs'])]
+        page_size = options['page_size']
+        report = {
+            'submissions': Submission.objects.filter(student__in=students).count(),
+            'before': self.measure(legacy_pending_assignments_for, sample, page_size),
+            'after': self.measure(pending_assignments_for, sample, page_size),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def measure(self, build_queryset, students, page_size):
+        # Mirrors what the list endpoint does per request: a COUNT for the paginator
+        # followed by the first page.
+        def run(student):
+            queryset = build_queryset(student)
+            queryset.count()
+            return list(queryset[:page_size])
+
+        timings = [time_call(run, student)[1] for student in students]
+        return summarize(timings)
+
+    def seed(self, rng, options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+        run_tag = f'{now.timestamp():.0f}'
+
+        with transaction.atomic():
+            teacher_user = User.objects.create(username=f'{BENCH_PREFIX}-teacher-{run_tag}')
+            teacher = TeacherProfile.objects.create(user=teacher_user)
+
+            User.objects.bulk_create(
+                [User(username=f'{BENCH_PREFIX}-{run_tag}-{i}', password='!') for i in range(options['students'])],
+                batch_size=batch_size,
+            )
+            users = User.objects.filter(username__startswith=f'{BENCH_PREFIX}-{run_tag}-')
+            StudentProfile.objects.bulk_create(
+                [StudentProfile(user=user) for user in users],
+                batch_size=batch_size,
+            )
+            students = list(StudentProfile.objects.filter(user__in=users).values_list('id', flat=True))
+
+            Course.objects.bulk_create(
+                [
+                    Course(title=f'Bench course {i}', description='Benchmark course', teacher=teacher)
+                    for i in range(options['courses'])
+                ],
+                batch_size=batch_size,
+            )
+            courses = list(Course.objects.filter(teacher=teacher).values_list('id', flat=True))
+
+            Assignment.objects.bulk_create(
+                [
+                    Assignment(
+                        title=f'Bench assignment {course_id}-{i}',
+                        description='Benchmark assignment',
+                        course_id=course_id,
+                        due_date=now + timedelta(days=rng.randint(-30, 60)),
+                    )
+                    for course_id in courses
+                    for i in range(options['assignments_per_course'])
+                ],
+                batch_size=batch_size,
+            )
+            assignments_by_course = {}
+            for assignment_id, course_id in Assignment.objects.filter(course_id__in=courses).values_list('id', 'course_id'):
+                assignments_by_course.setdefault(course_id, []).append(assignment_id)
+
+            Enrollment = Course.students.through
+            enrollments = []
+            student_assignments = {}
+            per_student = min(options['courses_per_student'], len(courses))
+            for student_id in students:
+                enrolled = rng.sample(courses, per_student)
+                enrollments.extend(Enrollment(course_id=c, studentprofile_id=student_id) for c in enrolled)
+                student_assignments[student_id] = [a for c in enrolled for a in assignments_by_course[c]]
+            Enrollment.objects.bulk_create(enrollments, batch_size=batch_size)
+
+        total_available = sum(len(a) for a in student_assignments.values())
+        ratio = min(1.0, options['submissions'] / total_available) if total_available else 0
+        pending = []
+        created = 0
+        for student_id, assignment_ids in student_assignments.items():
+            for assignment_id in assignment_ids:
+                if rng.random() < ratio:
+                    pending.append(Submission(assignment_id=assignment_id, student_id=student_id, content='x'))
+            if len(pending) >= batch_size:
+                Submission.objects.bulk_create(pending, batch_size=batch_size)
+                created += len(pending)
+                pending = []
+        Submission.objects.bulk_create(pending, batch_size=batch_size)
+        created += len(pending)
+        self.stderr.write(f"Seeded {len(students)} students, {len(courses)} courses, {created} submissions.")
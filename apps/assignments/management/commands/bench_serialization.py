@@ -0,0 +1,100 @@
+import json
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.assignments.models import Submission
+from apps.assignments.serializers import SubmissionSerializer
+from utils.benchmark import summarize, time_call
+from utils.renderers import ORJSONRenderer
+from utils.rows import RowSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark for rendering a list of submissions: ModelSerializer + DRF's JSONRenderer "
+        "(the old path) against .values() rows + RowSerializer + ORJSONRenderer (the list fast "
+        "path). Runs on synthetic in-memory data, so it measures CPU only, and checks that both "
+        "paths produce the same bytes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rows = self.build_rows(rng, options['rows'])
+        fields = [field.attname for field in Submission._meta.concrete_fields]
+        instances = [Submission.from_db('default', fields, [row[f] for f in fields]) for row in rows]
+        # .values() keys FKs by field name, not attname.
+        value_rows = [
+            {field.name: row[field.attname] for field in Submission._meta.concrete_fields} for row in rows
+        ]
+        request = RequestFactory().get('/api/assignments/')
+        row_serializer = RowSerializer.for_serializer(SubmissionSerializer)
+
+        def model_path():
+            data = SubmissionSerializer(instances, many=True, context={'request': request}).data
+            return JSONRenderer().render(data)
+
+        def row_path():
+            return ORJSONRenderer().render(row_serializer.to_representation(value_rows, request))
+
+        before, after = model_path(), row_path()
+        if before != after:
+            raise CommandError("The fast path rendered different bytes than ModelSerializer + JSONRenderer.")
+
+        report = {
+            'rows': len(rows),
+            'bytes': len(after),
+            'identical': True,
+            'modelserializer_jsonrenderer': self.measure(model_path, options['runs']),
+            'rowserializer_orjson': self.measure(row_path, options['runs']),
+            'stages': {
+                'modelserializer': self.measure(
+                    lambda: SubmissionSerializer(instances, many=True, context={'request': request}).data,
+                    options['runs'],
+                ),
+                'rowserializer': self.measure(
+                    lambda: row_serializer.to_representation(value_rows, request), options['runs'],
+                ),
+            },
+        }
+        report['speedup'] = round(
+            report['modelserializer_jsonrenderer']['p50_ms'] / report['rowserializer_orjson']['p50_ms'], 1
+        )
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def measure(func, runs):
+        return summarize([time_call(func)[1] for _ in range(runs)])
+
+    @staticmethod
+    def build_rows(rng, count):
+        now = timezone.now()
+        content_field = Submission._meta.get_field('content')
+        rows = []
+        for i in range(1, count + 1):
+            graded = rng.random() < 0.6
+            content = f'Submitted work #{i}: résumé of the lab, with "quotes" and a newline\n.'
+            rows.append({
+                'id': i,
+                'assignment_id': rng.randint(1, 5000),
+                'student_id': rng.randint(1, 50_000),
+                'content': content,
+                **content_field.summary(content),
+                'file': f'submissions/work-{i}.pdf' if i % 3 == 0 else '',
+                'blob_id': None,
+                'file_name': '',
+                'link': f'https://example.com/work/{i}' if i % 4 == 0 else None,
+                'submitted_at': now - timedelta(seconds=rng.randint(0, 10_000_000), microseconds=rng.randint(0, 999_999)),
+                'reviewed': graded,
+                'grade': rng.choice(('A', 'B+', 'C')) if graded else None,
+            })
+        return rows
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:05
+
+from itertools import islice
+
+from django.db import migrations, models
+
+import utils.fields
+
+BATCH_SIZE = 2000
+SUMMARY_FIELDS = ['content_length', 'content_excerpt', 'content_digest']
+
+
+# Rows are copied with one UPDATE each through executemany(); bulk_update()'s CASE expressions
+# get slow at this size.
+def _update_sql(connection, model, fields):
+    qn = connection.ops.quote_name
+    assignments = ', '.join(f'{qn(model._meta.get_field(name).column)} = %s' for name in fields)
+    return f'UPDATE {qn(model._meta.db_table)} SET {assignments} WHERE {qn(model._meta.pk.column)} = %s'
+
+
+def _batches(model, column):
+    rows = model.objects.values_list('pk', column).order_by('pk').iterator(BATCH_SIZE)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        yield batch
+
+
+def compress_content(apps, schema_editor):
+    Submission = apps.get_model('assignments', 'Submission')
+    field = Submission._meta.get_field('content')
+    connection = schema_editor.connection
+    sql = _update_sql(connection, Submission, ['content', *SUMMARY_FIELDS])
+    with connection.cursor() as cursor:
+        for batch in _batches(Submission, 'content_plain'):
+            cursor.executemany(sql, [
+                (field.get_db_prep_save(text, connection), *field.summary(text).values(), pk) for pk, text in batch
+            ])
+
+
+def decompress_content(apps, schema_editor):
+    Submission = apps.get_model('assignments', 'Submission')
+    connection = schema_editor.connection
+    sql = _update_sql(connection, Submission, ['content_plain'])
+    with connection.cursor() as cursor:
+        for batch in _batches(Submission, 'content'):
+            cursor.executemany(sql, [(text, pk) for pk, text in batch])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0005_search_vector'),
+    ]
+
+    # The text column becomes binary, which Postgres cannot cast in place: the old column is
+    # renamed aside, copied into the new one through the field, then dropped.
+    operations = [
+        migrations.RenameField(
+            model_name='submission',
+            old_name='content',
+            new_name='content_plain',
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='content',
+            field=utils.fields.CompressedTextField(
+                default='', length_field='content_length', excerpt_field='content_excerpt',
+                digest_field='content_digest',
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='content_length',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='UTF-8 byte length of the content.'),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='content_excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='content_digest',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        # Lets the column be re-added on a non-empty table when migrating backwards.
+        migrations.AlterField(
+            model_name='submission',
+            name='content_plain',
+            field=models.TextField(default=''),
+        ),
+        migrations.RunPython(compress_content, decompress_content),
+        migrations.RemoveField(
+            model_name='submission',
+            name='content_plain',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0006_compressed_submission_content'),
+        ('uploads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='submissions', to='uploads.blob'),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='file_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
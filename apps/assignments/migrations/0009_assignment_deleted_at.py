@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0008_assignment_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
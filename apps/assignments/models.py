@@ -1,6 +1,9 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from apps.courses.models import Course
 from apps.accounts.models import StudentProfile, TeacherProfile
+from utils.fields import CompressedTextField
+from utils.softdelete import LiveManager
 # Create your models here.
 
 
@@ -12,26 +15,63 @@ class Assignment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     files = models.FileField(upload_to='assignments/', blank=True, null=True)
+    # As on Submission: set when the file came through the upload API (apps.uploads).
+    blob = models.ForeignKey('uploads.Blob', null=True, blank=True, on_delete=models.PROTECT, related_name='assignments')
+    file_name = models.CharField(max_length=255, blank=True, default='')
     link = models.URLField(blank=True, null=True)
-    
+    # Weighted title/description tsvector, kept current by apps.search.signals (Postgres only).
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set when the assignment or its course is deleted; the rows are then purged in the background
+    # (see deletion.py).
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'due_date'], name='assignment_course_due_idx'),
+        ]
 
     def __str__(self):
         return self.title
     
     
 
+class LiveSubmissionManager(LiveManager):
+    # Submissions go with their assignment.
+    live_filters = {'assignment__deleted_at__isnull': True}
+
+
 class Submission(models.Model):
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='submissions')
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='submissions')
-    content = models.TextField()
+    # Stored compressed; lists read the summary columns below instead (see CompressedTextField).
+    content = CompressedTextField(
+        length_field='content_length', excerpt_field='content_excerpt', digest_field='content_digest',
+    )
+    content_length = models.PositiveIntegerField(default=0, editable=False, help_text="UTF-8 byte length of the content.")
+    content_excerpt = models.CharField(max_length=200, blank=True, default='', editable=False)
+    content_digest = models.CharField(max_length=32, blank=True, default='', editable=False)
     file = models.FileField(upload_to='submissions/', blank=True, null=True)
+    # Set when the file came through the chunked upload API (apps.uploads): `file` then names the
+    # shared, content-addressed blob and `file_name` is the name it was uploaded under.
+    blob = models.ForeignKey('uploads.Blob', null=True, blank=True, on_delete=models.PROTECT, related_name='submissions')
+    file_name = models.CharField(max_length=255, blank=True, default='')
     link = models.URLField(blank=True, null=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
     reviewed = models.BooleanField(default=False)
     grade = models.CharField(max_length=10, blank=True, null=True)
 
+    objects = LiveSubmissionManager()
+    all_objects = models.Manager()
+
     class Meta:
         unique_together = ('assignment', 'student')
+        indexes = [
+            models.Index(fields=['student', 'assignment'], name='submission_student_assign_idx'),
+            models.Index(fields=['submitted_at', 'id'], name='submission_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"{self.assignment.title} - {self.student.user.username}"
\ No newline at end of file
@@ -1,33 +1,99 @@
 from rest_framework import serializers
+from apps.accounts.serializers import StudentProfileSerializer
+from apps.courses.serializers import CourseSerializer
+from apps.uploads.serializers import UploadField, attached_file
+from utils.fieldsets import DynamicFieldsMixin
 from .models import Assignment, Submission
 from django.db import IntegrityError
 from rest_framework.exceptions import ValidationError
 
 
 
-class AssignmentSerializer(serializers.ModelSerializer):
+class AssignmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    upload = UploadField(help_text="A finalized upload (see /api/uploads/) to attach as the assignment's file.")
+
     class Meta:
         model = Assignment
-        fields = ['id', 'title', 'description', 'course', 'due_date', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'description', 'course', 'due_date', 'file_name', 'upload', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'file_name', 'created_at', 'updated_at']
+        expandable_fields = {'course': CourseSerializer}
+
+    def validate(self, attrs):
+        upload = attrs.pop('upload', None)
+        if upload is not None:
+            attrs.update(attached_file(upload, 'files'))
+        return attrs
         
 
 
-class SubmissionSerializer(serializers.ModelSerializer):
+class SubmissionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    content = serializers.CharField(style={'base_template': 'textarea.html'})
+    upload = UploadField(help_text="A finalized upload (see /api/uploads/) to attach instead of sending `file`.")
+
     class Meta:
         model = Submission
-        fields = ['id', 'assignment', 'student', 'content', 'file', 'link', 'submitted_at', 'reviewed', 'grade']
-        read_only_fields = ['id', 'submitted_at', 'reviewed','grade']
-        
+        fields = ['id', 'assignment', 'student', 'content', 'file', 'file_name', 'upload', 'link', 'submitted_at', 'reviewed', 'grade']
+        read_only_fields = ['id', 'file_name', 'submitted_at', 'reviewed','grade']
+        expandable_fields = {'assignment': AssignmentSerializer, 'student': StudentProfileSerializer}
+
+    def validate(self, attrs):
+        upload = attrs.pop('upload', None)
+        if upload is not None:
+            if attrs.get('file'):
+                raise ValidationError("Send either a file or an upload, not both.")
+            attrs.update(attached_file(upload))
+        return attrs
+
     def create(self, validated_data):
         try:
             return super().create(validated_data)
         except IntegrityError:
             raise ValidationError("You have already submitted this assignment.")
+
+
+class SubmissionListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # The full text is served by SubmissionContentView.
+    class Meta:
+        model = Submission
+        fields = [
+            'id', 'assignment', 'student', 'content_excerpt', 'content_length', 'file', 'file_name', 'link',
+            'submitted_at', 'reviewed', 'grade',
+        ]
+        read_only_fields = fields
+        expandable_fields = SubmissionSerializer.Meta.expandable_fields
         
 
 class GradeSubmissionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Submission
         read_only_fields = ['id', 'assignment', 'student', 'content', 'file', 'link', 'submitted_at', 'reviewed']
-        fields = ['grade']
\ No newline at end of file
+        fields = ['grade']
+
+
+class BulkGradeItemSerializer(serializers.Serializer):
+    submission_id = serializers.IntegerField()
+    grade = serializers.CharField(max_length=Submission._meta.get_field('grade').max_length)
+
+
+class BulkGradeSerializer(serializers.Serializer):
+    MAX_ITEMS = 1000
+
+    grades = BulkGradeItemSerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
+
+    def validate_grades(self, value):
+        ids = [item['submission_id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise ValidationError("Each submission may only appear once.")
+        return value
+
+
+class StudentDashboardCourseSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    teacher = serializers.IntegerField(source='teacher_id')
+    assignment_count = serializers.IntegerField()
+    pending_count = serializers.IntegerField()
+    submitted_count = serializers.IntegerField()
+    graded_count = serializers.IntegerField()
+    overdue_count = serializers.IntegerField()
+    next_due_date = serializers.DateTimeField(allow_null=True)
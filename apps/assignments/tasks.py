@@ -0,0 +1,5 @@
+from apps.jobs.queue import task
+from .deletion import purge_assignment, purge_course
+
+task('assignments.purge_course')(purge_course)
+task('assignments.purge_assignment')(purge_assignment)
@@ -1,10 +1,26 @@
+import io
+import tempfile
+import zipfile
+from unittest import mock
+
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from apps.accounts.models import StudentProfile, TeacherProfile
 from apps.courses.models import Course
+from apps.assignments.gradebook import gradebook_assignments, iter_gradebook_rows
 from apps.assignments.models import Assignment, Submission
+from apps.jobs.models import Job
+from apps.jobs.queue import Worker
+from apps.uploads.models import Blob
+from utils.testing import QueryBudgetMixin
 
 class AssignmentSubmissionTests(APITestCase):
 
@@ -99,6 +115,14 @@ class GradeAssignmentTests(APITestCase):
         self.assertEqual(self.submission.grade, 'A+')
         self.assertTrue(self.submission.reviewed)
 
+    def test_grading_issues_a_single_update(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.grade_url, {'grade': 'B'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+
     def test_student_cannot_grade_submission(self):
         self.client.force_authenticate(user=self.student_user)
         data = {'grade': 'B'}
@@ -149,4 +173,645 @@ class DuplicateSubmissionTest(APITestCase):
         }
         response = self.client.post(self.submit_url, data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(Submission.objects.filter(assignment=self.assignment, student=self.student_profile).count(), 1)
\ No newline at end of file
+        self.assertEqual(Submission.objects.filter(assignment=self.assignment, student=self.student_profile).count(), 1)
+
+class PendingAssignmentTests(APITestCase):
+
+    def setUp(self):
+        self.student_user = User.objects.create_user(username='student1', password='pass123')
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+
+        self.student_profile = StudentProfile.objects.create(user=self.student_user)
+        self.teacher_profile = TeacherProfile.objects.create(user=self.teacher_user)
+
+        self.course = Course.objects.create(title='Chemistry', teacher=self.teacher_profile)
+        self.course.students.add(self.student_profile)
+        self.other_course = Course.objects.create(title='History', teacher=self.teacher_profile)
+
+        self.later = Assignment.objects.create(
+            title='Titration', description='Report.', due_date='2025-12-31T23:59:00Z', course=self.course
+        )
+        self.sooner = Assignment.objects.create(
+            title='Safety Quiz', description='Quiz.', due_date='2025-10-01T09:00:00Z', course=self.course
+        )
+        self.submitted = Assignment.objects.create(
+            title='Lab Notes', description='Notes.', due_date='2025-11-01T09:00:00Z', course=self.course
+        )
+        Assignment.objects.create(
+            title='Essay', description='Not enrolled.', due_date='2025-09-01T09:00:00Z', course=self.other_course
+        )
+        Submission.objects.create(assignment=self.submitted, student=self.student_profile, content='Done')
+
+    def test_all_pending_excludes_submitted_and_orders_by_due_date(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(reverse('student-pending-assignments'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(ids, [self.sooner.id, self.later.id])
+
+    def test_course_pending_excludes_submitted(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(reverse('pending-assignment', args=[self.course.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(ids, [self.sooner.id, self.later.id])
+
+    def test_course_pending_for_unenrolled_course_is_empty(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(reverse('pending-assignment', args=[self.other_course.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+
+class StudentDashboardTests(APITestCase):
+
+    def setUp(self):
+        self.student_user = User.objects.create_user(username='student1', password='pass123')
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        self.other_user = User.objects.create_user(username='student2', password='pass123')
+
+        self.student_profile = StudentProfile.objects.create(user=self.student_user)
+        self.other_profile = StudentProfile.objects.create(user=self.other_user)
+        self.teacher_profile = TeacherProfile.objects.create(user=self.teacher_user)
+
+        self.course = Course.objects.create(title='Algebra', teacher=self.teacher_profile)
+        self.course.students.add(self.student_profile, self.other_profile)
+
+        overdue = Assignment.objects.create(
+            title='Overdue', description='.', due_date='2020-01-01T00:00:00Z', course=self.course
+        )
+        self.upcoming = Assignment.objects.create(
+            title='Upcoming', description='.', due_date='2999-01-01T00:00:00Z', course=self.course
+        )
+        graded = Assignment.objects.create(
+            title='Graded', description='.', due_date='2020-02-01T00:00:00Z', course=self.course
+        )
+        submitted = Assignment.objects.create(
+            title='Submitted', description='.', due_date='2999-02-01T00:00:00Z', course=self.course
+        )
+        Submission.objects.create(assignment=graded, student=self.student_profile, content='A', reviewed=True, grade='A')
+        Submission.objects.create(assignment=submitted, student=self.student_profile, content='B')
+        # Another student's work must not leak into the counters.
+        Submission.objects.create(assignment=overdue, student=self.other_profile, content='C')
+
+        self.url = reverse('student-dashboard')
+
+    def test_dashboard_counters(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        course = response.data[0]
+        self.assertEqual(course['id'], self.course.id)
+        self.assertEqual(course['assignment_count'], 4)
+        self.assertEqual(course['pending_count'], 2)
+        self.assertEqual(course['submitted_count'], 2)
+        self.assertEqual(course['graded_count'], 1)
+        self.assertEqual(course['overdue_count'], 1)
+        self.assertEqual(course['next_due_date'], '2999-01-01T00:00:00Z')
+
+    def test_dashboard_query_count_is_constant(self):
+        for i in range(5):
+            course = Course.objects.create(title=f'Extra {i}', teacher=self.teacher_profile)
+            course.students.add(self.student_profile)
+            Assignment.objects.create(title='Extra', description='.', due_date='2999-01-01T00:00:00Z', course=course)
+
+        # Fresh instance so the profile is not already cached on the user.
+        self.client.force_authenticate(user=User.objects.get(pk=self.student_user.pk))
+        # One query for the IsStudent profile lookup, one for the aggregate.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 6)
+
+    def test_teacher_cannot_view_student_dashboard(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TeacherGradebookTests(APITestCase):
+
+    def setUp(self):
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        self.other_teacher_user = User.objects.create_user(username='teacher2', password='pass123')
+        self.teacher_profile = TeacherProfile.objects.create(user=self.teacher_user)
+        TeacherProfile.objects.create(user=self.other_teacher_user)
+
+        self.course = Course.objects.create(title='Geometry', teacher=self.teacher_profile)
+        self.students = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'student{i}', password='pass123')
+            profile = StudentProfile.objects.create(user=user, student_id=f'S00{i}')
+            self.course.students.add(profile)
+            self.students.append(profile)
+
+        self.first = Assignment.objects.create(
+            title='Angles', description='.', due_date='2020-01-01T00:00:00Z', course=self.course
+        )
+        self.second = Assignment.objects.create(
+            title='Proofs', description='.', due_date='2999-01-01T00:00:00Z', course=self.course
+        )
+        Submission.objects.create(
+            assignment=self.first, student=self.students[0], content='late', reviewed=True, grade='B'
+        )
+        Submission.objects.create(assignment=self.second, student=self.students[0], content='on time')
+        Submission.objects.create(assignment=self.second, student=self.students[2], content='on time')
+
+        self.url = reverse('teacher-gradebook', args=[self.course.id])
+
+    def test_gradebook_matrix(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['id'] for a in response.data['assignments']], [self.first.id, self.second.id])
+        rows = {row['id']: row for row in response.data['students']}
+        self.assertEqual(set(rows), {s.id for s in self.students})
+
+        first_row = rows[self.students[0].id]['cells']
+        self.assertEqual(first_row[self.first.id]['grade'], 'B')
+        self.assertTrue(first_row[self.first.id]['reviewed'])
+        self.assertTrue(first_row[self.first.id]['late'])
+        self.assertFalse(first_row[self.second.id]['late'])
+        self.assertEqual(rows[self.students[1].id]['cells'], {})
+        self.assertEqual(list(rows[self.students[2].id]['cells']), [self.second.id])
+
+    def test_assignment_added_during_an_export_is_left_out(self):
+        assignments = gradebook_assignments(self.course)
+        rows = iter_gradebook_rows(self.course, assignments)
+        extra = Assignment.objects.create(
+            title='Areas', description='.', due_date='2999-01-01T00:00:00Z', course=self.course
+        )
+        Submission.objects.create(assignment=extra, student=self.students[1], content='early')
+        cells = {student['id']: cells for student, cells in rows}
+        self.assertEqual(cells[self.students[1].id], {})
+        self.assertEqual(set(cells[self.students[0].id]), {self.first.id, self.second.id})
+
+    def test_gradebook_query_count_is_bounded(self):
+        self.client.force_authenticate(user=User.objects.get(pk=self.teacher_user.pk))
+        # Profile lookup, course, assignments, roster, submissions.
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+
+    def test_gradebook_csv_export(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url, {'export': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertIn(f'Angles [{self.first.id}] grade', lines[0])
+        self.assertTrue(lines[1].startswith(f'{self.students[0].id},student0,S000,B,True,'))
+
+    def test_gradebook_ndjson_export(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url, {'export': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+
+    def test_gradebook_invalid_export(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url, {'export': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_teacher_cannot_view_gradebook(self):
+        self.client.force_authenticate(user=self.other_teacher_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BulkGradeTests(APITestCase):
+
+    def setUp(self):
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        self.other_teacher_user = User.objects.create_user(username='teacher2', password='pass123')
+        self.teacher_profile = TeacherProfile.objects.create(user=self.teacher_user)
+        other_teacher = TeacherProfile.objects.create(user=self.other_teacher_user)
+
+        course = Course.objects.create(title='Physics', teacher=self.teacher_profile)
+        other_course = Course.objects.create(title='Art', teacher=other_teacher)
+        assignment = Assignment.objects.create(
+            title='Optics', description='.', due_date='2025-12-31T23:59:00Z', course=course
+        )
+        other_assignment = Assignment.objects.create(
+            title='Sketch', description='.', due_date='2025-12-31T23:59:00Z', course=other_course
+        )
+
+        self.submissions = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'student{i}', password='pass123')
+            profile = StudentProfile.objects.create(user=user)
+            self.submissions.append(Submission.objects.create(assignment=assignment, student=profile, content='.'))
+        self.foreign = Submission.objects.create(assignment=other_assignment, student=profile, content='.')
+
+        self.url = reverse('bulk-grade-assignments')
+
+    def test_bulk_grade(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        payload = {'grades': [{'submission_id': s.id, 'grade': f'A{i}'} for i, s in enumerate(self.submissions)]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['graded'], 3)
+        self.assertTrue(all(item['status'] == 'graded' for item in response.data['results']))
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        for i, submission in enumerate(self.submissions):
+            submission.refresh_from_db()
+            self.assertEqual(submission.grade, f'A{i}')
+            self.assertTrue(submission.reviewed)
+
+    def test_bulk_grade_skips_foreign_and_missing_submissions(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        payload = {'grades': [
+            {'submission_id': self.submissions[0].id, 'grade': 'A'},
+            {'submission_id': self.foreign.id, 'grade': 'F'},
+            {'submission_id': 999999, 'grade': 'F'},
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['graded'], 1)
+        self.assertEqual(
+            [item['status'] for item in response.data['results']],
+            ['graded', 'not_found', 'not_found'],
+        )
+        self.foreign.refresh_from_db()
+        self.assertIsNone(self.foreign.grade)
+        self.assertFalse(self.foreign.reviewed)
+
+    def test_bulk_grade_rejects_duplicates(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        submission_id = self.submissions[0].id
+        payload = {'grades': [
+            {'submission_id': submission_id, 'grade': 'A'},
+            {'submission_id': submission_id, 'grade': 'B'},
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_student_cannot_bulk_grade(self):
+        self.client.force_authenticate(user=self.submissions[0].student.user)
+        payload = {'grades': [{'submission_id': self.submissions[0].id, 'grade': 'A'}]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class StudentSubmittedAssignmentTests(APITestCase):
+
+    def setUp(self):
+        self.student_user = User.objects.create_user(username='student1', password='pass123')
+        self.student_profile = StudentProfile.objects.create(user=self.student_user)
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1', password='pass123'))
+        self.course = Course.objects.create(title='Music', teacher=teacher)
+        self.course.students.add(self.student_profile)
+        self.submissions = [
+            Submission.objects.create(
+                assignment=Assignment.objects.create(
+                    title=f'Piece {i}', description='.', due_date='2025-12-31T23:59:00Z', course=self.course
+                ),
+                student=self.student_profile,
+                content='.',
+            )
+            for i in range(3)
+        ]
+        self.url = reverse('submitted-assignment', args=[self.course.id])
+
+    def test_lists_own_submissions(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([s['id'] for s in response.data['results']], [s.id for s in self.submissions])
+
+    def test_cursor_pagination(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([s['id'] for s in response.data['results']], [self.submissions[2].id])
+        self.assertIsNone(response.data['next'])
+
+
+    def test_sparse_fieldset_with_cursor_pagination(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url, {'fields': 'id,grade', 'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(response.data['results'], [{'id': s.id, 'grade': None} for s in self.submissions[:2]])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'], [{'id': self.submissions[2].id, 'grade': None}])
+
+    def test_expand_nested_relations(self):
+        self.client.force_authenticate(user=self.student_user)
+        params = {'expand': 'assignment.course,student.user', 'fields': 'id,assignment.title,assignment.course'}
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = response.data['results'][0]
+        self.assertEqual(set(first), {'id', 'assignment', 'student'})
+        self.assertEqual(set(first['assignment']), {'title', 'course'})
+        self.assertEqual(first['assignment']['course']['title'], 'Music')
+        self.assertEqual(first['student']['user'], {
+            'id': self.student_user.id, 'username': 'student1', 'first_name': '', 'last_name': '',
+        })
+
+        # Keyset pagination over expanded (model instance) rows reads its key from deferred models.
+        params.update(pagination='cursor', page_size=2)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, params)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([s['id'] for s in response.data['results']], [self.submissions[2].id])
+
+
+    def test_list_returns_excerpt_and_length_without_reading_content(self):
+        essay = 'Ünïcode essay. ' * 100
+        Submission.objects.filter(pk=self.submissions[0].pk).delete()
+        submission = Submission.objects.create(
+            assignment=self.submissions[0].assignment, student=self.student_profile, content=essay,
+        )
+        self.client.force_authenticate(user=self.student_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        row = next(r for r in response.data['results'] if r['id'] == submission.id)
+        self.assertNotIn('content', row)
+        self.assertEqual(row['content_excerpt'], essay[:200])
+        self.assertEqual(row['content_length'], len(essay.encode()))
+        self.assertNotIn('."content"', queries.captured_queries[-1]['sql'])
+
+
+class SubmissionContentTests(QueryBudgetMixin, APITestCase):
+
+    def setUp(self):
+        self.student_user = User.objects.create_user(username='student1', password='pass123')
+        student = StudentProfile.objects.create(user=self.student_user)
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        course = Course.objects.create(title='History', teacher=TeacherProfile.objects.create(user=self.teacher_user))
+        assignment = Assignment.objects.create(title='Essay', description='.', due_date='2025-12-31T23:59:00Z', course=course)
+        self.content = 'Á long essay. ' * 500
+        self.body = self.content.encode()
+        self.submission = Submission.objects.create(assignment=assignment, student=student, content=self.content)
+        self.url = reverse('submission-content', args=[self.submission.id])
+
+    def test_content_is_stored_compressed(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT content FROM assignments_submission WHERE id = %s', [self.submission.id])
+            stored = bytes(cursor.fetchone()[0])
+        self.assertLess(len(stored), len(self.body) / 10)
+        self.assertEqual(Submission.objects.get(pk=self.submission.pk).content, self.content)
+
+    def test_full_content_and_revalidation(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, self.body)
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertWithinBudget(response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_range_requests(self):
+        self.client.force_authenticate(user=self.student_user)
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-99')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response.content, self.body[:100])
+        self.assertEqual(response['Content-Range'], f'bytes 0-99/{len(self.body)}')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.content, self.body[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, self.body)
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.body)}')
+
+    def test_content_is_private_to_student_and_teacher(self):
+        outsider = User.objects.create_user(username='student2', password='pass123')
+        StudentProfile.objects.create(user=outsider)
+        self.client.force_authenticate(user=outsider)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {"error": "Submission not found."})
+
+
+class SubmissionFilesArchiveTests(QueryBudgetMixin, APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        course = Course.objects.create(title='Lab', teacher=TeacherProfile.objects.create(user=self.teacher_user))
+        self.assignment = Assignment.objects.create(title='Lab 1', description='.', due_date='2025-12-31T23:59:00Z', course=course)
+        self.files = {}
+        for name in ('bob', 'alice', 'carol'):
+            student = StudentProfile.objects.create(user=User.objects.create_user(username=name, password='pass123'))
+            submission = Submission(assignment=self.assignment, student=student, content='.')
+            if name != 'carol':
+                self.files[f'{name}/{name}-report.txt'] = f'{name} report '.encode() * 1000
+                submission.file.save(f'{name}-report.txt', ContentFile(f'{name} report '.encode() * 1000), save=False)
+            submission.save()
+        self.url = reverse('assignment-submission-files', args=[self.assignment.id])
+
+    def test_zip_of_every_submitted_file(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn(f'assignment-{self.assignment.id}-submissions.zip', response['Content-Disposition'])
+        self.assertWithinBudget(response)
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), ['alice/alice-report.txt', 'bob/bob-report.txt'])
+            for name, body in self.files.items():
+                self.assertEqual(archive.read(name), body)
+
+    def test_conditional_download(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url)
+
+        with self.assertNumQueries(2):
+            not_modified = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        Submission.objects.filter(student__user__username='bob').delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_and_foreign_assignments(self):
+        other = User.objects.create_user(username='teacher2', password='pass123')
+        TeacherProfile.objects.create(user=other)
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        Submission.objects.update(file='')
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {"error": "No files have been submitted for this assignment."})
+
+
+class TeacherEndpointQueryBudgetTests(QueryBudgetMixin, APITestCase):
+
+    def setUp(self):
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        self.teacher = TeacherProfile.objects.create(user=self.teacher_user)
+        self.course = Course.objects.create(title='Science', teacher=self.teacher)
+        self.assignment = Assignment.objects.create(
+            title='Lab Report', description='d', due_date='2025-12-31T23:59:00Z', course=self.course
+        )
+        # Enough rows that a per-row lookup would blow any budget.
+        for i in range(8):
+            student = StudentProfile.objects.create(
+                user=User.objects.create_user(username=f'student{i}', password='pass123')
+            )
+            self.course.students.add(student)
+            Submission.objects.create(assignment=self.assignment, student=student, content='x', reviewed=i % 2 == 0)
+        self.client.force_authenticate(user=self.teacher_user)
+
+    def test_submission_lists_stay_within_budget(self):
+        for name in ('teacher-assignment-submission-ungraded', 'teacher-assignment-submission-graded',
+                     'teacher-all-assignments'):
+            response = self.client.get(reverse(name, args=[self.course.id]))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertWithinBudget(response)
+
+    def test_assignment_write_endpoints_stay_within_budget(self):
+        response = self.client.post(reverse('create-assignment'), {
+            'title': 'Essay', 'description': 'd', 'due_date': '2025-12-31T23:59:00Z', 'course': self.course.id,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertWithinBudget(response)
+
+        assignment_id = response.data['id']
+        response = self.client.put(reverse('update-assignment', args=[assignment_id]), {
+            'title': 'Essay v2', 'description': 'd', 'due_date': '2025-12-31T23:59:00Z', 'course': self.course.id,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+
+        response = self.client.delete(reverse('delete-assignment', args=[self.assignment.id]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertWithinBudget(response)
+
+    def test_gradebook_rows_are_not_fetched_per_student(self):
+        with self.assertMaxQueries(5):
+            response = self.client.get(reverse('teacher-gradebook', args=[self.course.id]))
+        self.assertEqual(len(response.data['students']), 8)
+
+
+@mock.patch('apps.assignments.deletion.PURGE_BATCH_SIZE', 2)
+class DeletionTests(QueryBudgetMixin, APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        self.course = Course.objects.create(title='Lab', teacher=TeacherProfile.objects.create(user=self.teacher_user))
+        self.essay, self.quiz = (
+            Assignment.objects.create(title=title, description='.', due_date='2030-12-31T23:59:00Z', course=self.course)
+            for title in ('Essay', 'Quiz')
+        )
+        self.blob = Blob.objects.create(size=5, file=default_storage.save('blobs/shared', ContentFile(b'shared')))
+        self.files = []
+        for number in range(3):
+            student = StudentProfile.objects.create(user=User.objects.create_user(username=f's{number}', password='pass123'))
+            self.course.students.add(student)
+            submission = Submission(assignment=self.essay, student=student, content='.')
+            submission.file.save(f'essay-{number}.txt', ContentFile(b'essay'), save=False)
+            submission.save()
+            self.files.append(submission.file.name)
+            Submission.objects.create(assignment=self.quiz, student=student, content='.', file=self.blob.file.name, blob=self.blob)
+        self.student_user = student.user
+
+    def purge(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Worker(burst=True).run()
+
+    def test_course_disappears_then_is_purged_in_batches(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.delete(reverse('delete-course', args=[self.course.id]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], Job.QUEUED)
+        self.assertEqual(response['Location'], reverse('job-detail', args=[response.data['id']]))
+        self.assertWithinBudget(response)
+
+        # Gone from the API before any row is deleted.
+        self.assertEqual(self.client.get(reverse('course-detail', args=[self.course.id])).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('teacher-all-assignments', args=[self.course.id])).data['results'], [])
+        self.assertEqual(self.client.get(reverse('teacher-assignment-submission-ungraded', args=[self.course.id])).data['results'], [])
+        self.assertEqual(Submission.all_objects.count(), 6)
+
+        self.client.force_authenticate(user=self.student_user)
+        self.assertEqual(self.client.get(reverse('student-dashboard')).data, [])
+        self.assertEqual(self.client.get(reverse('job-detail', args=[response.data['id']])).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.purge()
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(reverse('job-detail', args=[response.data['id']]))
+        self.assertEqual(response.data['status'], Job.SUCCEEDED)
+        self.assertEqual(response.data['progress'], {
+            'assignments_total': 2, 'assignments_deleted': 2, 'submissions_total': 6, 'submissions_deleted': 6,
+            'files_deleted': 3, 'enrollments_deleted': 3, 'course_deleted': True,
+        })
+        self.assertWithinBudget(response)
+
+        self.assertFalse(Course.all_objects.exists())
+        self.assertFalse(Assignment.all_objects.exists())
+        self.assertFalse(Submission.all_objects.exists())
+        self.assertFalse(Course.students.through.objects.exists())
+        self.assertFalse(any(default_storage.exists(name) for name in self.files))
+        # The shared blob is left to purge_uploads, now that nothing refers to it.
+        self.assertTrue(default_storage.exists(self.blob.file.name))
+        self.assertFalse(Blob.objects.get().submissions.exists())
+
+    def test_deleted_course_leaves_the_cached_catalog_and_reverse_relations(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.student_user)
+        catalog = self.client.get(reverse('register-course'))
+        self.assertEqual([row['id'] for row in catalog.data['results']], [self.course.id])
+
+        self.client.force_authenticate(user=self.teacher_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('delete-course', args=[self.course.id]))
+
+        self.client.force_authenticate(user=self.student_user)
+        self.assertEqual(self.client.get(reverse('register-course')).data['results'], [])
+        teacher = self.teacher_user.teacherprofile
+        self.assertFalse(teacher.courses.exists())
+        self.assertFalse(Course.all_objects.get().assignments.exists())
+        self.assertFalse(Assignment.all_objects.get(pk=self.essay.pk).submissions.exists())
+        self.assertFalse(self.student_user.studentprofile.courses.exists())
+
+    def test_assignment_disappears_then_is_purged(self):
+        self.client.force_authenticate(user=self.student_user)
+        self.assertEqual(self.client.get(reverse('student-dashboard')).data[0]['assignment_count'], 2)
+
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.delete(reverse('delete-assignment', args=[self.essay.id]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertWithinBudget(response)
+
+        titles = [row['title'] for row in self.client.get(reverse('teacher-all-assignments', args=[self.course.id])).data['results']]
+        self.assertEqual(titles, ['Quiz'])
+        self.client.force_authenticate(user=self.student_user)
+        dashboard = self.client.get(reverse('student-dashboard')).data[0]
+        self.assertEqual((dashboard['assignment_count'], dashboard['submitted_count']), (1, 1))
+
+        self.purge()
+        self.assertEqual(Job.objects.get().progress, {
+            'assignments_total': 1, 'assignments_deleted': 1, 'submissions_total': 3, 'submissions_deleted': 3,
+            'files_deleted': 3,
+        })
+        self.assertEqual(list(Assignment.all_objects.values_list('title', flat=True)), ['Quiz'])
+        self.assertEqual(Submission.all_objects.count(), 3)
+        self.assertFalse(any(default_storage.exists(name) for name in self.files))
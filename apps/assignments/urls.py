@@ -1,16 +1,24 @@
 from django.urls import path
 from apps.assignments import views
+from utils.async_views import read_view
 
 urlpatterns = [
     path('assignment/create/', views.CreateAssignmentView.as_view(), name='create-assignment'),
     path('assignment/update/<int:pk>/', views.UpdateAssignmentView.as_view(), name='update-assignment'),
     path('assignment/delete/<int:pk>/', views.DeleteAssignmentView.as_view(), name='delete-assignment'),
+    path('assignment/file/<int:pk>/', views.AssignmentFileView.as_view(), name='assignment-file'),
     path('assignments/<int:course_id>/', views.TeacherAllAssignmentListView.as_view(), name='teacher-all-assignments'),
     path('assignments/ungraded/<int:course_id>/', views.TeacherAssignmentSubmissionUngraded.as_view(), name='teacher-assignment-submission-ungraded'),
     path('assignments/graded/<int:course_id>/', views.TeacherAssignmentSubmissionGraded.as_view(), name='teacher-assignment-submission-graded'),
+    path('assignments/files/<int:assignment_id>/', views.SubmissionFilesArchiveView.as_view(), name='assignment-submission-files'),
+    path('assignments/gradebook/<int:course_id>/', views.TeacherGradebookView.as_view(), name='teacher-gradebook'),
+    path('assignments/grade/bulk/', views.BulkGradeAssignmentView.as_view(), name='bulk-grade-assignments'),
     path('assignments/grade/<int:submission_id>/', views.GradeAssignmentView.as_view(), name='grade-assignment'),
+    path('assignments/submission/<int:submission_id>/content/', views.SubmissionContentView.as_view(), name='submission-content'),
+    path('assignments/submission/<int:submission_id>/file/', views.SubmissionFileView.as_view(), name='submission-file'),
     path('assignment/submit/', views.SubmitAssignmentView.as_view(), name='submit-assignment'),
-    path('assignment/submitted/<int:course_id>/', views.StudentSubmittedAssignmentListView.as_view(), name='submitted-assignment'),
-    path('assignment/pending/<int:course_id>/', views.StudentPendingAssignmentListView.as_view(), name='pending-assignment'),
-    path('assignments/pending/', views.StudentAllPendingAssignmentListView.as_view(), name='student-pending-assignments'),
+    path('assignment/submitted/<int:course_id>/', read_view(views.StudentSubmittedAssignmentListView), name='submitted-assignment'),
+    path('assignment/pending/<int:course_id>/', read_view(views.StudentPendingAssignmentListView), name='pending-assignment'),
+    path('assignments/pending/', read_view(views.StudentAllPendingAssignmentListView), name='student-pending-assignments'),
+    path('student/dashboard/', views.StudentDashboardView.as_view(), name='student-dashboard'),
 ]
\ No newline at end of file
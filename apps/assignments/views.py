@@ -1,15 +1,113 @@
+import posixpath
+
+from django.db import transaction
+from django.db.models import Count, Exists, FilteredRelation, Max, Min, OuterRef, Q
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 from rest_framework.exceptions import PermissionDenied
 
+from apps.courses.models import Course
+from apps.jobs.serializers import JobSerializer
+from .deletion import delete_assignment
 from .models import Assignment, Submission
-from .serializers import AssignmentSerializer, SubmissionSerializer, GradeSubmissionSerializer
+from .gradebook import build_gradebook, stream_gradebook_csv, stream_gradebook_ndjson
+from .archive import submission_file_entries
+from .serializers import (
+    AssignmentSerializer,
+    SubmissionSerializer,
+    SubmissionListSerializer,
+    GradeSubmissionSerializer,
+    BulkGradeSerializer,
+    StudentDashboardCourseSerializer,
+)
 from permissions.is_teacher import IsTeacher
 from permissions.is_student import IsStudent
 from utils.decorators import skip_if_swagger
+from utils.http import RangeNotSatisfiable, parse_byte_range
+from utils.fieldsets import FIELDSET_PARAMETERS
+from utils.rows import ValuesListMixin
+from utils.storage import download_url
+from utils.zipstream import stream_zip
+
+
+def pending_assignments_for(student):
+    """
+    Assignments in the student's enrolled courses that they have not submitted yet,
+    soonest due first. Uses a correlated NOT EXISTS anti-join on Submission(student, assignment)
+    instead of excluding a materialised list of submitted ids.
+    """
+    enrolled_courses = Course.students.through.objects.filter(studentprofile=student).values('course_id')
+    submitted = Submission.objects.filter(assignment=OuterRef('pk'), student=student)
+    return (
+        Assignment.objects
+        .filter(course_id__in=enrolled_courses)
+        .filter(~Exists(submitted))
+        .order_by('due_date', 'id')
+    )
+
+
+def dashboard_courses_for(student):
+    """
+    Enrolled courses annotated with the student's assignment counters, in one aggregate query.
+    The student's own submission is joined through a FilteredRelation so each assignment row
+    matches at most one submission and the counts need no DISTINCT.
+    """
+    now = timezone.now()
+    # The join bypasses Assignment's manager, so deleted assignments are left out here.
+    live = Q(assignments__deleted_at__isnull=True)
+    not_submitted = live & Q(my_submission__isnull=True)
+    return (
+        Course.objects
+        .filter(students=student)
+        .annotate(
+            my_submission=FilteredRelation(
+                'assignments__submissions',
+                condition=Q(assignments__submissions__student=student),
+            )
+        )
+        .annotate(
+            assignment_count=Count('assignments', filter=live),
+            submitted_count=Count('my_submission', filter=live),
+            graded_count=Count('my_submission', filter=live & Q(my_submission__reviewed=True)),
+            pending_count=Count('assignments', filter=not_submitted),
+            overdue_count=Count('assignments', filter=not_submitted & Q(assignments__due_date__lt=now)),
+            next_due_date=Min('assignments__due_date', filter=not_submitted & Q(assignments__due_date__gte=now)),
+        )
+        .values(
+            'id', 'title', 'teacher_id', 'assignment_count', 'pending_count',
+            'submitted_count', 'graded_count', 'overdue_count', 'next_due_date',
+        )
+        .order_by('title', 'id')
+    )
+
+
+def file_download(field, name, file_name):
+    """
+    Download the file ``name`` stored by the model FileField ``field`` as ``file_name`` (its
+    stored name when blank): a redirect to a short-lived presigned URL when the storage is a
+    bucket, so the bytes never pass through the app, or else the file streamed as an attachment.
+    """
+    storage = field.storage
+    file_name = file_name or posixpath.basename(name)
+    url = download_url(storage, name, file_name)
+    if url is not None:
+        response = HttpResponseRedirect(url)
+    else:
+        try:
+            response = FileResponse(storage.open(name, 'rb'), as_attachment=True, filename=file_name)
+        except FileNotFoundError:
+            return Response({"error": "The file is missing from storage."}, status=status.HTTP_404_NOT_FOUND)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 class CreateAssignmentView(generics.CreateAPIView):
@@ -29,7 +127,7 @@ class CreateAssignmentView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         course = serializer.validated_data.get('course')
-        if course.teacher != self.request.user.teacherprofile:
+        if course.teacher_id != self.request.user.teacherprofile.id:
             raise PermissionDenied("You can only create assignments for your own courses.")
         serializer.save()
 
@@ -56,7 +154,10 @@ class DeleteAssignmentView(generics.DestroyAPIView):
 
     @swagger_auto_schema(
         operation_summary="Delete an assignment",
-        operation_description="Allows a teacher to delete an existing assignment."
+        operation_description="Allows a teacher to delete an existing assignment. It disappears from the API at "
+                              "once, with its submissions; their rows and files are then purged in the background. "
+                              "The response is the purge job, to follow at `/api/jobs/<id>/`.",
+        responses={202: JobSerializer},
     )
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
@@ -65,15 +166,21 @@ class DeleteAssignmentView(generics.DestroyAPIView):
     def get_queryset(self):
         return Assignment.objects.filter(course__teacher=self.request.user.teacherprofile)
 
+    def destroy(self, request, *args, **kwargs):
+        job = delete_assignment(self.get_object(), request.user)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED,
+                        headers={'Location': reverse('job-detail', args=[job.id])})
 
-class TeacherAllAssignmentListView(generics.ListAPIView):
+
+class TeacherAllAssignmentListView(ValuesListMixin, generics.ListAPIView):
     serializer_class = AssignmentSerializer
     permission_classes = [IsTeacher]
     filterset_fields = ['course']
 
     @swagger_auto_schema(
         operation_summary="List all assignments by course",
-        operation_description="Fetch all assignments created for a specific course."
+        operation_description="Fetch all assignments created for a specific course.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -84,14 +191,16 @@ class TeacherAllAssignmentListView(generics.ListAPIView):
         return Assignment.objects.filter(course__id=course_id)
 
 
-class TeacherAssignmentSubmissionUngraded(generics.ListAPIView):
-    serializer_class = SubmissionSerializer
+class TeacherAssignmentSubmissionUngraded(ValuesListMixin, generics.ListAPIView):
+    serializer_class = SubmissionListSerializer
     permission_classes = [IsTeacher]
     filterset_fields = ['assignment__course']
+    keyset_ordering = ('submitted_at', 'id')
 
     @swagger_auto_schema(
         operation_summary="List ungraded submissions",
-        operation_description="List all assignment submissions that have not been reviewed for a given course."
+        operation_description="List all assignment submissions that have not been reviewed for a given course.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -102,17 +211,19 @@ class TeacherAssignmentSubmissionUngraded(generics.ListAPIView):
         return Submission.objects.filter(
             assignment__course_id=course_id,
             reviewed=False
-        ).select_related('assignment', 'student')
+        ).order_by('submitted_at', 'id')
 
 
-class TeacherAssignmentSubmissionGraded(generics.ListAPIView):
-    serializer_class = SubmissionSerializer
+class TeacherAssignmentSubmissionGraded(ValuesListMixin, generics.ListAPIView):
+    serializer_class = SubmissionListSerializer
     permission_classes = [IsTeacher]
     filterset_fields = ['assignment__course']
+    keyset_ordering = ('submitted_at', 'id')
 
     @swagger_auto_schema(
         operation_summary="List graded submissions",
-        operation_description="List all assignment submissions that have been reviewed for a given course."
+        operation_description="List all assignment submissions that have been reviewed for a given course.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -123,7 +234,76 @@ class TeacherAssignmentSubmissionGraded(generics.ListAPIView):
         return Submission.objects.filter(
             assignment__course_id=course_id,
             reviewed=True
-        ).select_related('assignment', 'student')
+        ).order_by('submitted_at', 'id')
+
+
+class TeacherGradebookView(APIView):
+    permission_classes = [IsTeacher]
+    exporters = {
+        'csv': (stream_gradebook_csv, 'text/csv', 'csv'),
+        'ndjson': (stream_gradebook_ndjson, 'application/x-ndjson', 'ndjson'),
+    }
+
+    @swagger_auto_schema(
+        operation_summary="Course gradebook",
+        operation_description="Returns the students x assignments grade matrix for one of your courses. "
+                              "Pass `export=csv` or `export=ndjson` to stream it as a download instead.",
+        manual_parameters=[
+            openapi.Parameter('export', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['csv', 'ndjson']),
+        ]
+    )
+    def get(self, request, course_id):
+        course = get_object_or_404(Course, pk=course_id, teacher=request.user.teacherprofile)
+
+        export = request.query_params.get('export')
+        if export is None:
+            return Response(build_gradebook(course))
+        if export not in self.exporters:
+            return Response({"error": "export must be one of: csv, ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream, content_type, extension = self.exporters[export]
+        response = StreamingHttpResponse(stream(course), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="gradebook-course-{course.id}.{extension}"'
+        return response
+
+
+class SubmissionFilesArchiveView(APIView):
+    permission_classes = [IsTeacher]
+
+    @swagger_auto_schema(
+        operation_summary="Download all submission files",
+        operation_description="Streams a ZIP of every submitted file for one of your assignments, one folder per "
+                              "student username. The archive is built while it is sent. `Last-Modified` is the "
+                              "latest submission time, so `If-Modified-Since` (or `If-None-Match`) answers 304 "
+                              "when nothing was submitted since the last download.",
+        responses={200: 'application/zip', 304: 'Not modified.', 404: 'Not found, or no files submitted.'},
+    )
+    def get(self, request, assignment_id):
+        assignment = get_object_or_404(Assignment, pk=assignment_id, course__teacher=request.user.teacherprofile)
+        # Neither NULL nor '' (no file) sorts after ''.
+        submissions = Submission.objects.filter(assignment=assignment, file__gt='')
+        summary = submissions.aggregate(count=Count('id'), last_id=Max('id'), latest=Max('submitted_at'))
+        if not summary['count']:
+            return Response({"error": "No files have been submitted for this assignment."},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        # Last-Modified has one-second resolution; the ETag also changes when a file is added or removed.
+        last_modified = int(summary['latest'].timestamp())
+        etag = f'"{summary["count"]}-{summary["last_id"]}-{last_modified}"'
+        headers = {'ETag': etag, 'Last-Modified': http_date(last_modified)}
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+            return not_modified
+
+        response = StreamingHttpResponse(
+            stream_zip(submission_file_entries(submissions)), content_type='application/zip', headers={
+                **headers, 'Content-Disposition': f'attachment; filename="assignment-{assignment.id}-submissions.zip"',
+            },
+        )
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 class GradeAssignmentView(APIView):
@@ -152,23 +332,61 @@ class GradeAssignmentView(APIView):
             submission = Submission.objects.get(id=submission_id)
             serializer = self.serializer_class(submission, data=request.data, partial=True)
             if serializer.is_valid():
-                instance = serializer.save()
-                instance.reviewed = True
-                instance.save()
+                instance = serializer.save(reviewed=True)
                 return Response(self.serializer_class(instance).data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Submission.DoesNotExist:
             return Response({"error": "Submission not found."}, status=status.HTTP_404_NOT_FOUND)
 
 
-class StudentPendingAssignmentListView(generics.ListAPIView):
+class BulkGradeAssignmentView(APIView):
+    permission_classes = [IsTeacher]
+
+    @swagger_auto_schema(
+        request_body=BulkGradeSerializer,
+        operation_summary="Grade submissions in bulk",
+        operation_description="Grades a list of `{submission_id, grade}` pairs in one transaction and marks them "
+                              "reviewed. Submissions outside your courses are reported as `not_found`."
+    )
+    def post(self, request):
+        serializer = BulkGradeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        grades = {item['submission_id']: item['grade'] for item in serializer.validated_data['grades']}
+        with transaction.atomic():
+            submissions = list(
+                Submission.objects
+                .select_for_update(of=('self',))
+                .filter(id__in=grades, assignment__course__teacher=request.user.teacherprofile)
+                .only('id', 'grade', 'reviewed')
+            )
+            for submission in submissions:
+                submission.grade = grades[submission.id]
+                submission.reviewed = True
+            Submission.objects.bulk_update(submissions, ['grade', 'reviewed'])
+
+        graded = {submission.id for submission in submissions}
+        results = [
+            {
+                'submission_id': submission_id,
+                'grade': grade if submission_id in graded else None,
+                'status': 'graded' if submission_id in graded else 'not_found',
+            }
+            for submission_id, grade in grades.items()
+        ]
+        return Response({'graded': len(graded), 'results': results})
+
+
+class StudentPendingAssignmentListView(ValuesListMixin, generics.ListAPIView):
     serializer_class = AssignmentSerializer
     permission_classes = [IsStudent]
     filterset_fields = ['course']
 
     @swagger_auto_schema(
         operation_summary="List pending assignments (by course)",
-        operation_description="Lists assignments in a course that the student has not yet submitted."
+        operation_description="Lists assignments in a course that the student has not yet submitted.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -176,43 +394,37 @@ class StudentPendingAssignmentListView(generics.ListAPIView):
     @skip_if_swagger(default_return=Assignment.objects.none())
     def get_queryset(self):
         course_id = self.kwargs['course_id']
-        course_assignments = Assignment.objects.filter(course_id=course_id, course__students=self.request.user.studentprofile)
-        submitted_assignments = Submission.objects.filter(
-            student__user=self.request.user,
-            assignment__course_id=course_id
-        ).values_list('assignment_id', flat=True)
-        return course_assignments.exclude(id__in=submitted_assignments)
+        return pending_assignments_for(self.request.user.studentprofile).filter(course_id=course_id)
 
 
-class StudentAllPendingAssignmentListView(generics.ListAPIView):
+class StudentAllPendingAssignmentListView(ValuesListMixin, generics.ListAPIView):
     serializer_class = AssignmentSerializer
     permission_classes = [IsStudent]
     filterset_fields = ['course']
 
     @swagger_auto_schema(
         operation_summary="List all pending assignments",
-        operation_description="Lists all assignments across enrolled courses that the student has not yet submitted."
+        operation_description="Lists all assignments across enrolled courses that the student has not yet submitted.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
     @skip_if_swagger(default_return=Assignment.objects.none())
     def get_queryset(self):
-        course_assignments = Assignment.objects.filter(course__students=self.request.user.studentprofile)
-        submitted_assignments = Submission.objects.filter(
-            student__user=self.request.user
-        ).values_list('assignment_id', flat=True)
-        return course_assignments.exclude(id__in=submitted_assignments)
+        return pending_assignments_for(self.request.user.studentprofile)
 
 
-class StudentSubmittedAssignmentListView(generics.ListAPIView):
-    serializer_class = AssignmentSerializer
+class StudentSubmittedAssignmentListView(ValuesListMixin, generics.ListAPIView):
+    serializer_class = SubmissionListSerializer
     permission_classes = [IsStudent]
-    filterset_fields = ['course']
+    filterset_fields = ['assignment']
+    keyset_ordering = ('submitted_at', 'id')
 
     @swagger_auto_schema(
         operation_summary="List submitted assignments (by course)",
-        operation_description="Lists all assignments submitted by the student in a specific course."
+        operation_description="Lists all assignments submitted by the student in a specific course.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -221,9 +433,107 @@ class StudentSubmittedAssignmentListView(generics.ListAPIView):
     def get_queryset(self):
         course_id = self.kwargs['course_id']
         return Submission.objects.filter(
-            student__user=self.request.user,
+            student=self.request.user.studentprofile,
             assignment__course_id=course_id
-        ).select_related('assignment')
+        ).order_by('submitted_at', 'id')
+
+
+class SubmissionContentView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Get a submission's content",
+        operation_description="Returns the full text of a submission as `text/plain`, to the student who submitted it "
+                              "and the course teacher. The `ETag` is a digest of the text, so `If-None-Match` "
+                              "revalidates without transferring it; a single byte `Range` (honoured with "
+                              "`If-Range`) returns part of it.",
+        manual_parameters=[
+            openapi.Parameter('Range', openapi.IN_HEADER, type=openapi.TYPE_STRING, description="e.g. `bytes=0-1023`"),
+        ],
+        responses={200: 'The content.', 206: 'The requested byte range.', 304: 'Not modified.',
+                   404: 'Not found.', 416: 'Range not satisfiable.'},
+    )
+    def get(self, request, submission_id):
+        user = request.user
+        submissions = Submission.objects.filter(
+            Q(student__user=user) | Q(assignment__course__teacher__user=user), pk=submission_id,
+        )
+        # Revalidation needs only the digest; the (compressed) text is read when it is sent.
+        digest = submissions.values_list('content_digest', flat=True).first()
+        if digest is None:
+            return Response({"error": "Submission not found."}, status=status.HTTP_404_NOT_FOUND)
+        headers = {'ETag': f'"{digest}"', 'Accept-Ranges': 'bytes'}
+
+        not_modified = get_conditional_response(request, etag=headers['ETag'])
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+            return not_modified
+
+        content = submissions.values_list('content', flat=True).first()
+        if content is None:
+            return Response({"error": "Submission not found."}, status=status.HTTP_404_NOT_FOUND)
+        body = content.encode()
+
+        byte_range = None
+        if request.headers.get('If-Range', headers['ETag']) == headers['ETag']:
+            try:
+                byte_range = parse_byte_range(request.headers.get('Range'), len(body))
+            except RangeNotSatisfiable:
+                return Response({"error": "Requested range not satisfiable."},
+                                status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                                headers={**headers, 'Content-Range': f'bytes */{len(body)}'})
+        if byte_range is None:
+            response = HttpResponse(body, content_type='text/plain; charset=utf-8', headers=headers)
+        else:
+            first, last = byte_range
+            response = HttpResponse(
+                body[first:last + 1], status=status.HTTP_206_PARTIAL_CONTENT, content_type='text/plain; charset=utf-8',
+                headers={**headers, 'Content-Range': f'bytes {first}-{last}/{len(body)}'},
+            )
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class SubmissionFileView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Download a submission's file",
+        operation_description="For the student who submitted it and the course teacher. With S3 storage this "
+                              "redirects to a presigned URL valid for `FILE_URL_EXPIRY` seconds; otherwise the "
+                              "file is sent as an attachment.",
+        responses={200: 'The file.', 302: 'Redirect to the file in storage.', 404: 'Not found, or no file.'},
+    )
+    def get(self, request, submission_id):
+        user = request.user
+        row = Submission.objects.filter(
+            Q(student__user=user) | Q(assignment__course__teacher__user=user), pk=submission_id,
+        ).values_list('file', 'file_name').first()
+        if row is None:
+            return Response({"error": "Submission not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not row[0]:
+            return Response({"error": "This submission has no file."}, status=status.HTTP_404_NOT_FOUND)
+        return file_download(Submission._meta.get_field('file'), *row)
+
+
+class AssignmentFileView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Download an assignment's file",
+        operation_description="For the course teacher and enrolled students. With S3 storage this redirects to "
+                              "a presigned URL valid for `FILE_URL_EXPIRY` seconds; otherwise the file is sent "
+                              "as an attachment.",
+        responses={200: 'The file.', 302: 'Redirect to the file in storage.', 404: 'Not found, or no file.'},
+    )
+    def get(self, request, pk):
+        user = request.user
+        row = Assignment.objects.filter(
+            Q(course__teacher__user=user) | Q(course__students__user=user), pk=pk,
+        ).values_list('files', 'file_name').first()
+        if row is None:
+            return Response({"error": "Assignment not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not row[0]:
+            return Response({"error": "This assignment has no file."}, status=status.HTTP_404_NOT_FOUND)
+        return file_download(Assignment._meta.get_field('files'), *row)
 
 
 class SubmitAssignmentView(generics.CreateAPIView):
@@ -238,4 +548,19 @@ class SubmitAssignmentView(generics.CreateAPIView):
         return super().post(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(student=self.request.user.studentprofile)
\ No newline at end of file
+        serializer.save(student=self.request.user.studentprofile)
+
+
+class StudentDashboardView(APIView):
+    permission_classes = [IsStudent]
+
+    @swagger_auto_schema(
+        operation_summary="Student dashboard",
+        operation_description="Returns every enrolled course with pending, submitted, graded and overdue "
+                              "assignment counts and the next due date, computed in a single query.",
+        responses={200: StudentDashboardCourseSerializer(many=True)}
+    )
+    def get(self, request):
+        courses = dashboard_courses_for(request.user.studentprofile)
+        serializer = StudentDashboardCourseSerializer(courses, many=True)
+        return Response(serializer.data)
@@ -0,0 +1,38 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'courses:catalog:version'
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a version that was evicted never reuses an older number
+        # whose pages might still be sitting in the cache.
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """
+    Invalidate every cached catalog page at once. Old pages are never deleted; they simply stop
+    being addressed and age out through their timeout.
+    """
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, int(time.time() * 1000), None)
+
+
+def catalog_cache_key(request):
+    params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+    raw = repr((request.get_host(), request.path, params)).encode()
+    return f'courses:catalog:v{catalog_version()}:{hashlib.sha1(raw).hexdigest()}'
+
+
+def catalog_cache_timeout():
+    return getattr(settings, 'COURSE_CATALOG_CACHE_TIMEOUT', 300)
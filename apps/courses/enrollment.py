@@ -0,0 +1,146 @@
+import csv
+import io
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.accounts.models import StudentProfile
+from .cache import bump_catalog_version
+from .models import Course
+
+Enrollment = Course.students.through
+
+# Keeps each IN (...) list well under SQLite's and Postgres' bound-parameter limits.
+LOOKUP_CHUNK_SIZE = 1000
+
+ENROLLED = 'enrolled'
+ALREADY_ENROLLED = 'already_enrolled'
+COURSE_FULL = 'full'
+
+
+def enroll_student(course_id, student_id):
+    """
+    Enroll a student while keeping ``Course.enrolled_count`` exact and never exceeding capacity.
+
+    The enrollment row is inserted first, then the counter is bumped with a single conditional
+    ``UPDATE ... SET enrolled_count = enrolled_count + 1 WHERE enrolled_count < capacity``. The
+    course row lock is therefore only held from that UPDATE to COMMIT, with no SELECT ... FOR
+    UPDATE and no read-modify-write. If the UPDATE matches nothing the course is full and the
+    insert is rolled back. The caller is expected to have checked that the course exists.
+    """
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Enrollment.objects.create(course_id=course_id, studentprofile_id=student_id)
+        except IntegrityError:
+            return ALREADY_ENROLLED
+
+        has_room = Q(capacity__isnull=True) | Q(enrolled_count__lt=F('capacity'))
+        updated = (
+            Course.objects.filter(pk=course_id).filter(has_room)
+            .update(enrolled_count=F('enrolled_count') + 1)
+        )
+        if not updated:
+            transaction.set_rollback(True)
+            return COURSE_FULL
+        transaction.on_commit(bump_catalog_version)
+    return ENROLLED
+
+
+def unenroll_student(course_id, student_id):
+    """
+    Remove a student from a course and decrement the counter in the same transaction.
+    Returns False if the student was not enrolled.
+    """
+    with transaction.atomic():
+        deleted, _ = Enrollment.objects.filter(course_id=course_id, studentprofile_id=student_id).delete()
+        if not deleted:
+            return False
+        Course.objects.filter(pk=course_id, enrolled_count__gt=0).update(enrolled_count=F('enrolled_count') - 1)
+        transaction.on_commit(bump_catalog_version)
+    return True
+
+
+def sync_enrolled_counts(course_ids):
+    """
+    Recount ``enrolled_count`` from the through table for the given courses in one UPDATE.
+    Used for enrollment paths that go through the ``Course.students`` manager (admin, shell, bulk
+    loads) rather than enroll_student().
+    """
+    counts = (
+        Enrollment.objects.filter(course_id=OuterRef('pk'))
+        .values('course_id')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Course.objects.filter(pk__in=course_ids).update(enrolled_count=Coalesce(Subquery(counts), Value(0)))
+
+
+def _chunks(values, size=LOOKUP_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def bulk_enroll(course, student_ids, batch_size=5000):
+    """
+    Enroll a cohort by registrar student id (``StudentProfile.student_id``).
+
+    Profiles and existing enrollments are resolved with chunked IN lookups, new rows go in with a
+    single ``bulk_create(ignore_conflicts=True)`` and the counter is recounted once. This is a
+    registrar operation and deliberately does not enforce ``capacity``.
+
+    Returns a dict with ``added``/``skipped``/``unknown`` counts and the unknown ids.
+    """
+    requested = list(dict.fromkeys(str(value).strip() for value in student_ids if str(value).strip()))
+
+    profiles = {}
+    for chunk in _chunks(requested):
+        profiles.update(StudentProfile.objects.filter(student_id__in=chunk).values_list('student_id', 'id'))
+    unknown = [student_id for student_id in requested if student_id not in profiles]
+
+    profile_ids = list(profiles.values())
+    existing = set()
+    for chunk in _chunks(profile_ids):
+        existing.update(
+            Enrollment.objects.filter(course=course, studentprofile_id__in=chunk)
+            .values_list('studentprofile_id', flat=True)
+        )
+    new_ids = [profile_id for profile_id in profile_ids if profile_id not in existing]
+
+    with transaction.atomic():
+        Enrollment.objects.bulk_create(
+            [Enrollment(course_id=course.pk, studentprofile_id=profile_id) for profile_id in new_ids],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        sync_enrolled_counts([course.pk])
+        transaction.on_commit(bump_catalog_version)
+
+    return {
+        'added': len(new_ids),
+        'skipped': len(existing),
+        'unknown': len(unknown),
+        'unknown_ids': unknown,
+    }
+
+
+def read_student_ids_csv(file):
+    """
+    Read registrar ids from an uploaded CSV: either a ``student_id`` column under a header row,
+    or one id per line in the first column.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    rows = csv.reader(text)
+    header = next(rows, None)
+    if header is None:
+        return []
+
+    normalized = [column.strip().lower() for column in header]
+    if 'student_id' in normalized:
+        index = normalized.index('student_id')
+        first = []
+    else:
+        index = 0
+        first = [header[0]] if header else []
+    return first + [row[index] for row in rows if len(row) > index]
@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.enrollment import bulk_enroll, read_student_ids_csv
+from apps.courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Enroll a cohort of students into a course by registrar student id, from arguments and/or a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', type=int)
+        parser.add_argument('student_ids', nargs='*', help="Registrar student ids (StudentProfile.student_id).")
+        parser.add_argument('--csv', dest='csv_path', help="CSV with a student_id column, or one id per line.")
+
+    def handle(self, *args, **options):
+        try:
+            course = Course.objects.get(pk=options['course_id'])
+        except Course.DoesNotExist:
+            raise CommandError(f"Course {options['course_id']} does not exist.")
+
+        student_ids = list(options['student_ids'])
+        if options['csv_path']:
+            with open(options['csv_path'], 'rb') as file:
+                student_ids += read_student_ids_csv(file)
+        if not student_ids:
+            raise CommandError("No student ids given.")
+
+        report = bulk_enroll(course, student_ids)
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,88 @@
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from apps.accounts.models import StudentProfile, TeacherProfile
+from apps.courses.enrollment import Enrollment, enroll_student
+from apps.courses.models import Course
+from utils.benchmark import summarize, time_call
+
+LOADTEST_PREFIX = 'loadtest-enroll'
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent registrations at a single capacity-limited course and verify that it is "
+        "never oversold. Reports per-registration latency. Run against Postgres; SQLite serializes "
+        "writers and will report lock errors under concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--registrations', type=int, default=1000)
+        parser.add_argument('--capacity', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--keep', action='store_true', help="Keep the generated course and students.")
+
+    def handle(self, *args, **options):
+        course, student_ids = self.setup(options['registrations'], options['capacity'])
+
+        def register(student_id):
+            try:
+                return time_call(enroll_student, course.id, student_id)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(register, student_ids))
+        elapsed = time.perf_counter() - started
+
+        outcomes = Counter(outcome for outcome, _ in results)
+        course.refresh_from_db()
+        rows = Enrollment.objects.filter(course=course).count()
+        expected = min(options['registrations'], options['capacity'])
+        report = {
+            'registrations': options['registrations'],
+            'capacity': options['capacity'],
+            'concurrency': options['concurrency'],
+            'outcomes': dict(outcomes),
+            'enrolled_count': course.enrolled_count,
+            'enrollment_rows': rows,
+            'throughput_per_s': round(len(results) / elapsed, 1),
+            'latency': summarize([ms for _, ms in results]),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+        if not options['keep']:
+            self.teardown(course, student_ids)
+
+        if rows != course.enrolled_count or rows != expected:
+            raise CommandError(f"Enrollment count mismatch: {rows} rows, counter {course.enrolled_count}, expected {expected}.")
+
+    def setup(self, registrations, capacity):
+        tag = f'{LOADTEST_PREFIX}-{time.time():.0f}'
+        with transaction.atomic():
+            teacher = TeacherProfile.objects.create(user=User.objects.create(username=f'{tag}-teacher'))
+            course = Course.objects.create(
+                title='Enrollment load test', description='Generated', teacher=teacher, capacity=capacity
+            )
+            User.objects.bulk_create(
+                [User(username=f'{tag}-{i}', password='!') for i in range(registrations)],
+                batch_size=1000,
+            )
+            users = User.objects.filter(username__startswith=f'{tag}-').exclude(pk=teacher.user_id)
+            StudentProfile.objects.bulk_create([StudentProfile(user=user) for user in users], batch_size=1000)
+            student_ids = list(StudentProfile.objects.filter(user__in=users).values_list('id', flat=True))
+        connections.close_all()
+        return course, student_ids
+
+    def teardown(self, course, student_ids):
+        user_ids = list(StudentProfile.objects.filter(id__in=student_ids).values_list('user_id', flat=True))
+        user_ids.append(course.teacher.user_id)
+        course.delete()
+        User.objects.filter(id__in=user_ids).delete()
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    # The auto-created Course.students through table only carries a unique
+    # (course_id, studentprofile_id) index, which cannot serve "courses of this
+    # student" lookups used by the pending-assignment anti-join.
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS course_students_student_course_idx '
+                'ON courses_course_students (studentprofile_id, course_id);',
+            reverse_sql='DROP INDEX IF EXISTS course_students_student_course_idx;',
+        ),
+    ]
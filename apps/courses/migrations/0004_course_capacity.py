@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_enrolled_count(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = Course.students.through
+    counts = (
+        Enrollment.objects.filter(course_id=OuterRef('pk'))
+        .values('course_id')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Course.objects.update(enrolled_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum number of students; blank means unlimited.', null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_enrolled_count, migrations.RunPython.noop),
+    ]
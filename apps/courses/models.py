@@ -1,5 +1,7 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from apps.accounts.models import TeacherProfile, StudentProfile
+from utils.softdelete import LiveManager
 # Create your models here.
 
 
@@ -8,8 +10,23 @@ class Course(models.Model):
     description = models.TextField()
     teacher = models.ForeignKey(TeacherProfile, on_delete=models.CASCADE, related_name='courses')
     students = models.ManyToManyField(StudentProfile, blank=True, related_name='courses')
+    capacity = models.PositiveIntegerField(blank=True, null=True, help_text="Maximum number of students; blank means unlimited.")
+    # Denormalized size of `students`, maintained by apps.courses.enrollment and the m2m_changed handler.
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+    # Weighted title/description tsvector, kept current by apps.search.signals (Postgres only).
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the course is deleted; the rows are then purged in the background (apps.assignments.deletion).
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='course_created_keyset_idx'),
+        ]
 
     def __str__(self):
         return self.title
\ No newline at end of file
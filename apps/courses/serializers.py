@@ -1,12 +1,57 @@
 from rest_framework import serializers
+from apps.accounts.models import StudentProfile
+from apps.accounts.serializers import TeacherProfileSerializer
+from utils.fieldsets import DynamicFieldsMixin
 from .models import Course
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # The roster lives at course/<pk>/students/, which checks who may see it; it is deliberately
+    # not expandable here.
+    student_count = serializers.IntegerField(source='enrolled_count', read_only=True)
+
     class Meta:
         model = Course
-        fields = ['id', 'title', 'description', 'teacher', 'students', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at','students','teacher']
-        
-        
+        fields = ['id', 'title', 'description', 'teacher', 'capacity', 'student_count', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'teacher']
+        expandable_fields = {'teacher': TeacherProfileSerializer}
+
+    def validate_capacity(self, value):
+        if value is not None and self.instance is not None and value < self.instance.enrolled_count:
+            raise serializers.ValidationError("Capacity cannot be lower than the number of enrolled students.")
+        return value
+
+    def update(self, instance, validated_data):
+        # Write only the edited columns: a full save() would put back the enrolled_count read with
+        # the course and undo enrollments committed in the meantime (see apps.courses.enrollment).
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+
 class CourseRegistrationSerializer(serializers.Serializer):
-    course_id = serializers.IntegerField(required=True)
\ No newline at end of file
+    course_id = serializers.IntegerField(required=True)
+
+
+class BulkEnrollmentSerializer(serializers.Serializer):
+    MAX_STUDENTS = 50000
+
+    student_ids = serializers.ListField(
+        child=serializers.CharField(max_length=50), required=False, max_length=MAX_STUDENTS
+    )
+    file = serializers.FileField(required=False, help_text="CSV with a `student_id` column, or one id per line.")
+
+    def validate(self, attrs):
+        if not attrs.get('student_ids') and not attrs.get('file'):
+            raise serializers.ValidationError("Provide either `student_ids` or a CSV `file`.")
+        return attrs
+
+
+class CourseRosterSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+    first_name = serializers.CharField(source='user.first_name', read_only=True)
+    last_name = serializers.CharField(source='user.last_name', read_only=True)
+
+    class Meta:
+        model = StudentProfile
+        fields = ['id', 'student_id', 'username', 'first_name', 'last_name']
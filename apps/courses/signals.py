@@ -0,0 +1,36 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .enrollment import sync_enrolled_counts
+from .models import Course
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_catalog_on_course_change(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def invalidate_catalog_on_enrollment_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_catalog_version()
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def sync_enrolled_count_on_enrollment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # course.students.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            sync_enrolled_counts([instance.pk])
+        return
+
+    # student.courses.add/remove/clear(...): pk_set holds course ids, except for clear,
+    # where the affected courses have to be captured before the rows go away.
+    if action == 'pre_clear':
+        instance._cleared_course_ids = list(instance.courses.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        sync_enrolled_counts(pk_set)
+    elif action == 'post_clear':
+        sync_enrolled_counts(getattr(instance, '_cleared_course_ids', []))
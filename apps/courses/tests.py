@@ -1,9 +1,21 @@
+from io import StringIO
+
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from apps.accounts.models import StudentProfile, TeacherProfile
+from apps.courses.enrollment import ENROLLED, enroll_student
 from apps.courses.models import Course
+from apps.courses.serializers import CourseSerializer
+from utils.middleware import QueryBudgetExceeded
+from utils.testing import QueryBudgetMixin, server_timing_queries
 
 class CourseRegistrationTests(APITestCase):
 
@@ -36,3 +48,355 @@ class CourseRegistrationTests(APITestCase):
         self.client.force_authenticate(user=self.student_user)
         response = self.client.post(self.register_url, {})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CourseListPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='pass123')
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1', password='pass123'))
+        self.courses = [
+            Course.objects.create(title=f'Course {i}', description='.', teacher=teacher)
+            for i in range(7)
+        ]
+        self.url = reverse('course-list')
+
+    def test_page_number_pagination_is_default(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_cursor_pagination_walks_forward_and_back(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 3})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+
+        seen = [c['id'] for c in response.data['results']]
+        pages = [response]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(c['id'] for c in response.data['results'])
+            pages.append(response)
+        self.assertEqual(seen, [c.id for c in self.courses])
+        self.assertEqual(len(pages), 3)
+
+        previous = self.client.get(pages[-1].data['previous'])
+        self.assertEqual(
+            [c['id'] for c in previous.data['results']],
+            [c['id'] for c in pages[1].data['results']],
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CourseCatalogTests(QueryBudgetMixin, APITestCase):
+
+    def setUp(self):
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        self.teacher_profile = TeacherProfile.objects.create(user=self.teacher_user)
+        self.outsider = User.objects.create_user(username='outsider', password='pass123')
+        StudentProfile.objects.create(user=self.outsider)
+
+        self.course = Course.objects.create(title='Biology', description='.', teacher=self.teacher_profile)
+        self.students = []
+        for i in range(4):
+            user = User.objects.create_user(username=f'student{i}', password='pass123', first_name=f'S{i}')
+            profile = StudentProfile.objects.create(user=user, student_id=f'S00{i}')
+            self.course.students.add(profile)
+            self.students.append(profile)
+        for i in range(3):
+            Course.objects.create(title=f'Empty {i}', description='.', teacher=self.teacher_profile)
+
+    def test_catalog_reports_student_count_not_ids(self):
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(reverse('course-list'))
+        course = next(c for c in response.data['results'] if c['id'] == self.course.id)
+        self.assertEqual(course['student_count'], 4)
+        self.assertNotIn('students', course)
+
+    def test_catalog_query_count_is_constant(self):
+        self.client.force_authenticate(user=self.outsider)
+        # COUNT for the paginator plus one page query, whatever the enrollment size.
+        with self.assertNumQueries(2):
+            self.client.get(reverse('course-list'))
+
+    def test_course_detail_reports_student_count(self):
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(reverse('course-detail', args=[self.course.id]))
+        self.assertEqual(response.data['student_count'], 4)
+
+    def test_enrolled_course_list(self):
+        self.client.force_authenticate(user=self.students[0].user)
+        response = self.client.get(reverse('student-courses'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c['id'] for c in response.data['results']], [self.course.id])
+        self.assertEqual(response.data['results'][0]['student_count'], 4)
+
+    def test_sparse_fieldset_reads_only_selected_columns(self):
+        self.client.force_authenticate(user=self.outsider)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('course-list'), {'fields': 'id,title'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+        self.assertNotIn('description', queries.captured_queries[-1]['sql'])
+
+    def test_expand_teacher(self):
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(reverse('course-list'), {'expand': 'teacher.user', 'fields': 'id,title'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+        course = next(c for c in response.data['results'] if c['id'] == self.course.id)
+        self.assertEqual(set(course), {'id', 'title', 'teacher'})
+        self.assertEqual(course['teacher']['user']['username'], 'teacher1')
+
+    def test_students_cannot_be_expanded(self):
+        # The roster is only visible through course/<pk>/students/, to the teacher and enrolled students.
+        self.client.force_authenticate(user=self.outsider)
+        for url in (reverse('course-list'), reverse('course-detail', args=[self.course.id])):
+            response = self.client.get(url, {'expand': 'students.user'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data, {'expand': ['students cannot be expanded.']})
+
+    def test_course_detail_fieldset(self):
+        self.client.force_authenticate(user=self.outsider)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('course-detail', args=[self.course.id]), {'fields': 'title,teacher.employee_id', 'expand': 'teacher'}
+            )
+        self.assertEqual(response.data, {'title': 'Biology', 'teacher': {'employee_id': self.teacher_profile.employee_id}})
+
+    def test_invalid_fieldset_is_rejected(self):
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(reverse('course-list'), {'fields': 'id,secret,teacher.bio', 'expand': 'description'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {
+            'expand': ['description cannot be expanded.'],
+            'fields': ['Unknown field: secret.', 'Expand teacher to select its fields.'],
+        })
+
+    def test_course_write_endpoints_stay_within_budget(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.put(
+            reverse('update-course', args=[self.course.id]), {'title': 'Biology II', 'description': '.'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+
+        response = self.client.delete(reverse('delete-course', args=[self.course.id]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertWithinBudget(response)
+
+    def test_requests_report_server_timing(self):
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(reverse('course-list'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertEqual(server_timing_queries(response), 2)
+
+    @override_settings(QUERY_BUDGETS={'course-list': 1}, QUERY_BUDGET_STRICT=True)
+    def test_over_budget_request_fails_in_strict_mode(self):
+        self.client.force_authenticate(user=self.outsider)
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('course-list'))
+
+    def test_roster_for_teacher(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(reverse('course-students', args=[self.course.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(response.data['results'][0]['username'], 'student0')
+        self.assertEqual(response.data['results'][0]['student_id'], 'S000')
+
+    def test_roster_for_enrolled_student(self):
+        self.client.force_authenticate(user=self.students[1].user)
+        response = self.client.get(reverse('course-students', args=[self.course.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_roster_hidden_from_outsiders(self):
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(reverse('course-students', args=[self.course.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RegistrationCatalogTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.student_user = User.objects.create_user(username='student1', password='pass123')
+        self.student_profile = StudentProfile.objects.create(user=self.student_user)
+        self.teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1', password='pass123'))
+        self.other_teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher2', password='pass123'))
+        self.algebra = Course.objects.create(title='Algebra', description='.', teacher=self.teacher)
+        self.poetry = Course.objects.create(title='Poetry', description='.', teacher=self.other_teacher)
+        self.url = reverse('register-course')
+        self.client.force_authenticate(user=self.student_user)
+
+    def get_catalog(self, **params):
+        return self.client.get(self.url, params)
+
+    def test_catalog_is_paginated(self):
+        response = self.get_catalog(page_size=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_catalog_filters(self):
+        response = self.get_catalog(teacher=self.other_teacher.id)
+        self.assertEqual([c['id'] for c in response.data['results']], [self.poetry.id])
+        response = self.get_catalog(title__icontains='alg')
+        self.assertEqual([c['id'] for c in response.data['results']], [self.algebra.id])
+
+    def test_catalog_pages_are_cached(self):
+        self.get_catalog()
+        self.client.force_authenticate(user=User.objects.get(pk=self.student_user.pk))
+        # Only the IsStudent profile lookup hits the database on a cache hit.
+        with self.assertNumQueries(1):
+            response = self.get_catalog()
+        self.assertEqual(response.data['count'], 2)
+
+    def test_course_changes_invalidate_catalog(self):
+        self.get_catalog()
+        Course.objects.create(title='Chemistry', description='.', teacher=self.teacher)
+        self.assertEqual(self.get_catalog().data['count'], 3)
+
+        self.poetry.delete()
+        self.assertEqual(self.get_catalog().data['count'], 2)
+
+    def test_enrollment_changes_invalidate_catalog(self):
+        self.get_catalog()
+        self.algebra.students.add(self.student_profile)
+        course = next(c for c in self.get_catalog().data['results'] if c['id'] == self.algebra.id)
+        self.assertEqual(course['student_count'], 1)
+
+
+class EnrollmentCapacityTests(APITestCase):
+
+    def setUp(self):
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1', password='pass123'))
+        self.course = Course.objects.create(title='Robotics', description='.', teacher=teacher, capacity=1)
+        self.first = StudentProfile.objects.create(user=User.objects.create_user(username='student1', password='pass123'))
+        self.second = StudentProfile.objects.create(user=User.objects.create_user(username='student2', password='pass123'))
+        self.register_url = reverse('register-course')
+        self.unregister_url = reverse('unregister-course')
+
+    def register(self, profile):
+        self.client.force_authenticate(user=profile.user)
+        return self.client.post(self.register_url, {'course_id': self.course.id})
+
+    def test_registration_updates_counter_without_touching_course(self):
+        updated_at = self.course.updated_at
+        response = self.register(self.first)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrolled_count, 1)
+        self.assertEqual(self.course.updated_at, updated_at)
+
+    def test_full_course_rejects_registration(self):
+        self.register(self.first)
+        response = self.register(self.second)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrolled_count, 1)
+        self.assertNotIn(self.second, self.course.students.all())
+
+    def test_repeat_registration_is_not_double_counted(self):
+        self.register(self.first)
+        response = self.register(self.first)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrolled_count, 1)
+
+    def test_unregister_frees_a_seat(self):
+        self.register(self.first)
+        self.client.post(self.unregister_url, {'course_id': self.course.id})
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrolled_count, 0)
+        self.assertEqual(self.register(self.second).status_code, status.HTTP_200_OK)
+
+    def test_course_update_keeps_concurrent_enrollments(self):
+        course = Course.objects.get(pk=self.course.pk)
+        # A registration commits after the teacher's update has read the course.
+        self.assertEqual(enroll_student(self.course.id, self.first.id), ENROLLED)
+        serializer = CourseSerializer(course, data={'title': 'Robotics II', 'description': '.', 'capacity': 1})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.title, self.course.enrolled_count), ('Robotics II', 1))
+        self.assertEqual(self.register(self.second).status_code, status.HTTP_409_CONFLICT)
+
+    def test_manager_changes_keep_counter_in_sync(self):
+        self.course.capacity = None
+        self.course.save()
+        self.course.students.add(self.first, self.second)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrolled_count, 2)
+
+        self.first.courses.remove(self.course)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrolled_count, 1)
+
+        self.second.courses.clear()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrolled_count, 0)
+
+
+class BulkEnrollmentTests(APITestCase):
+
+    def setUp(self):
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        teacher = TeacherProfile.objects.create(user=self.teacher_user)
+        self.other_teacher_user = User.objects.create_user(username='teacher2', password='pass123')
+        TeacherProfile.objects.create(user=self.other_teacher_user)
+        self.course = Course.objects.create(title='Statistics', description='.', teacher=teacher, capacity=2)
+        self.profiles = [
+            StudentProfile.objects.create(
+                user=User.objects.create_user(username=f'student{i}', password='pass123'),
+                student_id=f'R{i:04}',
+            )
+            for i in range(5)
+        ]
+        self.course.students.add(self.profiles[0])
+        self.url = reverse('bulk-enroll-course', args=[self.course.id])
+
+    def test_bulk_enroll_from_json(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        payload = {'student_ids': ['R0000', 'R0001', 'R0002', 'R0003', 'R0004', 'NOPE']}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['added'], 4)
+        self.assertEqual(response.data['skipped'], 1)
+        self.assertEqual(response.data['unknown'], 1)
+        self.assertEqual(response.data['unknown_ids'], ['NOPE'])
+        self.course.refresh_from_db()
+        # Registrar enrollment deliberately ignores capacity.
+        self.assertEqual(self.course.enrolled_count, 5)
+        self.assertEqual(self.course.students.count(), 5)
+
+    def test_bulk_enroll_from_csv(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        upload = SimpleUploadedFile('cohort.csv', b'name,student_id\nA,R0001\nB,R0002\n', content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['added'], 2)
+
+    def test_bulk_enroll_requires_input(self):
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_teacher_cannot_bulk_enroll(self):
+        self.client.force_authenticate(user=self.other_teacher_user)
+        response = self.client.post(self.url, {'student_ids': ['R0001']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('enroll_cohort', self.course.id, 'R0003', 'R0004', stdout=out)
+        self.assertIn('"added": 2', out.getvalue())
@@ -1,10 +1,14 @@
 from django.urls import path
 from apps.courses import views
+from utils.async_views import read_view
 
 urlpatterns = [
     path('create/course/', views.CreateCourseView.as_view(), name='create-course'),
-    path('courses/', views.AllCourseListView.as_view(), name='course-list'),
-    path('course/<int:pk>/', views.CourseDetailView.as_view(), name='course-detail'),
+    path('courses/', read_view(views.AllCourseListView), name='course-list'),
+    path('course/<int:pk>/', read_view(views.CourseDetailView), name='course-detail'),
+    path('course/<int:pk>/students/', views.CourseStudentListView.as_view(), name='course-students'),
+    path('courses/enrolled/', views.StudentCourseListView.as_view(), name='student-courses'),
+    path('course/<int:pk>/enroll/', views.BulkCourseEnrollmentView.as_view(), name='bulk-enroll-course'),
     path('course/register/',views.StudentCourseRegisterView.as_view(), name='register-course'),
     path('course/unregister/',views.StudentCourseUnregisterView.as_view(), name='unregister-course'),
     path('course/update/<int:pk>/', views.CourseUpdateView.as_view(), name='update-course'),
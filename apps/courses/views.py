@@ -1,13 +1,31 @@
-from django.shortcuts import render
+import csv
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from .models import Course
+from .cache import catalog_cache_key, catalog_cache_timeout
+from .enrollment import enroll_student, unenroll_student, bulk_enroll, read_student_ids_csv, COURSE_FULL
+from apps.accounts.models import StudentProfile
+from apps.assignments.deletion import delete_course
+from apps.jobs.serializers import JobSerializer
 from rest_framework import generics, status
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
-from .serializers import CourseSerializer, CourseRegistrationSerializer
+from .serializers import (
+    CourseSerializer,
+    CourseRegistrationSerializer,
+    CourseRosterSerializer,
+    BulkEnrollmentSerializer,
+)
 from permissions.is_teacher import IsTeacher
 from permissions.is_student import IsStudent
 from drf_yasg.utils import swagger_auto_schema
 from utils.decorators import skip_if_swagger
+from utils.fieldsets import FIELDSET_PARAMETERS, SparseFieldsetMixin
+from utils.rows import ValuesListMixin
 
 
 class CreateCourseView(generics.CreateAPIView):
@@ -48,7 +66,10 @@ class CourseDeleteView(generics.DestroyAPIView):
 
     @swagger_auto_schema(
         operation_summary="Delete your course",
-        operation_description="Allows a teacher to delete their own course."
+        operation_description="Allows a teacher to delete their own course. It disappears from the API at once, "
+                              "with its assignments and submissions; their rows and files are then purged in the "
+                              "background. The response is the purge job, to follow at `/api/jobs/<id>/`.",
+        responses={202: JobSerializer},
     )
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
@@ -57,43 +78,62 @@ class CourseDeleteView(generics.DestroyAPIView):
     def get_queryset(self):
         return Course.objects.filter(teacher=self.request.user.teacherprofile)
 
+    def destroy(self, request, *args, **kwargs):
+        job = delete_course(self.get_object(), request.user)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED,
+                        headers={'Location': reverse('job-detail', args=[job.id])})
 
-class AllCourseListView(generics.ListAPIView):
-    queryset = Course.objects.all()
+
+class AllCourseListView(ValuesListMixin, generics.ListAPIView):
+    queryset = Course.objects.order_by('created_at', 'id')
     serializer_class = CourseSerializer
+    keyset_ordering = ('created_at', 'id')
 
     @swagger_auto_schema(
         operation_summary="List all courses",
-        operation_description="Returns a list of all available courses."
+        operation_description="Returns a list of all available courses.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
 
-class CourseDetailView(generics.RetrieveAPIView):
+class CourseDetailView(SparseFieldsetMixin, generics.RetrieveAPIView):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
 
     @swagger_auto_schema(
         operation_summary="Get course detail",
-        operation_description="Retrieve details for a specific course."
+        operation_description="Retrieve details for a specific course.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
 
-class StudentCourseRegisterView(APIView):
+class StudentCourseRegisterView(generics.GenericAPIView):
     permission_classes = [IsStudent]
+    queryset = Course.objects.order_by('created_at', 'id')
+    serializer_class = CourseSerializer
+    filterset_fields = {'teacher': ['exact'], 'title': ['exact', 'icontains']}
+    keyset_ordering = ('created_at', 'id')
 
     @swagger_auto_schema(
         operation_summary="List all courses for registration",
-        operation_description="Returns all courses a student can register for.",
-        responses={200: CourseSerializer(many=True)}
+        operation_description="Returns a paginated page of courses a student can register for, filterable by "
+                              "`teacher`, `title` and `title__icontains`. Pages are served from a shared cache "
+                              "that is invalidated whenever a course or its enrollment changes."
     )
     def get(self, request):
-        courses = Course.objects.all()
-        serializer = CourseSerializer(courses, many=True)
-        return Response(serializer.data)
+        cache_key = catalog_cache_key(request)
+        data = cache.get(cache_key)
+        if data is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            data = self.get_paginated_response(serializer.data).data
+            cache.set(cache_key, data, catalog_cache_timeout())
+        return Response(data)
 
     @swagger_auto_schema(
         request_body=CourseRegistrationSerializer,
@@ -104,16 +144,47 @@ class StudentCourseRegisterView(APIView):
         serializer = CourseRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             course_id = serializer.validated_data['course_id']
-            try:
-                course = Course.objects.get(pk=course_id)
-                course.students.add(request.user.studentprofile)
-                course.save()
-                return Response({"message": "Successfully registered for the course."})
-            except Course.DoesNotExist:
+            if not Course.objects.filter(pk=course_id).exists():
                 return Response({"error": "Course not found."}, status=status.HTTP_404_NOT_FOUND)
+            if enroll_student(course_id, request.user.studentprofile.id) == COURSE_FULL:
+                return Response({"error": "Course is full."}, status=status.HTTP_409_CONFLICT)
+            return Response({"message": "Successfully registered for the course."})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkCourseEnrollmentView(APIView):
+    parser_classes = [JSONParser, MultiPartParser]
+
+    @swagger_auto_schema(
+        request_body=BulkEnrollmentSerializer,
+        operation_summary="Enroll a cohort",
+        operation_description="Lets the course teacher or an admin enroll many students at once, either as a JSON "
+                              "list of `student_ids` or as an uploaded CSV. Returns added/skipped/unknown counts. "
+                              "Capacity is not enforced for registrar enrollments."
+    )
+    def post(self, request, pk):
+        course = get_object_or_404(Course, pk=pk)
+        if not (request.user.is_staff or course.teacher.user_id == request.user.id):
+            return Response({"error": "Only the course teacher or an admin can enroll students."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        student_ids = list(serializer.validated_data.get('student_ids', []))
+        if serializer.validated_data.get('file'):
+            try:
+                student_ids += read_student_ids_csv(serializer.validated_data['file'])
+            except (UnicodeDecodeError, csv.Error):
+                return Response({"error": "Could not read the CSV file."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(student_ids) > BulkEnrollmentSerializer.MAX_STUDENTS:
+            return Response({"error": f"At most {BulkEnrollmentSerializer.MAX_STUDENTS} students per request."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(bulk_enroll(course, student_ids))
+
+
 class StudentCourseUnregisterView(APIView):
     permission_classes = [IsStudent]
 
@@ -127,26 +198,52 @@ class StudentCourseUnregisterView(APIView):
         if not course_id:
             return Response({"error": "course_id is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            course = Course.objects.get(pk=course_id)
-            course.students.remove(request.user.studentprofile)
-            return Response({"message": "Successfully unregistered from the course."})
-        except Course.DoesNotExist:
+        if not Course.objects.filter(pk=course_id).exists():
             return Response({"error": "Course not found."}, status=status.HTTP_404_NOT_FOUND)
+        unenroll_student(course_id, request.user.studentprofile.id)
+        return Response({"message": "Successfully unregistered from the course."})
 
 
-class StudentCourseListView(generics.ListAPIView):
+class StudentCourseListView(ValuesListMixin, generics.ListAPIView):
     permission_classes = [IsStudent]
     serializer_class = CourseSerializer
     filterset_fields = ['title']
 
     @swagger_auto_schema(
         operation_summary="List enrolled courses",
-        operation_description="Returns all courses the logged-in student is currently enrolled in."
+        operation_description="Returns all courses the logged-in student is currently enrolled in.",
+        manual_parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
     @skip_if_swagger(default_return=Course.objects.none())
     def get_queryset(self):
-        return Course.objects.filter(students=self.request.user.studentprofile)
\ No newline at end of file
+        enrolled = Course.students.through.objects.filter(studentprofile=self.request.user.studentprofile)
+        return Course.objects.filter(id__in=enrolled.values('course_id'))
+
+
+class CourseStudentListView(generics.ListAPIView):
+    serializer_class = CourseRosterSerializer
+    keyset_ordering = ('id',)
+
+    @swagger_auto_schema(
+        operation_summary="List a course's students",
+        operation_description="Paginated roster of a course, visible to its teacher and enrolled students."
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    @skip_if_swagger(default_return=StudentProfile.objects.none())
+    def get_queryset(self):
+        user = self.request.user
+        get_object_or_404(
+            Course.objects.filter(Q(teacher__user=user) | Q(students__user=user)).distinct(),
+            pk=self.kwargs['pk'],
+        )
+        return (
+            StudentProfile.objects
+            .filter(courses=self.kwargs['pk'])
+            .select_related('user')
+            .order_by('id')
+        )
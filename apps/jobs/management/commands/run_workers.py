@@ -0,0 +1,89 @@
+import multiprocessing
+import signal
+import time
+from contextlib import contextmanager
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.jobs.queue import Worker
+
+
+@contextmanager
+def _stopped_by_signals(handler):
+    previous = {signum: signal.signal(signum, handler) for signum in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        yield
+    finally:
+        for signum, old in previous.items():
+            signal.signal(signum, old)
+
+
+def _work(worker_options):
+    # The pool's entry point in each process (set up again under the spawn start method).
+    django.setup()
+    worker = Worker(**worker_options)
+    with _stopped_by_signals(worker.stop):
+        worker.run()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs (apps.jobs) from the database queue. Each process claims due jobs, "
+        "highest priority first, with SELECT ... FOR UPDATE SKIP LOCKED, so any number of "
+        "processes and hosts can share the queue. SIGTERM or Ctrl-C stops them once their "
+        "current job is done; a process that crashes is restarted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Worker processes; 1 runs in this process.")
+        parser.add_argument('--batch', type=int, default=1, help="Jobs each worker claims at a time.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when no job is due.")
+        parser.add_argument('--burst', action='store_true', help="Exit once no job is due instead of waiting.")
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1 or options['batch'] < 1:
+            raise CommandError("--processes and --batch must be at least 1.")
+        worker_options = {name: options[name] for name in ('batch', 'poll_interval', 'burst')}
+        if options['processes'] == 1:
+            worker = Worker(**worker_options)
+            self.stdout.write(f"Worker {worker.name} started.")
+            with _stopped_by_signals(worker.stop):
+                processed = worker.run()
+            self.stdout.write(f"Worker {worker.name} ran {processed} jobs.")
+            return
+        self.run_pool(options['processes'], worker_options)
+
+    def run_pool(self, count, worker_options):
+        # Children must not share the parent's database connections.
+        connections.close_all()
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+        stopping = False
+        processes = []
+
+        def stop(*args):
+            nonlocal stopping
+            stopping = True
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        def start():
+            process = context.Process(target=_work, args=(worker_options,))
+            process.start()
+            return process
+
+        with _stopped_by_signals(stop):
+            processes.extend(start() for _ in range(count))
+            self.stdout.write(f"Started {len(processes)} workers: {', '.join(str(p.pid) for p in processes)}.")
+            while True:
+                time.sleep(0.5)
+                for index, process in enumerate(processes):
+                    if stopping or process.is_alive() or process.exitcode == 0:
+                        continue
+                    self.stderr.write(f"Worker {process.pid} exited with {process.exitcode}; restarting it.")
+                    processes[index] = start()
+                if not any(process.is_alive() for process in processes):
+                    break
+        self.stdout.write("All workers stopped.")
@@ -0,0 +1,173 @@
+import logging
+import os
+import socket
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('edutrack.jobs')
+
+# Task name -> function, filled by @task in each app's tasks.py.
+TASKS = {}
+
+# The job whose task is running, for report_progress().
+_current_job = ContextVar('current_job', default=None)
+
+
+def task(name):
+    """
+    Register the decorated function as task ``name``. Workers call it with the job's payload as
+    keyword arguments; raising fails the attempt. A job can run more than once (after a failure,
+    or when its worker dies mid-run), so tasks should be safe to repeat.
+    """
+    def register(func):
+        if TASKS.setdefault(name, func) is not func:
+            raise ValueError(f"Task {name!r} is already registered.")
+        return func
+    return register
+
+
+def enqueue(name, payload=None, *, priority=0, run_at=None, max_attempts=None, owner=None):
+    """
+    Queue task ``name`` and return its Job. The row is written in the caller's transaction, so a
+    job enqueued by a view that then fails is never run. ``payload`` must be JSON-serializable.
+    ``owner`` may follow the job's status and progress through the API.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task {name!r}.")
+    return Job.objects.create(
+        task=name, payload=payload or {}, priority=priority, run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS, owner=owner,
+    )
+
+
+def _attempt(job):
+    # The job's row while this attempt still holds it: not yet requeued by requeue_stale() and
+    # claimed by another worker.
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by)
+
+
+def report_progress(**progress):
+    """
+    Replace the running job's ``progress`` with ``progress`` (JSON values). This is also the
+    job's heartbeat: it renews the lock, so requeue_stale() leaves a job alone for JOB_TIMEOUT
+    after its last report. A no-op outside a worker.
+    """
+    job = _current_job.get()
+    if job is not None:
+        _attempt(job).update(progress=progress, locked_at=timezone.now())
+
+
+def retry_delay(attempts):
+    """Seconds to wait after failed attempt number ``attempts``: doubling from JOB_RETRY_DELAY, capped."""
+    return min(settings.JOB_RETRY_DELAY * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_DELAY)
+
+
+def claim(worker, limit=1):
+    """
+    Mark up to ``limit`` due jobs as running for ``worker`` and return them, highest priority
+    first. The candidates are locked with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+    workers pass over each other's rows instead of queueing behind them, and no job is claimed twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by('-priority', 'run_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(id__in=ids).order_by('-priority', 'run_at', 'id'))
+
+
+def _after_failure(job, now):
+    if job.attempts < job.max_attempts:
+        return {'status': Job.QUEUED, 'run_at': now + timedelta(seconds=retry_delay(job.attempts))}
+    return {'status': Job.FAILED, 'finished_at': now}
+
+
+def run(job):
+    """
+    Run a claimed job and record the outcome: succeeded, queued again after a backoff, or failed
+    once it has used up its attempts. Returns whether it succeeded. The outcome is not recorded
+    if the job was requeued as stale meanwhile, as the newer attempt owns it then.
+    """
+    func = TASKS.get(job.task)
+    token = _current_job.set(job)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task {job.task!r}.")
+        func(**job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed on attempt %d of %d.", job.id, job.task, job.attempts, job.max_attempts)
+        _attempt(job).update(last_error=traceback.format_exc(), **_after_failure(job, timezone.now()))
+        return False
+    finally:
+        _current_job.reset(token)
+    _attempt(job).update(status=Job.SUCCEEDED, finished_at=timezone.now())
+    return True
+
+
+def requeue_stale(timeout=None):
+    """
+    Give jobs that have been running for longer than ``timeout`` seconds (JOB_TIMEOUT) since they
+    were claimed or last called report_progress(), whose worker was presumably killed, back to the
+    queue, or fail them if that was their last attempt. Returns how many were found.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=timeout or settings.JOB_TIMEOUT),
+    )
+    error = "The worker running this job stopped before it finished."
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(status=Job.FAILED, finished_at=now, last_error=error)
+    requeued = stale.update(status=Job.QUEUED, run_at=now, last_error=error)
+    return failed + requeued
+
+
+class Worker:
+    """
+    Claims and runs jobs until stop() is called or, with ``burst``, until none are due. Jobs
+    already claimed are always finished first, so stopping never strands a running job.
+    """
+
+    def __init__(self, name=None, batch=1, poll_interval=1.0, burst=False):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.batch = batch
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.stopping = False
+        self.processed = 0
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self):
+        while not self.stopping:
+            # As between requests: drop connections that broke or outlived CONN_MAX_AGE (unless a
+            # caller's transaction, such as a test's, is still using them).
+            if not transaction.get_connection().in_atomic_block:
+                close_old_connections()
+            jobs = claim(self.name, self.batch)
+            if not jobs:
+                if self.burst:
+                    break
+                requeue_stale()
+                time.sleep(self.poll_interval)
+                continue
+            for job in jobs:
+                run(job)
+                self.processed += 1
+        return self.processed
@@ -0,0 +1,10 @@
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'task', 'status', 'progress', 'attempts', 'max_attempts', 'run_at', 'created_at', 'finished_at']
+        read_only_fields = fields
@@ -0,0 +1,136 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.jobs.models import Job
+from apps.jobs.queue import Worker, claim, enqueue, report_progress, requeue_stale, run, task
+
+CALLS = []
+
+
+@task('tests.record')
+def record(value=None):
+    CALLS.append(value)
+
+
+@task('tests.fail')
+def fail():
+    raise RuntimeError("Boom")
+
+
+@task('tests.long')
+def long_running():
+    # Running for two hours by now, but still reporting progress.
+    Job.objects.update(locked_at=timezone.now() - timedelta(hours=2))
+    report_progress(step=1)
+    CALLS.append(requeue_stale(timeout=3600))
+
+
+@override_settings(JOB_MAX_ATTEMPTS=3, JOB_RETRY_DELAY=10, JOB_RETRY_MAX_DELAY=15)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_claims_by_priority_then_due_time(self):
+        now = timezone.now()
+        low = enqueue('tests.record', {'value': 'low'}, run_at=now - timedelta(minutes=5))
+        high = enqueue('tests.record', {'value': 'high'}, priority=10)
+        later = enqueue('tests.record', {'value': 'later'}, priority=20, run_at=now + timedelta(hours=1))
+
+        jobs = claim('worker-1', limit=5)
+        self.assertEqual([job.id for job in jobs], [high.id, low.id])
+        self.assertEqual({(job.status, job.attempts, job.locked_by) for job in jobs}, {(Job.RUNNING, 1, 'worker-1')})
+        self.assertEqual(claim('worker-2'), [])
+
+        for job in jobs:
+            self.assertTrue(run(job))
+        self.assertEqual(CALLS, ['high', 'low'])
+        self.assertEqual(Job.objects.get(pk=later.pk).status, Job.QUEUED)
+
+    def test_failures_back_off_then_fail(self):
+        job = enqueue('tests.fail')
+        delays = []
+        for attempt in range(3):
+            claimed, = claim('worker-1')
+            with self.assertLogs('edutrack.jobs', 'ERROR'):
+                self.assertFalse(run(claimed))
+            job.refresh_from_db()
+            delays.append(round((job.run_at - timezone.now()).total_seconds()))
+            # Make the retry due now.
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(delays[:2], [10, 15])
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 3))
+        self.assertIn("RuntimeError: Boom", job.last_error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_unknown_tasks_are_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue('tests.missing')
+
+    def test_stale_jobs_are_requeued(self):
+        job = enqueue('tests.record')
+        claim('worker-1')
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(requeue_stale(timeout=3600), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+
+    def test_progress_reports_keep_a_long_job_claimed(self):
+        job = enqueue('tests.long')
+        self.assertTrue(run(*claim('worker-1')))
+        self.assertEqual(CALLS, [0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.progress), (Job.SUCCEEDED, 1, {'step': 1}))
+
+    def test_stale_attempt_does_not_overwrite_the_next_one(self):
+        job = enqueue('tests.record', {'value': 'late'})
+        stale, = claim('worker-1')
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=2))
+        requeue_stale(timeout=3600)
+        current, = claim('worker-2')
+
+        # worker-1 was only slow, and finishes after worker-2 has taken the job over.
+        self.assertTrue(run(stale))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts), (Job.RUNNING, 'worker-2', 2))
+        self.assertTrue(run(current))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+
+    def test_burst_worker_runs_everything_due(self):
+        for value in range(5):
+            enqueue('tests.record', {'value': value})
+        enqueue('tests.fail', max_attempts=1)
+        with self.assertLogs('edutrack.jobs', 'ERROR'):
+            self.assertEqual(Worker(batch=2, burst=True).run(), 6)
+        self.assertEqual(sorted(CALLS), [0, 1, 2, 3, 4])
+        self.assertEqual(
+            dict(Job.objects.values_list('status').annotate(n=Count('id'))), {Job.SUCCEEDED: 5, Job.FAILED: 1},
+        )
+
+    def test_run_workers_command(self):
+        enqueue('tests.record', {'value': 'from command'})
+        out = StringIO()
+        call_command('run_workers', '--burst', stdout=out)
+        self.assertIn("ran 1 jobs", out.getvalue())
+        self.assertEqual(CALLS, ['from command'])
+        with self.assertRaises(CommandError):
+            call_command('run_workers', '--processes', '0')
+
+
+@skipUnless(connection.vendor == 'postgresql', "Concurrent claiming needs SKIP LOCKED (Postgres)")
+class WorkerPoolTests(TransactionTestCase):
+
+    def test_processes_share_the_queue_without_running_a_job_twice(self):
+        Job.objects.bulk_create([
+            Job(task='tests.record', payload={'value': value}, max_attempts=1) for value in range(40)
+        ])
+        call_command('run_workers', '--processes', '4', '--burst', stdout=StringIO())
+        self.assertEqual(Job.objects.filter(status=Job.SUCCEEDED, attempts=1).count(), 40)
@@ -0,0 +1,6 @@
+from django.urls import path
+from apps.jobs import views
+
+urlpatterns = [
+    path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job-detail'),
+]
@@ -0,0 +1,23 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import generics
+
+from utils.decorators import skip_if_swagger
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    serializer_class = JobSerializer
+
+    @swagger_auto_schema(
+        operation_summary="Get a background job's status",
+        operation_description="For work started on your behalf, such as deleting a course: `status` is queued, "
+                              "running, succeeded or failed (after `max_attempts`), and `progress` holds the "
+                              "counters the task reports as it goes."
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    @skip_if_swagger(default_return=Job.objects.none())
+    def get_queryset(self):
+        return Job.objects.filter(owner=self.request.user)
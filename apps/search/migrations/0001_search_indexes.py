@@ -0,0 +1,47 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TABLES = ('courses_course', 'assignments_assignment')
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_search_gin ON {table} USING gin (search_vector);'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_title_trgm ON {table} USING gin (title gin_trgm_ops);'
+        )
+        # Backfill rows that existed before the column did.
+        schema_editor.execute(
+            f"UPDATE {table} SET search_vector = "
+            f"setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('english', coalesce(description, '')), 'B');"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_gin;')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_title_trgm;')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('courses', '0005_search_vector'),
+        ('assignments', '0005_search_vector'),
+    ]
+
+    # GIN indexes are Postgres-only, so they are created here rather than declared in Meta;
+    # other backends fall back to plain icontains search.
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from apps.assignments.models import Assignment
+from apps.courses.models import Course
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    TYPES = ('all', 'courses', 'assignments')
+
+    q = serializers.CharField(min_length=2, max_length=200)
+    type = serializers.ChoiceField(choices=TYPES, default='all')
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class CourseSearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True, default=None)
+
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'teacher', 'rank']
+
+
+class AssignmentSearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True, default=None)
+
+    class Meta:
+        model = Assignment
+        fields = ['id', 'title', 'course', 'due_date', 'rank']
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.assignments.models import Assignment
+from apps.courses.models import Course
+from .vectors import refresh_search_vectors
+
+INDEXED_FIELDS = {'title', 'description'}
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Assignment)
+def update_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    refresh_search_vectors(sender.objects.filter(pk=instance.pk))
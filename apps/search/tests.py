@@ -0,0 +1,82 @@
+from unittest import skipUnless
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from apps.accounts.models import StudentProfile, TeacherProfile
+from apps.courses.models import Course
+from apps.assignments.models import Assignment
+
+
+class SearchTests(APITestCase):
+
+    def setUp(self):
+        self.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        teacher = TeacherProfile.objects.create(user=self.teacher_user)
+        self.student_user = User.objects.create_user(username='student1', password='pass123')
+        student = StudentProfile.objects.create(user=self.student_user)
+
+        self.astronomy = Course.objects.create(
+            title='Introduction to Astronomy', description='Stars, planets and galaxies.', teacher=teacher
+        )
+        self.cooking = Course.objects.create(
+            title='Cooking Basics', description='Knife skills and the science of heat.', teacher=teacher
+        )
+        self.astronomy.students.add(student)
+        self.visible = Assignment.objects.create(
+            title='Planet observation log', description='Observe Jupiter.', due_date='2025-12-31T23:59:00Z',
+            course=self.astronomy,
+        )
+        self.hidden = Assignment.objects.create(
+            title='Planet-shaped cake', description='Bake a planet.', due_date='2025-12-31T23:59:00Z',
+            course=self.cooking,
+        )
+        self.url = reverse('search')
+
+    def test_course_search(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url, {'q': 'astronomy', 'type': 'courses'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c['id'] for c in response.data['courses']['results']], [self.astronomy.id])
+        self.assertNotIn('assignments', response.data)
+
+    def test_assignment_search_is_limited_to_own_courses(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url, {'q': 'planet', 'type': 'assignments'})
+        self.assertEqual([a['id'] for a in response.data['assignments']['results']], [self.visible.id])
+
+        self.client.force_authenticate(user=self.teacher_user)
+        response = self.client.get(self.url, {'q': 'planet', 'type': 'assignments'})
+        self.assertEqual(
+            sorted(a['id'] for a in response.data['assignments']['results']),
+            sorted([self.visible.id, self.hidden.id]),
+        )
+
+    def test_query_is_required(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url, {'q': 'a'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @skipUnless(connection.vendor == 'postgresql', "Full-text search needs Postgres")
+    def test_fulltext_ranking_and_stemming(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url, {'q': 'galaxy', 'type': 'courses'})
+        self.assertEqual(response.data['courses']['match'], 'fulltext')
+        self.assertEqual([c['id'] for c in response.data['courses']['results']], [self.astronomy.id])
+
+    @skipUnless(connection.vendor == 'postgresql', "Trigram search needs Postgres")
+    def test_trigram_fallback_for_typos(self):
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url, {'q': 'Cooking Basiks', 'type': 'courses'})
+        self.assertEqual(response.data['courses']['match'], 'trigram')
+        self.assertEqual([c['id'] for c in response.data['courses']['results']], [self.cooking.id])
+
+    @skipUnless(connection.vendor == 'postgresql', "Search vectors are only stored on Postgres")
+    def test_search_vector_follows_edits(self):
+        self.cooking.title = 'Molecular Gastronomy'
+        self.cooking.save()
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.url, {'q': 'gastronomy', 'type': 'courses'})
+        self.assertEqual([c['id'] for c in response.data['courses']['results']], [self.cooking.id])
@@ -0,0 +1,27 @@
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+
+SEARCH_CONFIG = 'english'
+
+
+def search_supported():
+    return connection.vendor == 'postgresql'
+
+
+def document_vector():
+    """
+    Title matches rank above description matches. Shared by Course and Assignment.
+    """
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(queryset):
+    """
+    Recompute the stored search_vector for every row of the queryset in a single UPDATE.
+    Call this after bulk_create()/update() paths, which bypass the post_save signal.
+    """
+    if search_supported():
+        queryset.update(search_vector=document_vector())
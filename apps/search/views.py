@@ -0,0 +1,75 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.assignments.models import Assignment
+from apps.courses.models import Course
+from .serializers import (
+    SearchQuerySerializer,
+    CourseSearchResultSerializer,
+    AssignmentSearchResultSerializer,
+)
+from .vectors import SEARCH_CONFIG, search_supported
+
+TRIGRAM_THRESHOLD = 0.3
+
+
+def ranked_search(queryset, text, limit):
+    """
+    Full-text search against the stored, GIN-indexed search_vector, ranked with ts_rank.
+    If nothing matches (typically a typo) fall back to trigram similarity on the title, which
+    the pg_trgm GIN index serves through the % operator. Returns (rows, match_type).
+    """
+    if not search_supported():
+        rows = queryset.filter(Q(title__icontains=text) | Q(description__icontains=text)).order_by('id')[:limit]
+        return list(rows), 'contains'
+
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    rows = list(
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .order_by('-rank', 'id')[:limit]
+    )
+    if rows:
+        return rows, 'fulltext'
+
+    rows = list(
+        queryset.filter(title__trigram_similar=text)
+        .annotate(rank=TrigramSimilarity('title', text))
+        .filter(rank__gte=TRIGRAM_THRESHOLD)
+        .order_by('-rank', 'id')[:limit]
+    )
+    return rows, 'trigram'
+
+
+class SearchView(APIView):
+
+    @swagger_auto_schema(
+        query_serializer=SearchQuerySerializer,
+        operation_summary="Search courses and assignments",
+        operation_description="Ranked full-text search over course and assignment titles and descriptions, with a "
+                              "trigram fallback for misspellings. Assignments are limited to courses you teach or "
+                              "are enrolled in."
+    )
+    def get(self, request):
+        params = SearchQuerySerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+        text, kind, limit = (params.validated_data[key] for key in ('q', 'type', 'limit'))
+
+        data = {}
+        if kind in ('all', 'courses'):
+            rows, match = ranked_search(Course.objects.only('id', 'title', 'teacher_id'), text, limit)
+            data['courses'] = {'match': match, 'results': CourseSearchResultSerializer(rows, many=True).data}
+        if kind in ('all', 'assignments'):
+            rows, match = ranked_search(self.visible_assignments(), text, limit)
+            data['assignments'] = {'match': match, 'results': AssignmentSearchResultSerializer(rows, many=True).data}
+        return Response(data)
+
+    def visible_assignments(self):
+        user = self.request.user
+        courses = Course.objects.filter(Q(teacher__user=user) | Q(students__user=user)).values('id')
+        return Assignment.objects.filter(course_id__in=courses).only('id', 'title', 'course_id', 'due_date')
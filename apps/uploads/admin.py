@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import Blob, Upload
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('digest', 'size', 'created_at')
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'filename', 'size', 'blob', 'created_at')
+    list_select_related = ('owner', 'blob')
@@ -0,0 +1,195 @@
+import hashlib
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+
+from utils.storage import stored_object
+from .models import Blob, UploadChunk, blob_path
+
+
+class UploadError(ValueError):
+    pass
+
+
+class UploadConflict(UploadError):
+    """Another request was writing the same chunk at the same time."""
+
+
+class _HashingReader:
+    """Reads up to ``limit`` bytes from ``stream``, hashing them on the way through."""
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.remaining = limit
+        self.size = 0
+        self.hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.stream.read(size) if self.stream is not None and size else b''
+        self.remaining -= len(data)
+        self.size += len(data)
+        self.hash.update(data)
+        return data
+
+
+class _PartsReader:
+    """The part files of an upload read back to back, one open at a time."""
+
+    def __init__(self, storage, names):
+        self.storage = storage
+        self.names = iter(names)
+        self.current = None
+
+    def read(self, size=-1):
+        while True:
+            if self.current is None:
+                name = next(self.names, None)
+                if name is None:
+                    return b''
+                self.current = self.storage.open(name, 'rb')
+            data = self.current.read(size)
+            if data:
+                return data
+            self.current.close()
+            self.current = None
+
+
+def content_digest(chunk_size, chunk_digests):
+    """
+    The address of a file: SHA-256 over the chunk size and the SHA-256 of each chunk in order.
+    It is built from the digests taken as the chunks arrived, so finalizing never re-reads the
+    bytes, and equal files uploaded with the same chunk size share it.
+    """
+    digest = hashlib.sha256(b'%d:' % chunk_size)
+    for chunk_digest in chunk_digests:
+        digest.update(bytes.fromhex(chunk_digest))
+    return digest.hexdigest()
+
+
+def store_chunk(upload, index, stream, length, expected_digest=None):
+    """
+    Write chunk ``index`` of ``upload`` from ``stream`` (``length`` bytes, the request's
+    Content-Length) to its part file, replacing any earlier attempt, and record its digest.
+    Raises UploadError when the chunk is out of range, the wrong size or does not match
+    ``expected_digest``.
+    """
+    if not 0 <= index < upload.chunk_count:
+        raise UploadError(f"Chunk index must be between 0 and {upload.chunk_count - 1}.")
+    expected = upload.expected_chunk_size(index)
+    if length != expected:
+        raise UploadError(f"Chunk {index} must be {expected} bytes, got {length}.")
+
+    name = upload.part_name(index)
+    reader = _HashingReader(stream, expected)
+    default_storage.delete(name)
+    saved = default_storage.save(name, File(reader, name=name))
+    if saved != name:
+        # A concurrent attempt stored its part file first, so the storage picked another name,
+        # which finalize() would never read.
+        default_storage.delete(saved)
+        raise UploadConflict(f"Chunk {index} was being sent by another request at the same time; send it again.")
+    digest = reader.hash.hexdigest()
+    problem = None
+    if reader.size != expected:
+        problem = f"Chunk {index} ended after {reader.size} of {expected} bytes."
+    elif expected_digest and expected_digest.lower() != digest:
+        problem = f"Chunk {index} does not match its SHA-256."
+    if problem:
+        default_storage.delete(saved)
+        raise UploadError(problem)
+
+    # One upsert, which also settles two concurrent attempts at the same chunk.
+    chunk = UploadChunk(upload=upload, index=index, size=reader.size, digest=digest)
+    UploadChunk.objects.bulk_create(
+        [chunk], update_conflicts=True, unique_fields=['upload', 'index'], update_fields=['size', 'digest'],
+    )
+    return chunk
+
+
+def finalize(upload):
+    """
+    Turn a fully received upload into a Blob, reusing the stored blob when the same content is
+    already there. Returns ``(blob, created)``. Raises UploadError listing missing chunks.
+    """
+    digests = dict(upload.chunks.values_list('index', 'digest'))
+    missing = [index for index in range(upload.chunk_count) if index not in digests]
+    if missing:
+        raise UploadError(f"Missing chunks: {', '.join(map(str, missing[:20]))}.")
+
+    digest = content_digest(upload.chunk_size, [digests[index] for index in range(upload.chunk_count)])
+    while True:
+        # Assembling a large file can take minutes, so it happens outside any transaction.
+        name = None
+        if not Blob.objects.filter(digest=digest).exists():
+            parts = [upload.part_name(index) for index in range(upload.chunk_count)]
+            name = default_storage.save(blob_path(digest), File(_PartsReader(default_storage, parts), name=digest))
+
+        with transaction.atomic():
+            # The blob stays locked until the upload refers to it, so purge_uploads, which locks a
+            # blob and checks its references again before deleting it, cannot remove it in between.
+            blob = Blob.objects.select_for_update().filter(digest=digest).first()
+            created = False
+            if blob is None and name is not None:
+                try:
+                    with transaction.atomic():
+                        blob = Blob.objects.create(digest=digest, size=upload.size, file=name)
+                    created = True
+                except IntegrityError:
+                    # Finalized concurrently by another upload of the same content.
+                    blob = Blob.objects.select_for_update().get(digest=digest)
+            if blob is not None:
+                upload.blob = blob
+                upload.save(update_fields=['blob'])
+                discard_parts(upload, digests)
+
+        if blob is not None:
+            if name is not None and not created and name != blob.file.name:
+                default_storage.delete(name)
+            return blob, created
+        # The stored blob was purged between the check and the lock: store the content after all.
+
+
+def finalize_direct(upload):
+    """
+    Check that a direct upload's object arrived in the bucket with the declared size and content
+    type and turn it into a Blob. Returns ``(blob, True)``. Raises UploadError when the object is
+    missing; one with the wrong size or type is deleted, so the client can upload it again.
+    """
+    stored = stored_object(default_storage, upload.object_name)
+    if stored is None:
+        raise UploadError("The file has not been uploaded to storage yet.")
+    size, content_type = stored
+    problem = None
+    if size != upload.size:
+        problem = f"The stored file is {size} bytes, not {upload.size}."
+    elif content_type != upload.content_type:
+        problem = f"The stored file is {content_type or 'untyped'}, not {upload.content_type}."
+    if problem:
+        default_storage.delete(upload.object_name)
+        raise UploadError(problem)
+
+    blob = Blob.objects.create(size=size, file=upload.object_name)
+    upload.blob = blob
+    upload.save(update_fields=['blob'])
+    return blob, True
+
+
+def discard_parts(upload, indexes=None):
+    """
+    Delete the chunk rows of ``upload`` (``indexes``, when the caller already has them) and, once
+    that commits, their part files, so a rolled-back finalize can be retried. The object of a
+    direct upload that was never finalized goes too.
+    """
+    if indexes is None:
+        indexes = upload.chunks.values_list('index', flat=True)
+    names = [upload.part_name(index) for index in indexes]
+    if upload.direct and upload.blob_id is None:
+        names.append(upload.object_name)
+    upload.chunks.all().delete()
+
+    def delete_files():
+        for name in names:
+            default_storage.delete(name)
+    transaction.on_commit(delete_files)
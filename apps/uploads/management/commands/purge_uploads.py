@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.uploads.chunks import discard_parts
+from apps.uploads.models import Blob, Upload
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete uploads that were never finalized, with their part files, and stored blobs that no "
+        "upload, assignment or submission refers to, once they are older than UPLOAD_EXPIRY_HOURS. "
+        "Finalized uploads of that age are deleted too; their blobs stay while an assignment or "
+        "submission uses them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.UPLOAD_EXPIRY_HOURS)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+
+        uploads = 0
+        for upload in Upload.objects.filter(created_at__lt=cutoff).iterator():
+            discard_parts(upload)
+            upload.delete()
+            uploads += 1
+
+        blobs = 0
+        unreferenced = Blob.objects.filter(created_at__lt=cutoff, uploads=None, assignments=None, submissions=None)
+        for blob_id in list(unreferenced.values_list('pk', flat=True)):
+            with transaction.atomic():
+                # finalize() holds this lock while it reuses a blob: once we have it, check again
+                # that nothing has come to refer to the blob.
+                blob = Blob.objects.select_for_update().filter(pk=blob_id).first()
+                if blob is None or not unreferenced.filter(pk=blob_id).exists():
+                    continue
+                blob.delete()
+                transaction.on_commit(lambda file=blob.file: file.storage.delete(file.name))
+            blobs += 1
+        self.stdout.write(f"Deleted {uploads} uploads and {blobs} unreferenced blobs.")
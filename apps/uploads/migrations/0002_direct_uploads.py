@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='upload',
+            name='content_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='upload',
+            name='object_name',
+            field=models.CharField(blank=True, default='', help_text='Storage key of a direct upload.', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='blob',
+            name='digest',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,72 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import models
+
+
+def blob_path(digest):
+    return f'blobs/{digest[:2]}/{digest[2:4]}/{digest}'
+
+
+class Blob(models.Model):
+    """
+    A file stored once per distinct content, under its digest (see chunks.content_digest()), and
+    shared by every upload, assignment and submission of that content. Direct uploads go to the
+    bucket without passing through the app, so their content is never hashed: they have no
+    digest and are not shared.
+    """
+    digest = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    size = models.BigIntegerField()
+    file = models.FileField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.digest or self.file.name
+
+
+class Upload(models.Model):
+    """
+    A resumable upload: created with the file's name and size, filled chunk by chunk (each chunk
+    kept as a part file until then) and finalized into a Blob. A direct upload is instead sent
+    whole to ``object_name`` in the storage's bucket, and checked when it is finalized.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    object_name = models.CharField(max_length=255, blank=True, default='', help_text="Storage key of a direct upload.")
+    blob = models.ForeignKey(Blob, null=True, blank=True, on_delete=models.PROTECT, related_name='uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.id})"
+
+    @property
+    def direct(self):
+        return bool(self.object_name)
+
+    @property
+    def chunk_count(self):
+        # An empty file is one empty chunk.
+        return max(1, -(-self.size // self.chunk_size))
+
+    def expected_chunk_size(self, index):
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def part_name(self, index):
+        return f'uploads/parts/{self.id}/{index}'
+
+
+class UploadChunk(models.Model):
+    upload = models.ForeignKey(Upload, on_delete=models.CASCADE, related_name='chunks')
+    index = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    digest = models.CharField(max_length=64, help_text="SHA-256 of the chunk, hex.")
+
+    class Meta:
+        unique_together = ('upload', 'index')
+
+    def __str__(self):
+        return f"{self.upload_id} #{self.index}"
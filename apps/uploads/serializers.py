@@ -0,0 +1,70 @@
+import mimetypes
+import posixpath
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import Upload
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    chunk_count = serializers.ReadOnlyField()
+    direct = serializers.ReadOnlyField(help_text="Sent straight to the storage bucket rather than in chunks.")
+    received = serializers.SerializerMethodField(help_text="Indexes of the chunks stored so far.")
+    digest = serializers.CharField(source='blob.digest', read_only=True, default=None,
+                                   help_text="Content address, set once a chunked upload is finalized.")
+
+    class Meta:
+        model = Upload
+        fields = [
+            'id', 'filename', 'content_type', 'size', 'direct', 'chunk_size', 'chunk_count', 'received', 'digest',
+            'created_at',
+        ]
+        read_only_fields = ['id', 'chunk_size', 'created_at']
+        extra_kwargs = {'content_type': {'help_text': "Guessed from the file name when left out."}}
+
+    def get_received(self, upload):
+        if upload.blob_id:
+            return list(range(upload.chunk_count))
+        if upload.direct:
+            return []
+        return sorted(chunk.index for chunk in upload.chunks.all())
+
+    def validate_filename(self, value):
+        name = posixpath.basename(value.replace('\\', '/')).strip()
+        if not name:
+            raise serializers.ValidationError("A file name is required.")
+        return name
+
+    def validate_size(self, value):
+        if not 0 <= value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Size must be between 0 and {settings.UPLOAD_MAX_SIZE} bytes.")
+        return value
+
+    def validate(self, attrs):
+        content_type = attrs.get('content_type') or mimetypes.guess_type(attrs['filename'])[0] or 'application/octet-stream'
+        if settings.UPLOAD_CONTENT_TYPES and content_type not in settings.UPLOAD_CONTENT_TYPES:
+            raise serializers.ValidationError({'content_type': f"{content_type} files are not accepted."})
+        return {**attrs, 'content_type': content_type}
+
+
+class UploadField(serializers.PrimaryKeyRelatedField):
+    """
+    A finalized upload of the requesting user, by id, attached to a model instead of sending the
+    file itself; see attached_file().
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('write_only', True)
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        uploads = Upload.objects.filter(blob__isnull=False).select_related('blob')
+        request = self.context.get('request')
+        return uploads if request is None else uploads.filter(owner=request.user)
+
+
+def attached_file(upload, file_field='file'):
+    """The model field values that attach a finalized upload's blob as ``file_field``."""
+    return {file_field: upload.blob.file.name, 'blob': upload.blob, 'file_name': upload.filename}
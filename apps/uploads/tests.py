@@ -0,0 +1,418 @@
+import hashlib
+import io
+import tempfile
+import zipfile
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+import requests
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import StudentProfile, TeacherProfile
+from apps.assignments.models import Assignment, Submission
+from apps.courses.models import Course
+from apps.uploads.chunks import finalize
+from apps.uploads.models import Blob, Upload
+from utils.testing import QueryBudgetMixin
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=1000)
+class ChunkedUploadTests(QueryBudgetMixin, APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+        self.user = User.objects.create_user(username='student1', password='pass123')
+        self.client.force_authenticate(user=self.user)
+        self.data = bytes(range(256)) * 10  # 2560 bytes: chunks of 1000, 1000 and 560
+
+    def start(self, filename='lab.pdf', size=None):
+        response = self.client.post(reverse('create-upload'), {
+            'filename': filename, 'size': len(self.data) if size is None else size,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def put_chunk(self, upload_id, index, body, **headers):
+        return self.client.put(reverse('upload-chunk', args=[upload_id, index]), body,
+                               content_type='application/octet-stream', **headers)
+
+    def upload(self, filename='lab.pdf'):
+        upload = self.start(filename)
+        for index in range(upload['chunk_count']):
+            response = self.put_chunk(upload['id'], index, self.data[index * 1000:(index + 1) * 1000])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return self.client.post(reverse('finalize-upload', args=[upload['id']]))
+
+    def test_upload_resume_and_finalize(self):
+        upload = self.start('C:\\Users\\me\\lab.pdf')
+        self.assertEqual(upload['filename'], 'lab.pdf')
+        self.assertEqual((upload['chunk_size'], upload['chunk_count'], upload['received']), (1000, 3, []))
+
+        self.assertEqual(self.put_chunk(upload['id'], 2, self.data[2000:]).status_code, status.HTTP_200_OK)
+        response = self.put_chunk(upload['id'], 0, self.data[:1000],
+                                  HTTP_X_CHUNK_SHA256=hashlib.sha256(self.data[:1000]).hexdigest())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+
+        # Resuming: the client asks which chunks are still missing.
+        response = self.client.get(reverse('upload-detail', args=[upload['id']]))
+        self.assertEqual(response.data['received'], [0, 2])
+        self.assertWithinBudget(response)
+        response = self.client.post(reverse('finalize-upload', args=[upload['id']]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"error": "Missing chunks: 1."})
+
+        self.put_chunk(upload['id'], 1, self.data[1000:2000])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('finalize-upload', args=[upload['id']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['deduplicated'])
+        self.assertWithinBudget(response)
+
+        blob = Blob.objects.get()
+        self.assertEqual(response.data['digest'], blob.digest)
+        self.assertEqual((blob.size, blob.file.read()), (len(self.data), self.data))
+        self.assertFalse(default_storage.exists(f'uploads/parts/{upload["id"]}/0'))
+        self.assertEqual(self.put_chunk(upload['id'], 0, self.data[:1000]).status_code, status.HTTP_409_CONFLICT)
+
+    def test_rejects_bad_chunks(self):
+        upload = self.start()
+        for index, body, headers, error in (
+            (3, b'x' * 1000, {}, "Chunk index must be between 0 and 2."),
+            (0, b'x' * 999, {}, "Chunk 0 must be 1000 bytes, got 999."),
+            (2, b'x' * 1000, {}, "Chunk 2 must be 560 bytes, got 1000."),
+            (0, b'x' * 1000, {'HTTP_X_CHUNK_SHA256': '0' * 64}, "Chunk 0 does not match its SHA-256."),
+        ):
+            with self.subTest(index=index, error=error):
+                response = self.put_chunk(upload['id'], index, body, **headers)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.data, {"error": error})
+        self.assertFalse(default_storage.exists(f'uploads/parts/{upload["id"]}/0'))
+
+        response = self.client.post(reverse('create-upload'), {'filename': 'huge.iso', 'size': 10 ** 12}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_identical_files_are_stored_once(self):
+        first = self.upload('starter.py').data
+        self.client.force_authenticate(user=User.objects.create_user(username='student2', password='pass123'))
+        second = self.upload('my-copy.py').data
+
+        self.assertTrue(second['deduplicated'])
+        self.assertEqual(first['digest'], second['digest'])
+        self.assertEqual(Blob.objects.count(), 1)
+        self.assertEqual(Upload.objects.filter(blob__isnull=False).count(), 2)
+
+    def test_finalize_stores_the_file_outside_a_transaction(self):
+        depth = len(connection.atomic_blocks)
+        save = default_storage.save
+        depths = []
+
+        def save_and_record(*args, **kwargs):
+            depths.append(len(connection.atomic_blocks))
+            return save(*args, **kwargs)
+
+        with mock.patch.object(default_storage, 'save', save_and_record):
+            upload = self.start()
+            for index in range(3):
+                self.put_chunk(upload['id'], index, self.data[index * 1000:(index + 1) * 1000])
+            depths.clear()
+            response = self.client.post(reverse('finalize-upload', args=[upload['id']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(depths, [depth])
+
+    def test_finalize_stores_the_content_again_if_the_blob_is_purged_meanwhile(self):
+        self.upload()
+        old = Blob.objects.get()
+        again = self.start()
+        for index in range(3):
+            self.put_chunk(again['id'], index, self.data[index * 1000:(index + 1) * 1000])
+        lock = Blob.objects.select_for_update
+
+        def purge_meanwhile(*args, **kwargs):
+            # purge_uploads deletes the blob after finalize() has found it, before it is locked.
+            if Blob.objects.filter(pk=old.pk).exists():
+                Upload.objects.update(blob=None)
+                Blob.objects.filter(pk=old.pk).delete()
+            return lock(*args, **kwargs)
+
+        with mock.patch.object(Blob.objects, 'select_for_update', purge_meanwhile):
+            blob, created = finalize(Upload.objects.get(pk=again['id']))
+        self.assertTrue(created)
+        self.assertEqual(Blob.objects.get(), blob)
+        self.assertEqual(Upload.objects.get(pk=again['id']).blob, blob)
+        with default_storage.open(blob.file.name) as stored:
+            self.assertEqual(stored.read(), self.data)
+
+    def test_concurrent_attempts_at_a_chunk_conflict(self):
+        upload = self.start()
+        part = f'uploads/parts/{upload["id"]}/0'
+        save = default_storage.save
+
+        def save_after_other_attempt(name, content, *args, **kwargs):
+            # The other attempt stores its part file between this one's delete and save.
+            save(name, io.BytesIO(b'x' * 1000))
+            return save(name, content, *args, **kwargs)
+
+        with mock.patch.object(default_storage, 'save', save_after_other_attempt):
+            response = self.put_chunk(upload['id'], 0, self.data[:1000])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(default_storage.listdir(f'uploads/parts/{upload["id"]}')[1], ['0'])
+        self.assertFalse(Upload.objects.get(pk=upload['id']).chunks.exists())
+        self.assertTrue(default_storage.exists(part))
+
+    def test_uploads_are_private(self):
+        upload = self.start()
+        self.client.force_authenticate(user=User.objects.create_user(username='student2', password='pass123'))
+        self.assertEqual(self.client.get(reverse('upload-detail', args=[upload['id']])).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.put_chunk(upload['id'], 0, self.data[:1000]).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_abandon_deletes_parts(self):
+        upload = self.start()
+        self.put_chunk(upload['id'], 0, self.data[:1000])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('upload-detail', args=[upload['id']]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(default_storage.exists(f'uploads/parts/{upload["id"]}/0'))
+
+    def test_submit_with_finalized_upload(self):
+        student = StudentProfile.objects.create(user=self.user)
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1', password='pass123'))
+        course = Course.objects.create(title='Lab', teacher=teacher)
+        course.students.add(student)
+        assignment = Assignment.objects.create(title='Lab 1', description='.', due_date='2025-12-31T23:59:00Z', course=course)
+
+        upload_id = self.upload('lab report.pdf').data['id']
+        response = self.client.post(reverse('submit-assignment'), {
+            'assignment': assignment.id, 'student': student.id, 'content': 'See attached.', 'upload': upload_id,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['file_name'], 'lab report.pdf')
+
+        submission = Submission.objects.get()
+        blob = Blob.objects.get()
+        self.assertEqual((submission.blob, submission.file.name), (blob, blob.file.name))
+
+        # The teacher's ZIP names the file as it was uploaded.
+        self.client.force_authenticate(user=teacher.user)
+        response = self.client.get(reverse('assignment-submission-files', args=[assignment.id]))
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.read('student1/lab report.pdf'), self.data)
+
+    def test_download_submission_file(self):
+        student = StudentProfile.objects.create(user=self.user)
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1', password='pass123'))
+        assignment = Assignment.objects.create(
+            title='Lab 1', description='.', due_date='2025-12-31T23:59:00Z',
+            course=Course.objects.create(title='Lab', teacher=teacher),
+        )
+        upload_id = self.upload('lab report.pdf').data['id']
+        submission = self.client.post(reverse('submit-assignment'), {
+            'assignment': assignment.id, 'student': student.id, 'content': '.', 'upload': upload_id,
+        }, format='json').data
+
+        self.client.force_authenticate(user=teacher.user)
+        response = self.client.get(reverse('submission-file', args=[submission['id']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="lab report.pdf"')
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertWithinBudget(response)
+
+        self.client.force_authenticate(user=User.objects.create_user(username='student2', password='pass123'))
+        response = self.client.get(reverse('submission-file', args=[submission['id']]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_assignment_file_from_upload(self):
+        teacher = TeacherProfile.objects.create(user=self.user)
+        course = Course.objects.create(title='Lab', teacher=teacher)
+        upload_id = self.upload('brief.pdf').data['id']
+        response = self.client.post(reverse('create-assignment'), {
+            'title': 'Lab 1', 'description': '.', 'due_date': '2025-12-31T23:59:00Z', 'course': course.id,
+            'upload': upload_id,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['file_name'], 'brief.pdf')
+        assignment = Assignment.objects.get()
+        self.assertEqual(assignment.files.name, Blob.objects.get().file.name)
+
+        student = StudentProfile.objects.create(user=User.objects.create_user(username='student2', password='pass123'))
+        course.students.add(student)
+        self.client.force_authenticate(user=student.user)
+        response = self.client.get(reverse('assignment-file', args=[assignment.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertWithinBudget(response)
+
+        self.client.force_authenticate(user=User.objects.create_user(username='student3', password='pass123'))
+        response = self.client.get(reverse('assignment-file', args=[assignment.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_direct_upload_needs_s3(self):
+        response = self.client.post(reverse('create-direct-upload'), {'filename': 'lab.pdf', 'size': 10}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertFalse(Upload.objects.exists())
+
+    def test_cannot_submit_someone_elses_upload(self):
+        upload_id = self.upload().data['id']
+        other = User.objects.create_user(username='student2', password='pass123')
+        student = StudentProfile.objects.create(user=other)
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1', password='pass123'))
+        assignment = Assignment.objects.create(
+            title='Lab 1', description='.', due_date='2025-12-31T23:59:00Z',
+            course=Course.objects.create(title='Lab', teacher=teacher),
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.post(reverse('submit-assignment'), {
+            'assignment': assignment.id, 'student': student.id, 'content': '.', 'upload': upload_id,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('upload', response.data)
+
+    def test_purge_removes_stale_uploads_and_unreferenced_blobs(self):
+        stale = self.start()
+        self.put_chunk(stale['id'], 0, self.data[:1000])
+        self.upload()
+        Upload.objects.update(created_at=timezone.now() - timedelta(days=2))
+        Blob.objects.update(created_at=timezone.now() - timedelta(days=2))
+        blob_name = Blob.objects.get().file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('purge_uploads', stdout=io.StringIO())
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(default_storage.exists(blob_name))
+        self.assertFalse(default_storage.exists(f'uploads/parts/{stale["id"]}/0'))
+
+    def test_purge_keeps_a_blob_reused_while_it_runs(self):
+        self.upload()
+        Upload.objects.all().delete()
+        Blob.objects.update(created_at=timezone.now() - timedelta(days=2))
+        blob = Blob.objects.get()
+        again = self.start()
+        lock = Blob.objects.select_for_update
+
+        def finalize_meanwhile(*args, **kwargs):
+            # An upload of the same content reuses the blob and commits while the purge waits for
+            # its lock.
+            Upload.objects.filter(pk=again['id']).update(blob=blob)
+            return lock(*args, **kwargs)
+
+        with mock.patch.object(Blob.objects, 'select_for_update', finalize_meanwhile):
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('purge_uploads', stdout=io.StringIO())
+        self.assertTrue(Blob.objects.filter(pk=blob.pk).exists())
+        self.assertTrue(default_storage.exists(blob.file.name))
+
+
+@skipUnless(mock_aws, "S3 storage is tested against moto")
+class S3StorageTests(QueryBudgetMixin, APITestCase):
+    """FILE_STORAGE=s3, against moto's in-process S3 (which also answers the presigned requests)."""
+
+    def setUp(self):
+        self.enterContext(mock_aws())
+        self.enterContext(override_settings(
+            STORAGES={**settings.STORAGES, 'default': {'BACKEND': 'storages.backends.s3.S3Storage'}},
+            AWS_STORAGE_BUCKET_NAME='edu-bucket', AWS_S3_REGION_NAME='us-east-1', AWS_S3_ENDPOINT_URL=None,
+            AWS_ACCESS_KEY_ID='testing', AWS_SECRET_ACCESS_KEY='testing',
+        ))
+        default_storage.bucket.create()
+
+        self.user = User.objects.create_user(username='student1', password='pass123')
+        self.client.force_authenticate(user=self.user)
+        self.data = b'%PDF-1.7 ' + bytes(range(256)) * 4
+
+    def start(self, filename='report.pdf', size=None, **fields):
+        response = self.client.post(reverse('create-direct-upload'), {
+            'filename': filename, 'size': len(self.data) if size is None else size, **fields,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertWithinBudget(response)
+        return response.data
+
+    def send(self, upload, data):
+        form = upload['form']
+        return requests.post(form['url'], data=form['fields'], files={'file': (upload['filename'], data)})
+
+    def test_direct_upload_and_download(self):
+        upload = self.start()
+        self.assertEqual((upload['direct'], upload['content_type'], upload['received']), (True, 'application/pdf', []))
+        self.assertEqual(self.send(upload, self.data).status_code, 204)
+        response = self.client.put(reverse('upload-chunk', args=[upload['id'], 0]), self.data,
+                                   content_type='application/octet-stream')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        response = self.client.post(reverse('finalize-upload', args=[upload['id']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['digest'], response.data['deduplicated']), (None, False))
+        self.assertWithinBudget(response)
+        self.assertEqual(Blob.objects.get().file.name, f'uploads/direct/{upload["id"]}/report.pdf')
+
+        student = StudentProfile.objects.create(user=self.user)
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1', password='pass123'))
+        assignment = Assignment.objects.create(
+            title='Lab 1', description='.', due_date='2025-12-31T23:59:00Z',
+            course=Course.objects.create(title='Lab', teacher=teacher),
+        )
+        submission = self.client.post(reverse('submit-assignment'), {
+            'assignment': assignment.id, 'student': student.id, 'content': '.', 'upload': upload['id'],
+        }, format='json').data
+
+        # Downloads are redirected to the bucket rather than streamed by the app.
+        response = self.client.get(reverse('submission-file', args=[submission['id']]))
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertWithinBudget(response)
+        downloaded = requests.get(response['Location'])
+        self.assertEqual(downloaded.content, self.data)
+        self.assertEqual(downloaded.headers['Content-Disposition'], 'attachment; filename="report.pdf"')
+
+        self.client.force_authenticate(user=teacher.user)
+        response = self.client.get(reverse('assignment-submission-files', args=[assignment.id]))
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.read('student1/report.pdf'), self.data)
+
+    def test_finalize_checks_the_stored_file(self):
+        upload = self.start()
+        object_name = Upload.objects.get().object_name
+        response = self.client.post(reverse('finalize-upload', args=[upload['id']]))
+        self.assertEqual(response.data, {"error": "The file has not been uploaded to storage yet."})
+
+        # S3 itself refuses a form post outside the content-length-range; moto does not, and
+        # neither does a bucket written to by other means, so finalizing checks again.
+        self.assertEqual(self.send(upload, self.data + b'!').status_code, 204)
+        response = self.client.post(reverse('finalize-upload', args=[upload['id']]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"error": f"The stored file is {len(self.data) + 1} bytes, not {len(self.data)}."})
+        self.assertFalse(default_storage.exists(object_name))
+
+        default_storage.bucket.put_object(Key=object_name, Body=self.data, ContentType='text/plain')
+        response = self.client.post(reverse('finalize-upload', args=[upload['id']]))
+        self.assertEqual(response.data, {"error": "The stored file is text/plain, not application/pdf."})
+        self.assertFalse(Blob.objects.exists())
+
+        # The same form can be used again.
+        self.assertEqual(self.send(upload, self.data).status_code, 204)
+        response = self.client.post(reverse('finalize-upload', args=[upload['id']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_content_type_allowlist(self):
+        with override_settings(UPLOAD_CONTENT_TYPES=['application/pdf']):
+            response = self.client.post(reverse('create-direct-upload'), {'filename': 'notes.txt', 'size': 10}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'content_type': ["text/plain files are not accepted."]})
@@ -0,0 +1,10 @@
+from django.urls import path
+from apps.uploads import views
+
+urlpatterns = [
+    path('uploads/', views.CreateUploadView.as_view(), name='create-upload'),
+    path('uploads/direct/', views.CreateDirectUploadView.as_view(), name='create-direct-upload'),
+    path('uploads/<uuid:upload_id>/', views.UploadDetailView.as_view(), name='upload-detail'),
+    path('uploads/<uuid:upload_id>/chunks/<int:index>/', views.UploadChunkView.as_view(), name='upload-chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', views.FinalizeUploadView.as_view(), name='finalize-upload'),
+]
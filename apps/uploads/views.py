@@ -0,0 +1,144 @@
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.shortcuts import get_object_or_404
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from utils.decorators import skip_if_swagger
+from utils.storage import presigned_post, s3_bucket
+from .chunks import UploadConflict, UploadError, discard_parts, finalize, finalize_direct, store_chunk
+from .models import Upload
+from .serializers import UploadSerializer
+
+
+class CreateUploadView(generics.CreateAPIView):
+    serializer_class = UploadSerializer
+
+    @swagger_auto_schema(
+        operation_summary="Start a chunked upload",
+        operation_description="Declares a file by name and size. The response gives its `id`, the `chunk_size` to "
+                              "cut it into and the `chunk_count`; send each chunk with PUT, then finalize."
+    )
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user, chunk_size=settings.UPLOAD_CHUNK_SIZE)
+
+
+class CreateDirectUploadView(generics.GenericAPIView):
+    serializer_class = UploadSerializer
+
+    @swagger_auto_schema(
+        operation_summary="Start a direct upload",
+        operation_description="With S3 storage, declares a file by name, size and content type and returns a "
+                              "presigned `form`: POST its `fields` plus the file (as the last part, named `file`) "
+                              "to its `url` within `expires_in` seconds, then finalize the upload. The file goes "
+                              "straight to the bucket; the bucket rejects any other size or type.",
+        responses={201: UploadSerializer, 400: 'Invalid name, size or type.', 501: 'Storage is not S3.'},
+    )
+    def post(self, request):
+        if s3_bucket(default_storage) is None:
+            return Response({"error": "Direct uploads need FILE_STORAGE=s3; use a chunked upload instead."},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload_id = uuid.uuid4()
+        upload = serializer.save(
+            id=upload_id, owner=request.user, chunk_size=settings.UPLOAD_CHUNK_SIZE,
+            object_name=f"uploads/direct/{upload_id}/{serializer.validated_data['filename']}",
+        )
+        form = presigned_post(
+            default_storage, upload.object_name, upload.content_type, upload.size, settings.AWS_QUERYSTRING_EXPIRE,
+        )
+        return Response({**serializer.data, 'form': form, 'expires_in': settings.AWS_QUERYSTRING_EXPIRE},
+                        status=status.HTTP_201_CREATED)
+
+
+class UploadDetailView(generics.RetrieveDestroyAPIView):
+    serializer_class = UploadSerializer
+    lookup_url_kwarg = 'upload_id'
+
+    @swagger_auto_schema(
+        operation_summary="Get an upload's progress",
+        operation_description="Lists the chunks received so far, so an interrupted upload can resume with the "
+                              "missing ones. `digest` is set once it is finalized."
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_summary="Abandon an upload",
+        operation_description="Deletes an upload and the chunks stored for it. A finalized file stays available "
+                              "to submissions already linked to it."
+    )
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+    @skip_if_swagger(default_return=Upload.objects.none())
+    def get_queryset(self):
+        return Upload.objects.filter(owner=self.request.user).select_related('blob').prefetch_related('chunks')
+
+    def perform_destroy(self, instance):
+        discard_parts(instance, [chunk.index for chunk in instance.chunks.all()])
+        instance.delete()
+
+
+class UploadChunkView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Upload one chunk",
+        operation_description="Send chunk `index` (from 0) as the raw request body. Every chunk but the last is "
+                              "exactly `chunk_size` bytes. Sending an index again replaces it, so a failed chunk "
+                              "is simply retried. An optional `X-Chunk-SHA256` header is checked against the "
+                              "bytes received.",
+        manual_parameters=[
+            openapi.Parameter('X-Chunk-SHA256', openapi.IN_HEADER, type=openapi.TYPE_STRING,
+                              description="Hex SHA-256 of the chunk."),
+        ],
+        responses={200: 'The chunk was stored.', 400: 'Wrong index, size or checksum.', 404: 'Not found.',
+                   409: 'Already finalized, or the same chunk was being sent concurrently.'},
+    )
+    def put(self, request, upload_id, index):
+        upload = get_object_or_404(Upload, pk=upload_id, owner=request.user)
+        if upload.blob_id:
+            return Response({"error": "This upload is already finalized."}, status=status.HTTP_409_CONFLICT)
+        if upload.direct:
+            return Response({"error": "This upload goes straight to storage with its presigned form."},
+                            status=status.HTTP_409_CONFLICT)
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+            chunk = store_chunk(upload, index, request.stream, length, request.headers.get('X-Chunk-SHA256'))
+        except UploadConflict as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+        except UploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'index': chunk.index, 'size': chunk.size, 'digest': chunk.digest})
+
+
+class FinalizeUploadView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Finalize an upload",
+        operation_description="Assembles the chunks into the stored file. Content that is already stored is not "
+                              "stored again: `deduplicated` is true when the call stored no new file. For a direct "
+                              "upload, this is the confirmation: it checks the size and content type of the file "
+                              "that reached the bucket, and deletes it if they are wrong. Finalizing twice is "
+                              "harmless. Pass the returned `id` as `upload` when submitting an assignment or "
+                              "attaching assignment files.",
+        responses={200: UploadSerializer, 400: 'Chunks are missing, or the stored file is wrong.', 404: 'Not found.'},
+    )
+    def post(self, request, upload_id):
+        upload = get_object_or_404(Upload.objects.select_related('blob'), pk=upload_id, owner=request.user)
+        created = False
+        if upload.blob_id is None:
+            try:
+                _, created = finalize_direct(upload) if upload.direct else finalize(upload)
+            except UploadError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**UploadSerializer(upload).data, 'deduplicated': not created})
@@ -0,0 +1,139 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from utils.benchmark import summarize
+from .bench_edutrack import SCENARIOS, Command as EndpointBenchmark
+from .seed_edutrack import SEED_PASSWORD, SEED_PREFIX
+
+# The read endpoints that have async twins (see utils.async_views.read_view).
+READ_ENDPOINTS = (
+    'course-list', 'course-detail', 'student-list', 'teacher-list',
+    'pending-assignment', 'student-pending-assignments', 'submitted-assignment',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test a running deployment over HTTP at increasing concurrency, with real JWTs for "
+        "users from a seed_edutrack data set, and print throughput, latency percentiles and "
+        "status codes per concurrency level as JSON. Run it once against the sync deployment "
+        "(gunicorn core.wsgi) and once against the async one (uvicorn core.asgi with "
+        "ASYNC_VIEWS=True) on the same data, and compare the reports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', default='1,8,32,128', help="Comma-separated client concurrency levels.")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per concurrency level.")
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help=f"URL names to mix (repeatable; default: {', '.join(READ_ENDPOINTS)}).")
+        parser.add_argument('--label', default='', help="Free-form name for the deployment under test, e.g. gunicorn-sync.")
+        parser.add_argument('--timeout', type=float, default=30.0, help="Per-request timeout in seconds.")
+        parser.add_argument('--samples', type=int, default=50)
+        parser.add_argument('--prefix', default=SEED_PREFIX)
+        parser.add_argument('--password', default=SEED_PASSWORD)
+        parser.add_argument('--output', help="Also write the JSON report to this file.")
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        names = options['endpoints'] or list(READ_ENDPOINTS)
+        unknown = sorted(name for name in names if name not in SCENARIOS or SCENARIOS[name][1] != 'get')
+        if unknown:
+            raise CommandError(f"Not a benchmarkable GET endpoint: {', '.join(unknown)}")
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError("--concurrency must be a comma-separated list of integers.")
+
+        rng = random.Random(options['seed'])
+        samples = EndpointBenchmark().build_samples(options['prefix'], options['password'], options['samples'], rng)
+        targets = self.build_targets(names, samples, options['base_url'])
+        rng.shuffle(targets)
+
+        report = {
+            'meta': {
+                'label': options['label'],
+                'base_url': options['base_url'],
+                'endpoints': names,
+                'requests_per_level': options['requests'],
+                'started_at': timezone.now().isoformat(),
+            },
+            'levels': {
+                str(level): self.run_level(targets, level, options['requests'], options['timeout'])
+                for level in levels
+            },
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        self.stdout.write(output)
+
+    @staticmethod
+    def build_targets(names, samples, base_url):
+        targets = []
+        for name in names:
+            role, method, build = SCENARIOS[name]
+            for sample in samples:
+                if role not in sample['tokens']:
+                    continue
+                url_args, params = build(sample)
+                targets.append((
+                    urljoin(base_url, reverse(name, args=url_args)),
+                    params,
+                    {'Authorization': f"Bearer {sample['tokens'][role]}"},
+                ))
+        if not targets:
+            raise CommandError("No sample has the data these endpoints need; run seed_edutrack first.")
+        return targets
+
+    def run_level(self, targets, concurrency, total, timeout):
+        local = threading.local()
+        lock = threading.Lock()
+        counter = iter(range(total))
+        statuses = Counter()
+        timings = []
+
+        def worker():
+            # One keep-alive connection per client thread.
+            session = getattr(local, 'session', None) or requests.Session()
+            local.session = session
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                url, params, headers = targets[i % len(targets)]
+                started = time.perf_counter()
+                try:
+                    status = session.get(url, params=params, headers=headers, timeout=timeout).status_code
+                except requests.RequestException as exc:
+                    status = type(exc).__name__
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with lock:
+                    statuses[str(status)] += 1
+                    timings.append(elapsed_ms)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        wall_s = time.perf_counter() - started
+
+        self.stderr.write(f"concurrency {concurrency}: {len(timings) / wall_s:.0f} req/s")
+        return {
+            'statuses': dict(sorted(statuses.items())),
+            'latency': summarize(timings),
+            'throughput_per_s': round(len(timings) / wall_s, 1),
+            'wall_s': round(wall_s, 2),
+        }
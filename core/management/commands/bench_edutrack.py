@@ -0,0 +1,307 @@
+import io
+import json
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from apps.accounts.authentication import RoleClaimsJWTAuthentication
+from apps.accounts.models import StudentProfile
+from apps.accounts.serializers import RoleTokenObtainPairSerializer
+from apps.assignments.models import Assignment, Submission
+from apps.assignments.views import pending_assignments_for
+from apps.courses.models import Course
+from apps.jobs.models import Job
+from apps.uploads.chunks import store_chunk
+from apps.uploads.models import Upload
+from core.openapi import encode_schema, generate_schema
+from utils.benchmark import percentile, summarize, time_call
+from utils.middleware import query_budget
+from utils.testing import server_timing_queries
+from .seed_edutrack import SEED_PASSWORD, SEED_PREFIX, seed_users
+
+UPLOAD_SAMPLE_SIZE = 256 * 1024
+
+# url name -> (role, method, request builder). Builders take a sample (see build_samples) and
+# return (reverse args, payload). Every request runs in a transaction that is rolled back, so
+# writes can be measured repeatedly against the same data set.
+SCENARIOS = {
+    # accounts
+    'rest_login': ('anonymous', 'post', lambda s: ([], {'username': s['student'].username, 'password': s['password']})),
+    'rest_logout': ('student', 'post', lambda s: ([], {})),
+    'rest_register': ('anonymous', 'post', lambda s: ([], {
+        'username': f"bench-{s['rng'].getrandbits(48):x}", 'password1': 'Bench-pass-123',
+        'password2': 'Bench-pass-123', 'first_name': 'Bench', 'last_name': 'User',
+    })),
+    'student-list': ('student', 'get', lambda s: ([], {})),
+    'teacher-list': ('student', 'get', lambda s: ([], {})),
+    'student-profile': ('student', 'get', lambda s: ([], {})),
+    'teacher-profile': ('teacher', 'get', lambda s: ([], {})),
+    'update-student-profile': ('student', 'put', lambda s: ([], {})),
+    'update-teacher-profile': ('teacher', 'put', lambda s: ([], {'bio': 'Updated by bench_edutrack.'})),
+    'auth-cache-stats': ('staff', 'get', lambda s: ([], {})),
+    # courses
+    'create-course': ('teacher', 'post', lambda s: ([], {'title': 'Bench course', 'description': 'Created by bench.'})),
+    'course-list': ('student', 'get', lambda s: ([], {})),
+    'course-detail': ('student', 'get', lambda s: ([s['course']], {})),
+    'course-students': ('teacher', 'get', lambda s: ([s['course']], {})),
+    'student-courses': ('student', 'get', lambda s: ([], {})),
+    'bulk-enroll-course': ('teacher', 'post', lambda s: ([s['course']], {'student_ids': s['registrar_ids']})),
+    'register-course': ('student', 'post', lambda s: ([], {'course_id': s['other_course']})),
+    'unregister-course': ('student', 'post', lambda s: ([], {'course_id': s['course']})),
+    'update-course': ('teacher', 'put', lambda s: ([s['course']], {'title': 'Renamed by bench', 'description': '.'})),
+    'delete-course': ('teacher', 'delete', lambda s: ([s['course']], {})),
+    # assignments
+    'create-assignment': ('teacher', 'post', lambda s: ([], {
+        'title': 'Bench assignment', 'description': '.', 'course': s['course'], 'due_date': s['due_date'],
+    })),
+    'update-assignment': ('teacher', 'put', lambda s: ([s['assignment']], {
+        'title': 'Renamed by bench', 'description': '.', 'course': s['course'], 'due_date': s['due_date'],
+    })),
+    'delete-assignment': ('teacher', 'delete', lambda s: ([s['assignment']], {})),
+    'assignment-file': ('student', 'get', lambda s: ([s['assignment']], {})),
+    'teacher-all-assignments': ('teacher', 'get', lambda s: ([s['course']], {})),
+    'teacher-assignment-submission-ungraded': ('teacher', 'get', lambda s: ([s['course']], {})),
+    'teacher-assignment-submission-graded': ('teacher', 'get', lambda s: ([s['course']], {})),
+    'teacher-gradebook': ('teacher', 'get', lambda s: ([s['course']], {})),
+    'assignment-submission-files': ('teacher', 'get', lambda s: ([s['assignment']], {})),
+    'bulk-grade-assignments': ('teacher', 'post', lambda s: ([], {
+        'grades': [{'submission_id': pk, 'grade': 'B'} for pk in s['submissions']],
+    })),
+    'grade-assignment': ('teacher', 'post', lambda s: ([s['submissions'][0]], {'grade': 'A'})),
+    'submission-content': ('teacher', 'get', lambda s: ([s['submissions'][0]], {})),
+    'submission-file': ('teacher', 'get', lambda s: ([s['submissions'][0]], {})),
+    'submit-assignment': ('student', 'post', lambda s: ([], {
+        'assignment': s['pending'], 'student': s['student_profile'], 'content': 'Bench work.',
+    })),
+    'submitted-assignment': ('student', 'get', lambda s: ([s['course']], {})),
+    'pending-assignment': ('student', 'get', lambda s: ([s['course']], {})),
+    'student-pending-assignments': ('student', 'get', lambda s: ([], {})),
+    'student-dashboard': ('student', 'get', lambda s: ([], {})),
+    # search
+    'search': ('student', 'get', lambda s: ([], {'q': s['rng'].choice(('biology', 'statistics', 'lab report', 'histroy'))})),
+    # uploads (bytes payloads are sent as a raw body)
+    'create-upload': ('student', 'post', lambda s: ([], {'filename': 'bench.bin', 'size': 3 * UPLOAD_SAMPLE_SIZE})),
+    'create-direct-upload': ('student', 'post', lambda s: ([], {'filename': 'bench.pdf', 'size': UPLOAD_SAMPLE_SIZE})),
+    'upload-detail': ('student', 'get', lambda s: ([s['upload']], {})),
+    'upload-chunk': ('student', 'put', lambda s: ([s['upload'], 0], s['upload_data'])),
+    'finalize-upload': ('student', 'post', lambda s: ([s['upload']], {})),
+    # jobs
+    'job-detail': ('teacher', 'get', lambda s: ([s['job']], {})),
+}
+
+# Scenarios whose sample may legitimately lack what they need (e.g. a student with nothing pending).
+REQUIRES = {
+    'submit-assignment': 'pending',
+    'grade-assignment': 'submissions',
+    'submission-content': 'submissions',
+    'submission-file': 'submissions',
+    'assignment-file': 'assignment',
+    'assignment-submission-files': 'assignment',
+    'bulk-grade-assignments': 'submissions',
+    'delete-assignment': 'assignment',
+    'update-assignment': 'assignment',
+}
+
+# Form-encoded rather than JSON: the registration signal reads request.POST.
+FORM_ENDPOINTS = {'rest_login', 'rest_register'}
+
+
+def iter_url_names(patterns=None, namespace=None):
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(pattern.url_patterns, pattern.namespace or namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}:{pattern.name}' if namespace else pattern.name
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every named API endpoint through the Django test client with real JWTs for users "
+        "from a seed_edutrack data set, and print per-endpoint latency percentiles, queries per "
+        "request and throughput as JSON (diff the output between releases). Each request is "
+        "rolled back, so the data set is left unchanged."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Measured requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--samples', type=int, default=50, help="Distinct course/teacher/student combinations to rotate through.")
+        parser.add_argument('--endpoint', action='append', dest='endpoints', help="Only these URL names (repeatable).")
+        parser.add_argument('--prefix', default=SEED_PREFIX)
+        parser.add_argument('--password', default=SEED_PASSWORD)
+        parser.add_argument('--output', help="Also write the JSON report to this file.")
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        names = options['endpoints'] or list(SCENARIOS)
+        unknown = sorted(set(names) - set(SCENARIOS))
+        if unknown:
+            raise CommandError(f"No scenario for: {', '.join(unknown)}")
+
+        # The test client talks to the 'testserver' host. Stored files are not rolled back with
+        # the transactions, so the upload endpoints write to a throwaway MEDIA_ROOT.
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], MEDIA_ROOT=media_root,
+        ):
+            samples = self.build_samples(options['prefix'], options['password'], options['samples'], rng)
+            try:
+                endpoints = {
+                    name: self.run_endpoint(name, samples, options['requests'], options['warmup'])
+                    for name in names
+                }
+            finally:
+                Upload.objects.filter(pk__in=[sample['upload'] for sample in samples]).delete()
+                Job.objects.filter(pk__in=[sample['job'] for sample in samples]).delete()
+
+        report = {
+            'meta': {
+                'backend': connection.vendor,
+                'started_at': timezone.now().isoformat(),
+                'requests_per_endpoint': options['requests'],
+                'samples': len(samples),
+                'openapi': self.time_schema_generation(),
+            },
+            'endpoints': endpoints,
+            'not_benchmarked': sorted(
+                name for name in set(iter_url_names()) - set(SCENARIOS)
+                if not name.startswith('admin:') and name != 'schema-swagger-ui'
+            ),
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        self.stdout.write(output)
+
+    def time_schema_generation(self, runs=5):
+        # What /swagger/?format=openapi costs per hit without OPENAPI_PRECOMPUTED, and what
+        # build_openapi pays once instead.
+        timings = []
+        for _ in range(runs):
+            schema, elapsed = time_call(generate_schema)
+            timings.append(elapsed)
+        return {'generation': summarize(timings), 'json_bytes': len(encode_schema(schema, 'json'))}
+
+    def build_samples(self, prefix, password, count, rng):
+        courses = list(
+            Course.objects.filter(teacher__user__in=seed_users(prefix), enrolled_count__gt=0)
+            .select_related('teacher__user')
+            .order_by('?')[:count]
+        )
+        if not courses:
+            raise CommandError(f"No seeded courses with students for prefix '{prefix}'; run seed_edutrack first.")
+        staff = seed_users(prefix).filter(is_staff=True).first()
+        all_course_ids = list(Course.objects.values_list('id', flat=True)[:10_000])
+        registrar_ids = list(
+            StudentProfile.objects.filter(user__in=seed_users(prefix))
+            .exclude(student_id=None).values_list('student_id', flat=True)[:5_000]
+        )
+
+        samples = []
+        for course in courses:
+            student = (
+                StudentProfile.objects.filter(courses=course).select_related('user').order_by('?').first()
+            )
+            enrolled = set(student.courses.values_list('id', flat=True))
+            others = [course_id for course_id in all_course_ids if course_id not in enrolled]
+            samples.append({
+                'rng': rng,
+                'password': password,
+                'course': course.id,
+                'other_course': rng.choice(others) if others else course.id,
+                'teacher': course.teacher.user,
+                'student': student.user,
+                'student_profile': student.id,
+                'assignment': Assignment.objects.filter(course=course).values_list('id', flat=True).first(),
+                'pending': pending_assignments_for(student).filter(course=course).values_list('id', flat=True).first(),
+                'submissions': list(
+                    Submission.objects.filter(assignment__course=course).values_list('id', flat=True)[:100]
+                ),
+                'registrar_ids': rng.sample(registrar_ids, min(100, len(registrar_ids))),
+                'due_date': (timezone.now() + timedelta(days=14)).isoformat(),
+                'staff': staff,
+            })
+        for sample in samples:
+            # A one-chunk upload with its chunk already received, to resend and finalize.
+            sample['upload_data'] = rng.randbytes(UPLOAD_SAMPLE_SIZE)
+            upload = Upload.objects.create(
+                owner=sample['student'], filename='bench.bin', size=UPLOAD_SAMPLE_SIZE, chunk_size=settings.UPLOAD_CHUNK_SIZE,
+            )
+            store_chunk(upload, 0, io.BytesIO(sample['upload_data']), UPLOAD_SAMPLE_SIZE)
+            sample['upload'] = str(upload.pk)
+            # A finished job of the teacher's, to poll.
+            sample['job'] = Job.objects.create(
+                task='bench', status=Job.SUCCEEDED, max_attempts=1, owner=sample['teacher'],
+                progress={'done': 1}, finished_at=timezone.now(),
+            ).pk
+            sample['tokens'] = {
+                role: str(RoleTokenObtainPairSerializer.get_token(sample[role]).access_token)
+                for role in ('teacher', 'student', 'staff') if sample[role] is not None
+            }
+        return samples
+
+    def run_endpoint(self, name, samples, requests, warmup):
+        role, method, build = SCENARIOS[name]
+        usable = [
+            sample for sample in samples
+            if (role == 'anonymous' or role in sample['tokens']) and (name not in REQUIRES or sample[REQUIRES[name]])
+        ]
+        if not usable:
+            return {'skipped': 'no sample has the data this endpoint needs'}
+
+        # Server errors are reported as 500s in the statuses rather than aborting the run.
+        client = Client(raise_request_exception=False)
+        authenticator = RoleClaimsJWTAuthentication()
+        statuses = Counter()
+        timings, queries = [], []
+        for i in range(warmup + requests):
+            sample = usable[i % len(usable)]
+            url_args, payload = build(sample)
+            kwargs = {}
+            if role != 'anonymous':
+                token = sample['tokens'][role]
+                kwargs['HTTP_AUTHORIZATION'] = f"Bearer {token}"
+                # Measure the steady state, where the user is in the auth cache after an earlier
+                # request (one that updated the user or its profile has invalidated it).
+                authenticator.get_user_entry(authenticator.get_validated_token(token))
+            if method == 'get':
+                kwargs['data'] = payload
+            elif isinstance(payload, bytes):
+                kwargs.update(data=payload, content_type='application/octet-stream')
+            elif name in FORM_ENDPOINTS:
+                kwargs['data'] = payload
+            else:
+                kwargs.update(data=json.dumps(payload), content_type='application/json')
+
+            with transaction.atomic():
+                started = time.perf_counter()
+                response = getattr(client, method)(reverse(name, args=url_args), **kwargs)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+
+            if i < warmup:
+                continue
+            statuses[response.status_code] += 1
+            timings.append(elapsed_ms)
+            queries.append(server_timing_queries(response))
+
+        return {
+            'role': role,
+            'method': method.upper(),
+            'statuses': {str(code): n for code, n in sorted(statuses.items())},
+            'latency': summarize(timings),
+            'queries': {'p50': percentile(queries, 50), 'max': max(queries)},
+            'query_budget': query_budget(name),
+            'throughput_per_s': round(len(timings) / (sum(timings) / 1000), 1),
+        }
@@ -0,0 +1,47 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.openapi import CODECS, SCHEMA_FILES, encode_schema, generate_schema
+
+STATIC_SOURCE = Path(settings.BASE_DIR) / 'core' / 'static'
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once and write it as static files (core/static/openapi/schema.json "
+        "and .yaml), to be collected by collectstatic and served by whitenoise when OPENAPI_PRECOMPUTED "
+        "is on. Run it at build time, before collectstatic. With --check, only verify that the files "
+        "are up to date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', action='append', dest='formats', choices=sorted(CODECS),
+                            help="Formats to write (repeatable; default: all).")
+        parser.add_argument('--output-dir', default=str(STATIC_SOURCE),
+                            help="Static source directory the openapi/ files are written under.")
+        parser.add_argument('--check', action='store_true',
+                            help="Exit with an error if the files on disk differ from a fresh schema.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        schema = generate_schema()
+        generation_ms = (time.perf_counter() - started) * 1000
+
+        stale = []
+        for fmt in options['formats'] or sorted(CODECS):
+            path = Path(options['output_dir']) / SCHEMA_FILES[fmt]
+            content = encode_schema(schema, fmt)
+            if options['check']:
+                if not path.exists() or path.read_bytes() != content:
+                    stale.append(str(path))
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            self.stdout.write(f"Wrote {path} ({len(content) / 1024:.1f} KiB)")
+
+        if stale:
+            raise CommandError(f"OpenAPI schema is out of date: {', '.join(stale)}. Run manage.py build_openapi.")
+        self.stderr.write(f"Generated the schema in {generation_ms:.0f} ms.")
@@ -0,0 +1,228 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.accounts.models import StudentProfile, TeacherProfile
+from apps.assignments.models import Assignment, Submission
+from apps.courses.cache import bump_catalog_version
+from apps.courses.enrollment import Enrollment, sync_enrolled_counts
+from apps.courses.models import Course
+from apps.search.vectors import refresh_search_vectors
+from utils.bulkload import bulk_load
+
+SEED_PREFIX = 'seed'
+SEED_PASSWORD = 'edutrack-seed'
+
+SUBJECTS = (
+    'Algebra', 'Biology', 'Chemistry', 'Databases', 'Economics', 'Film', 'Geometry', 'History',
+    'Italian', 'Journalism', 'Kinematics', 'Linguistics', 'Music', 'Networks', 'Optics',
+    'Philosophy', 'Quantum Physics', 'Rhetoric', 'Statistics', 'Thermodynamics',
+)
+LEVELS = ('Introduction to', 'Foundations of', 'Advanced', 'Topics in', 'Applied')
+TASKS = ('Problem set', 'Lab report', 'Essay', 'Reading response', 'Project milestone', 'Quiz')
+GRADES = ('A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'D', 'F')
+
+
+def seed_users(prefix):
+    return User.objects.filter(username__startswith=f'{prefix}-')
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load a synthetic EduTrack data set (users, profiles, courses, enrollments, "
+        "assignments, submissions) at production-like volume. Uses COPY on Postgres and batched "
+        "bulk_create elsewhere. Seeded users are named <prefix>-s<n>/<prefix>-t<n>, plus a staff "
+        "user <prefix>-admin, all with the password given by --password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50_000)
+        parser.add_argument('--teachers', type=int, default=1_000)
+        parser.add_argument('--courses', type=int, default=2_000)
+        parser.add_argument('--courses-per-student', type=int, default=8)
+        parser.add_argument('--assignments-per-course', type=int, default=25)
+        parser.add_argument('--submissions', type=int, default=5_000_000,
+                            help="Target number of submissions; capped by the assignments students can see.")
+        parser.add_argument('--graded-ratio', type=float, default=0.6)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--prefix', default=SEED_PREFIX)
+        parser.add_argument('--password', default=SEED_PASSWORD)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--flush', action='store_true', help="Delete a previous data set with the same prefix first.")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if seed_users(prefix).exists():
+            if not options['flush']:
+                raise CommandError(f"Data with prefix '{prefix}' already exists; pass --flush to replace it.")
+            self.flush(prefix)
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.report = {'backend': connection.vendor, 'tables': {}}
+        started = time.perf_counter()
+
+        teacher_ids = self.load_profiles(TeacherProfile, f'{prefix}-t', options['teachers'], options['password'])
+        student_ids = self.load_profiles(StudentProfile, f'{prefix}-s', options['students'], options['password'])
+        self.load_users('staff users', [f'{prefix}-admin'], options['password'], is_staff=True)
+
+        course_ids = self.load_courses(teacher_ids, options['courses'])
+        assignments_by_course = self.load_assignments(course_ids, options['assignments_per_course'])
+        enrolled = self.load_enrollments(student_ids, course_ids, options['courses_per_student'])
+        self.load_submissions(enrolled, assignments_by_course, options['submissions'], options['graded_ratio'])
+
+        self.step('derived', self.refresh_derived, course_ids)
+        self.report['seconds'] = round(time.perf_counter() - started, 1)
+        self.stdout.write(json.dumps(self.report, indent=2))
+
+    def step(self, name, func, *args):
+        started = time.perf_counter()
+        rows = func(*args)
+        seconds = time.perf_counter() - started
+        self.report['tables'][name] = {
+            'rows': rows,
+            'seconds': round(seconds, 2),
+            'rows_per_s': round(rows / seconds) if rows and seconds else None,
+        }
+        self.stderr.write(f"{name}: {rows} rows in {seconds:.1f}s")
+
+    def load(self, name, model, fields, rows):
+        self.step(name, bulk_load, model, fields, rows, self.batch_size)
+
+    def load_users(self, name, usernames, password, is_staff=False):
+        # One hash for everyone: hashing 50k passwords would dominate the run.
+        password_hash = make_password(password)
+        rows = (
+            (username, password_hash, '', '', f'{username}@example.com',
+             is_staff, is_staff, True, self.now)
+            for username in usernames
+        )
+        fields = ('username', 'password', 'first_name', 'last_name', 'email',
+                  'is_staff', 'is_superuser', 'is_active', 'date_joined')
+        self.load(name, User, fields, rows)
+
+    def load_profiles(self, model, username_prefix, count, password):
+        usernames = [f'{username_prefix}{i}' for i in range(count)]
+        self.load_users(f'{model._meta.model_name} users', usernames, password)
+        user_ids = list(
+            User.objects.filter(username__startswith=username_prefix).order_by('id').values_list('id', flat=True)
+        )
+        if model is StudentProfile:
+            fields = ('user_id', 'student_id', 'active')
+            rows = ((user_id, f'{username_prefix.upper()}{i:07}', True) for i, user_id in enumerate(user_ids))
+        else:
+            fields = ('user_id', 'employee_id', 'bio', 'active')
+            rows = ((user_id, f'{username_prefix.upper()}{i:05}', None, True) for i, user_id in enumerate(user_ids))
+        self.load(model._meta.model_name, model, fields, rows)
+        return list(
+            model.objects.filter(user__username__startswith=username_prefix).order_by('id').values_list('id', flat=True)
+        )
+
+    def load_courses(self, teacher_ids, count):
+        rng = self.rng
+        rows = []
+        for i in range(count):
+            subject = SUBJECTS[i % len(SUBJECTS)]
+            title = f'{rng.choice(LEVELS)} {subject} {100 + i // len(SUBJECTS)}'
+            created = self.now - timedelta(days=rng.randint(30, 720))
+            rows.append((
+                title[:100], f'{title}: lectures, readings and graded work in {subject.lower()}.',
+                rng.choice(teacher_ids), None, 0, created, created,
+            ))
+        fields = ('title', 'description', 'teacher_id', 'capacity', 'enrolled_count', 'created_at', 'updated_at')
+        self.load('courses', Course, fields, rows)
+        return list(Course.objects.filter(teacher_id__in=teacher_ids).order_by('id').values_list('id', flat=True))
+
+    def load_assignments(self, course_ids, per_course):
+        rng = self.rng
+        rows = (
+            (
+                f'{rng.choice(TASKS)} {number + 1}', 'Complete the attached work and submit before the deadline.',
+                course_id, self.now + timedelta(days=rng.randint(-90, 60)), self.now, self.now, '',
+            )
+            for course_id in course_ids
+            for number in range(per_course)
+        )
+        fields = ('title', 'description', 'course_id', 'due_date', 'created_at', 'updated_at', 'file_name')
+        self.load('assignments', Assignment, fields, rows)
+
+        by_course = {}
+        assignments = Assignment.objects.filter(course_id__in=course_ids).values_list('id', 'course_id', 'due_date')
+        for assignment_id, course_id, due_date in assignments.iterator(chunk_size=self.batch_size):
+            by_course.setdefault(course_id, []).append((assignment_id, due_date))
+        return by_course
+
+    def load_enrollments(self, student_ids, course_ids, per_student):
+        per_student = min(per_student, len(course_ids))
+        enrolled = {student_id: self.rng.sample(course_ids, per_student) for student_id in student_ids}
+        rows = (
+            (course_id, student_id)
+            for student_id, courses in enrolled.items()
+            for course_id in courses
+        )
+        self.load('enrollments', Enrollment, ('course_id', 'studentprofile_id'), rows)
+        return enrolled
+
+    def load_submissions(self, enrolled, assignments_by_course, target, graded_ratio):
+        rng = self.rng
+        available = sum(len(assignments_by_course.get(c, ())) for courses in enrolled.values() for c in courses)
+        ratio = min(1.0, target / available) if available else 0
+        content = 'Submitted work.'
+        # COPY skips pre_save(), which fills in the content's length/excerpt/digest columns.
+        summary = Submission._meta.get_field('content').summary(content)
+
+        def rows():
+            for student_id, courses in enrolled.items():
+                for course_id in courses:
+                    for assignment_id, due_date in assignments_by_course.get(course_id, ()):
+                        if rng.random() >= ratio:
+                            continue
+                        submitted_at = min(self.now, due_date + timedelta(hours=rng.randint(-240, 24)))
+                        graded = rng.random() < graded_ratio
+                        yield (
+                            assignment_id, student_id, content, None, '', None, submitted_at,
+                            graded, rng.choice(GRADES) if graded else None, *summary.values(),
+                        )
+
+        fields = (
+            'assignment_id', 'student_id', 'content', 'file', 'file_name', 'link', 'submitted_at', 'reviewed', 'grade',
+            *summary,
+        )
+        self.load('submissions', Submission, fields, rows())
+
+    def refresh_derived(self, course_ids):
+        # Everything above bypassed save() and signals: recount enrollments, build search
+        # vectors, invalidate the cached catalog and refresh planner statistics.
+        sync_enrolled_counts(course_ids)
+        courses = Course.objects.filter(pk__in=course_ids)
+        refresh_search_vectors(courses)
+        refresh_search_vectors(Assignment.objects.filter(course__in=courses))
+        bump_catalog_version()
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for model in (User, StudentProfile, TeacherProfile, Course, Enrollment, Assignment, Submission):
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        return len(course_ids)
+
+    def flush(self, prefix):
+        # Children first, so each delete is a single statement instead of a cascade collection.
+        users = seed_users(prefix)
+        teachers = TeacherProfile.objects.filter(user__in=users)
+        Submission.objects.filter(student__user__in=users).delete()
+        Submission.objects.filter(assignment__course__teacher__in=teachers).delete()
+        Assignment.objects.filter(course__teacher__in=teachers).delete()
+        Enrollment.objects.filter(Q(course__teacher__in=teachers) | Q(studentprofile__user__in=users)).delete()
+        Course.objects.filter(teacher__in=teachers).delete()
+        StudentProfile.objects.filter(user__in=users).delete()
+        teachers.delete()
+        users.delete()
+        self.stderr.write(f"Flushed data set '{prefix}'.")
@@ -0,0 +1,59 @@
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import HttpResponse, HttpResponseRedirect
+from django.template.loader import render_to_string
+from django.views import View
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import SwaggerUIRenderer
+
+API_INFO = openapi.Info(
+    title="EduTrack API",
+    default_version='v1',
+    description="Test and document EduTrack API endpoints",
+)
+
+# Static paths of the files written by `manage.py build_openapi` (under core/static/).
+SCHEMA_FILES = {
+    'json': 'openapi/schema.json',
+    'yaml': 'openapi/schema.yaml',
+}
+CODECS = {
+    'json': OpenAPICodecJson,
+    'yaml': OpenAPICodecYaml,
+}
+
+
+def generate_schema():
+    """
+    The public schema of every endpoint, as served by the live /swagger/ view minus ``host`` and
+    ``schemes``, which Swagger UI then takes from the page it is loaded from.
+    """
+    return OpenAPISchemaGenerator(API_INFO).get_schema(request=None, public=True)
+
+
+def encode_schema(schema, fmt):
+    return CODECS[fmt](validators=[]).encode(schema)
+
+
+class _PrecomputedSwaggerUIRenderer(SwaggerUIRenderer):
+
+    def get_swagger_ui_settings(self):
+        return {**super().get_swagger_ui_settings(), 'url': staticfiles_storage.url(SCHEMA_FILES['json'])}
+
+
+class PrecomputedSwaggerUIView(View):
+    """
+    /swagger/ when ``OPENAPI_PRECOMPUTED`` is on: the same Swagger UI page, loading the schema
+    built by ``manage.py build_openapi`` from static files instead of introspecting every view
+    on each hit. ``?format=openapi`` redirects to that file.
+    """
+
+    def get(self, request):
+        if request.GET.get('format') == 'openapi':
+            return HttpResponseRedirect(staticfiles_storage.url(SCHEMA_FILES['json']))
+        renderer = _PrecomputedSwaggerUIRenderer()
+        context = {'request': request}
+        renderer.set_context(context)
+        context['title'] = API_INFO.title
+        return HttpResponse(render_to_string(renderer.template, context, request), content_type='text/html; charset=utf-8')
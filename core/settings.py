@@ -41,9 +41,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
+    'core',
     'apps.accounts',
     'apps.courses',
     'apps.assignments',
+    'apps.search',
+    'apps.uploads',
+    'apps.jobs',
     'rest_framework',
     'rest_framework.authtoken',
     'allauth',
@@ -56,7 +61,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'utils.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,8 +69,70 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'utils.db_router.ReplicaRoutingMiddleware',
+    'utils.middleware.QueryInstrumentationMiddleware',
 ]
 
+# Upper bound on SQL queries per request, by URL name, enforced by
+# utils.middleware.QueryInstrumentationMiddleware. Counts are for a request authenticated from
+# JWT role claims whose user is already in the auth user cache (no user or profile lookups) and
+# include savepoints. Over-budget requests are logged as warnings, and fail the test suite
+# (QUERY_BUDGET_STRICT is on under the test runner).
+QUERY_BUDGETS = {
+    # accounts
+    'rest_register': 12,
+    'rest_login': 9,
+    'rest_logout': 2,
+    'student-list': 2,
+    'student-profile': 2,
+    'teacher-list': 2,
+    'teacher-profile': 1,
+    'update-student-profile': 3,
+    'update-teacher-profile': 3,
+    'auth-cache-stats': 1,
+    # courses
+    'create-course': 2,
+    'course-list': 2,
+    'course-detail': 1,
+    'course-students': 3,
+    'student-courses': 3,
+    'bulk-enroll-course': 8,
+    'register-course': 8,
+    'unregister-course': 5,
+    'update-course': 3,
+    'delete-course': 6,
+    # assignments
+    'create-assignment': 4,
+    'update-assignment': 5,
+    'delete-assignment': 5,
+    'assignment-file': 1,
+    'teacher-all-assignments': 2,
+    'teacher-assignment-submission-ungraded': 2,
+    'teacher-assignment-submission-graded': 2,
+    'teacher-gradebook': 5,
+    'assignment-submission-files': 2,
+    'bulk-grade-assignments': 4,
+    'grade-assignment': 2,
+    'submission-content': 2,
+    'submission-file': 1,
+    'submit-assignment': 5,
+    'submitted-assignment': 2,
+    'pending-assignment': 2,
+    'student-pending-assignments': 2,
+    'student-dashboard': 2,
+    # search
+    'search': 4,
+    # uploads
+    'create-upload': 2,
+    'create-direct-upload': 1,
+    'upload-detail': 5,
+    'upload-chunk': 2,
+    'finalize-upload': 11,
+    # jobs
+    'job-detail': 1,
+}
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -85,6 +152,12 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
+
+# Serve the hot read endpoints (course list/detail, pending/submitted assignments, profile lists)
+# from async views. Turn on when running under an ASGI server (uvicorn core.asgi:application);
+# under WSGI the sync views are faster. See utils.async_views.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
 
 
 # Database
@@ -108,6 +181,77 @@ DATABASES = {
     }
 }
 
+# Optional read replica. Set DB_REPLICA_HOST (and/or DB_REPLICA_NAME/DB_REPLICA_PORT) to route
+# safe-method requests to it; see utils.db_router. Pointing DB_REPLICA_NAME at a second database
+# on the same server is enough to exercise the routing locally.
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+if DB_REPLICA_HOST or DB_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': DB_REPLICA_NAME or DATABASES['default']['NAME'],
+        'HOST': DB_REPLICA_HOST or DATABASES['default']['HOST'],
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['utils.db_router.ReplicaRouter']
+# Seconds a client stays on the primary after a write (read-your-writes window).
+PRIMARY_PIN_SECONDS = config('PRIMARY_PIN_SECONDS', default=10, cast=int)
+
+# Codec for submission content (utils.fields.CompressedTextField): 'gzip', 'zstd' (needs the
+# zstandard package) or 'none'. Shorter texts are stored uncompressed. Each value records its
+# codec, so changing this only affects new writes.
+CONTENT_COMPRESSION = config('CONTENT_COMPRESSION', default='gzip')
+CONTENT_COMPRESSION_MIN_BYTES = config('CONTENT_COMPRESSION_MIN_BYTES', default=1024, cast=int)
+
+# Chunked uploads (apps.uploads): the chunk size handed to new uploads, the largest file accepted,
+# and how many hours an unfinished upload's parts (or an unreferenced blob) are kept before
+# `manage.py purge_uploads` removes them.
+UPLOAD_CHUNK_SIZE = config('UPLOAD_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=2 * 1024 ** 3, cast=int)
+UPLOAD_EXPIRY_HOURS = config('UPLOAD_EXPIRY_HOURS', default=24, cast=int)
+# Content types accepted for uploads (comma-separated, e.g. 'application/pdf,image/png'); any when empty.
+UPLOAD_CONTENT_TYPES = config('UPLOAD_CONTENT_TYPES', default='', cast=Csv())
+
+# Background jobs (apps.jobs, run by `manage.py run_workers`): attempts before a job is marked
+# failed, the delay after the first failure (doubled after each further one, up to the maximum),
+# and how many seconds a job may run without reporting progress before it is assumed to have lost
+# its worker and is queued again. Keep JOB_TIMEOUT above the longest stretch between reports.
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+JOB_RETRY_DELAY = config('JOB_RETRY_DELAY', default=10, cast=int)
+JOB_RETRY_MAX_DELAY = config('JOB_RETRY_MAX_DELAY', default=3600, cast=int)
+JOB_TIMEOUT = config('JOB_TIMEOUT', default=3600, cast=int)
+
+
+# Cache
+# Per-process memory by default; set REDIS_URL to share cached pages between workers.
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+COURSE_CATALOG_CACHE_TIMEOUT = config('COURSE_CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+
+# Resolved users for JWT authentication: per-process LRU size and TTL (seconds), and whether
+# misses fall through to the shared cache above before hitting the database.
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+AUTH_USER_CACHE_SHARED = config('AUTH_USER_CACHE_SHARED', default=bool(REDIS_URL), cast=bool)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -148,41 +292,87 @@ STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Uploaded files (assignment and submission files, upload chunks and blobs). 'filesystem' keeps
+# them under MEDIA_ROOT and passes every byte through the app; 's3' keeps them in an S3-compatible
+# bucket (AWS, or MinIO and the like through AWS_S3_ENDPOINT_URL) that clients upload to and
+# download from directly with presigned URLs.
+FILE_STORAGE = config('FILE_STORAGE', default='filesystem')
+STORAGES = {
+    'default': {
+        'BACKEND': 'storages.backends.s3.S3Storage' if FILE_STORAGE == 's3'
+        else 'django.core.files.storage.FileSystemStorage',
+    },
+    # Django's default, which is what serves static files today: Django 5.1+ no longer reads
+    # STATICFILES_STORAGE above.
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME', default='')
+AWS_S3_ENDPOINT_URL = config('AWS_S3_ENDPOINT_URL', default=None)
+AWS_S3_REGION_NAME = config('AWS_S3_REGION_NAME', default=None)
+# Unset: boto3's usual credential chain (environment, instance role, ...).
+AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default=None)
+AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY', default=None)
+AWS_S3_SIGNATURE_VERSION = 's3v4'
+# Same-named files get distinct keys, as on the filesystem, instead of replacing each other.
+AWS_S3_FILE_OVERWRITE = False
+AWS_DEFAULT_ACL = None
+# Seconds a presigned upload or download URL stays valid.
+AWS_QUERYSTRING_EXPIRE = config('FILE_URL_EXPIRY', default=3600, cast=int)
+# Files opened through the storage spill to a temporary file past 5 MB instead of staying in memory.
+AWS_S3_MAX_MEMORY_SIZE = 5 * 1024 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+TEST_RUNNER = 'utils.testing.QueryBudgetTestRunner'
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.RoleClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'utils.pagination.HybridPagination',
+    'PAGE_SIZE': config('PAGE_SIZE', default=10, cast=int),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
 
+# Upper bound for the ?page_size= query parameter on paginated list endpoints.
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=200, cast=int)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=3),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=10),
     'ROTATE_REFRESH_TOKENS': True,
-    
+    # Tokens carry a digest of the password hash, so changing the password revokes them.
+    'CHECK_REVOKE_TOKEN': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.accounts.serializers.RoleTokenObtainPairSerializer',
 }
 
 
 REST_AUTH = {
     'USE_JWT': True,
     'JWT_AUTH_HEADER_PREFIX': 'Bearer',
+    'JWT_TOKEN_CLAIMS_SERIALIZER': 'apps.accounts.serializers.RoleTokenObtainPairSerializer',
     'REGISTER_SERIALIZER': 'apps.accounts.serializers.CustomRegisterSerializer',
 }
 
 ACCOUNT_EMAIL_VERIFICATION = 'none'
 
+# Serve /swagger/ from the schema files written by `manage.py build_openapi` (run it before
+# collectstatic) instead of generating the schema on every hit.
+OPENAPI_PRECOMPUTED = config('OPENAPI_PRECOMPUTED', default=False, cast=bool)
+
 SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'core.openapi.API_INFO',
     'SECURITY_DEFINITIONS': {
         'Bearer': {
             'type': 'apiKey',
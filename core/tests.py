@@ -0,0 +1,441 @@
+import io
+import json
+import tempfile
+import tracemalloc
+import zipfile
+from io import StringIO
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import router, transaction
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import StudentProfile, TeacherProfile
+from apps.accounts.serializers import RoleTokenObtainPairSerializer, StudentProfileSerializer, TeacherProfileSerializer
+from apps.accounts.views import StudentProfileListView, TeacherProfileListView
+from apps.assignments.models import Assignment, Submission
+from apps.assignments.views import (
+    StudentAllPendingAssignmentListView,
+    StudentPendingAssignmentListView,
+    StudentSubmittedAssignmentListView,
+)
+from apps.assignments.serializers import AssignmentSerializer, SubmissionSerializer
+from apps.courses.models import Course
+from apps.courses.serializers import CourseRosterSerializer, CourseSerializer
+from apps.courses.views import AllCourseListView, CourseDetailView
+from core.management.commands.bench_edutrack import SCENARIOS, iter_url_names
+from core.openapi import SCHEMA_FILES, PrecomputedSwaggerUIView
+from utils.async_views import async_view, read_view
+from utils.fields import compress_text, decompress_text
+from utils.http import RangeNotSatisfiable, parse_byte_range
+from utils.renderers import ORJSONRenderer
+from utils.rows import RowSerializer
+from utils.db_router import PIN_COOKIE, PIN_HEADER, ReplicaRoutingMiddleware
+from utils.testing import server_timing_queries
+from utils.zipstream import ZipEntry, stream_zip
+
+
+class SeedAndBenchmarkCommandTests(TestCase):
+
+    def seed(self):
+        call_command(
+            'seed_edutrack', students=40, teachers=3, courses=6, courses_per_student=2,
+            assignments_per_course=3, submissions=150, stdout=StringIO(), stderr=StringIO(),
+        )
+
+    def test_seed_loads_consistent_data(self):
+        self.seed()
+        self.assertEqual(StudentProfile.objects.count(), 40)
+        self.assertEqual(Course.objects.count(), 6)
+        self.assertTrue(Submission.objects.exists())
+        for course in Course.objects.all():
+            self.assertEqual(course.enrolled_count, course.students.count())
+
+    def test_every_named_endpoint_has_a_scenario(self):
+        names = {name for name in iter_url_names() if not name.startswith('admin:')}
+        self.assertEqual(names - set(SCENARIOS) - {'schema-swagger-ui'}, set())
+
+    def test_benchmark_drives_every_endpoint_without_server_errors(self):
+        self.seed()
+        out = StringIO()
+        call_command('bench_edutrack', requests=2, warmup=0, samples=2, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['not_benchmarked'], [])
+        self.assertGreater(report['meta']['openapi']['json_bytes'], 0)
+        for name, result in report['endpoints'].items():
+            # Over-budget requests surface as 500s here, since the test runner is strict.
+            self.assertNotIn('500', result['statuses'], name)
+            self.assertLessEqual(result['queries']['max'], result['query_budget'], name)
+
+    def test_serialization_benchmark_runs(self):
+        # Builds Submission instances from synthetic rows, so it breaks when a column is added
+        # without being added there.
+        out = StringIO()
+        call_command('bench_serialization', rows=20, runs=1, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual((report['rows'], report['identical']), (20, True))
+
+
+@override_settings(REPLICA_DATABASES=['replica'], PRIMARY_PIN_SECONDS=30)
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.read_alias = None
+
+        def view(request):
+            self.read_alias = router.db_for_read(Course) or 'default'
+            return HttpResponse(status=201 if request.method == 'POST' else 200)
+
+        self.middleware = ReplicaRoutingMiddleware(view)
+
+    def test_safe_requests_read_from_replica(self):
+        self.middleware(self.factory.get('/api/courses/'))
+        self.assertEqual(self.read_alias, 'replica')
+        # Outside a request everything stays on the primary.
+        self.assertEqual(router.db_for_read(Course), 'default')
+        self.assertEqual(router.db_for_write(Course), 'default')
+
+    def test_write_pins_client_to_primary(self):
+        response = self.middleware(self.factory.post('/api/assignment/submit/'))
+        self.assertEqual(self.read_alias, 'default')
+        until = response.cookies[PIN_COOKIE].value
+        self.assertEqual(response[PIN_HEADER], until)
+
+        request = self.factory.get('/api/assignments/pending/')
+        request.COOKIES[PIN_COOKIE] = until
+        self.middleware(request)
+        self.assertEqual(self.read_alias, 'default')
+
+        self.middleware(self.factory.get('/api/assignments/pending/', HTTP_X_PRIMARY_PIN=until))
+        self.assertEqual(self.read_alias, 'default')
+
+    def test_expired_or_implausible_pins_are_ignored(self):
+        for value in ('0', '9999999999', 'garbage'):
+            self.middleware(self.factory.get('/api/courses/', HTTP_X_PRIMARY_PIN=value))
+            self.assertEqual(self.read_alias, 'replica', value)
+
+    def test_failed_write_does_not_pin(self):
+        middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse(status=400))
+        response = middleware(self.factory.post('/api/assignment/submit/'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class ReplicaRouterTransactionTests(TestCase):
+
+    @override_settings(REPLICA_DATABASES=['replica'])
+    def test_reads_inside_a_transaction_stay_on_primary(self):
+        seen = {}
+
+        def view(request):
+            with transaction.atomic():
+                seen['alias'] = router.db_for_read(Course) or 'default'
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(seen['alias'], 'default')
+
+
+class AsyncReadViewTests(TestCase):
+    """The async twins must answer exactly like the sync views they replace."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student_user = User.objects.create_user(username='student1', password='pass123')
+        cls.teacher_user = User.objects.create_user(username='teacher1', password='pass123')
+        cls.student = StudentProfile.objects.create(user=cls.student_user, student_id='S1')
+        cls.teacher = TeacherProfile.objects.create(user=cls.teacher_user, employee_id='T1')
+        cls.course = Course.objects.create(title='Science', teacher=cls.teacher)
+        Course.objects.bulk_create(Course(title=f'Elective {i}', teacher=cls.teacher) for i in range(12))
+        cls.course.students.add(cls.student)
+        cls.assignments = [
+            Assignment.objects.create(title=f'Lab {i}', description='.', due_date='2030-01-01T00:00:00Z', course=cls.course)
+            for i in range(3)
+        ]
+        Submission.objects.create(assignment=cls.assignments[0], student=cls.student, content='Done.')
+
+        cls.tokens = {
+            'student': str(RoleTokenObtainPairSerializer.get_token(cls.student_user).access_token),
+            'teacher': str(RoleTokenObtainPairSerializer.get_token(cls.teacher_user).access_token),
+            # Issued before role claims existed: authenticated through the database fallback.
+            'legacy': str(AccessToken.for_user(cls.student_user)),
+            'invalid': 'not-a-token',
+        }
+
+    def cases(self):
+        course = self.course.pk
+        return [
+            (AllCourseListView, {}, {}, 'student'),
+            (AllCourseListView, {}, {'page': 2, 'page_size': 5}, 'student'),
+            (AllCourseListView, {}, {'pagination': 'cursor', 'page_size': 5}, 'teacher'),
+            (AllCourseListView, {}, {'page': 99}, 'student'),
+            (AllCourseListView, {}, {'cursor': 'garbage'}, 'student'),
+            (AllCourseListView, {}, {}, None),
+            (AllCourseListView, {}, {}, 'invalid'),
+            (CourseDetailView, {'pk': course}, {}, 'student'),
+            (CourseDetailView, {'pk': 999999}, {}, 'student'),
+            (CourseDetailView, {'pk': course}, {'fields': 'id,students', 'expand': 'students.user'}, 'student'),
+            (AllCourseListView, {}, {'fields': 'id,title', 'expand': 'teacher,students'}, 'student'),
+            (AllCourseListView, {}, {'fields': 'id,nope'}, 'student'),
+            (StudentProfileListView, {}, {}, 'teacher'),
+            (TeacherProfileListView, {}, {'pagination': 'cursor'}, 'student'),
+            (StudentPendingAssignmentListView, {'course_id': course}, {}, 'student'),
+            (StudentPendingAssignmentListView, {'course_id': course}, {}, 'teacher'),
+            (StudentAllPendingAssignmentListView, {}, {}, 'legacy'),
+            (StudentAllPendingAssignmentListView, {}, {'course': course}, 'student'),
+            (StudentSubmittedAssignmentListView, {'course_id': course}, {'pagination': 'cursor'}, 'student'),
+            (StudentSubmittedAssignmentListView, {'course_id': course}, {'assignment': self.assignments[0].pk}, 'student'),
+            (StudentSubmittedAssignmentListView, {'course_id': course}, {'assignment': 'x'}, 'student'),
+            (StudentSubmittedAssignmentListView, {'course_id': course},
+             {'expand': 'assignment', 'pagination': 'cursor', 'page_size': 1}, 'student'),
+            (StudentAllPendingAssignmentListView, {}, {'fields': 'id,title,due_date'}, 'student'),
+        ]
+
+    def headers(self, role):
+        return {'Authorization': f'Bearer {self.tokens[role]}'} if role else {}
+
+    def sync_response(self, view_class, kwargs, params, role):
+        request = RequestFactory().get('/api/test/', params, headers=self.headers(role))
+        return view_class.as_view()(request, **kwargs).render()
+
+    async def async_response(self, view_class, kwargs, params, role):
+        request = AsyncRequestFactory().get('/api/test/', params, headers=self.headers(role))
+        return (await async_view(view_class).as_view()(request, **kwargs)).render()
+
+    async def test_async_views_match_sync_views(self):
+        for view_class, kwargs, params, role in self.cases():
+            with self.subTest(view=view_class.__name__, params=params, role=role):
+                expected = await sync_to_async(self.sync_response)(view_class, kwargs, params, role)
+                actual = await self.async_response(view_class, kwargs, params, role)
+                self.assertEqual(actual.status_code, expected.status_code)
+                self.assertEqual(json.loads(actual.content), json.loads(expected.content))
+                self.assertEqual(actual.get('WWW-Authenticate'), expected.get('WWW-Authenticate'))
+
+    def test_read_view_follows_async_views_setting(self):
+        self.assertFalse(iscoroutinefunction(read_view(AllCourseListView)))
+        with override_settings(ASYNC_VIEWS=True):
+            view = read_view(AllCourseListView)
+        self.assertTrue(iscoroutinefunction(view))
+        self.assertTrue(issubclass(view.cls, AllCourseListView))
+        # drf-yasg reads the schema overrides from the handler.
+        self.assertEqual(view.cls.get._swagger_auto_schema, AllCourseListView.get._swagger_auto_schema)
+
+    async def test_middleware_counts_queries_under_asgi(self):
+        response = await self.async_client.get(
+            reverse('course-list'), headers={'Authorization': f"Bearer {self.tokens['student']}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        # COUNT(*) plus the page.
+        self.assertEqual(server_timing_queries(response), 2)
+
+
+class FastSerializationTests(TestCase):
+    """The .values() fast path and the orjson renderer must not change a single byte of output."""
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = TeacherProfile.objects.create(
+            user=User.objects.create_user(username='teacher1'), employee_id='T1', bio='Línea\u2028dos',
+        )
+        student = StudentProfile.objects.create(user=User.objects.create_user(username='student1'), student_id='S1')
+        course = Course.objects.create(title='Ciência 🧪', description='"Quoted"\nand\ttabbed', teacher=teacher, capacity=30)
+        course.students.add(student)
+        for i, (file, link, grade) in enumerate([('', None, None), ('submissions/lab report.pdf', 'https://example.com/x?a=1&b=2', 'A-')]):
+            assignment = Assignment.objects.create(
+                title=f'Lab {i}', description='.', due_date='2030-01-01T12:30:00.250000Z', course=course,
+            )
+            Submission.objects.create(
+                assignment=assignment, student=student, content='Done \u2029 now', file=file, link=link,
+                reviewed=grade is not None, grade=grade,
+            )
+
+    def test_row_serializers_render_identical_bytes(self):
+        request = RequestFactory().get('/api/test/')
+        for serializer_class in (
+            AssignmentSerializer, SubmissionSerializer, CourseSerializer,
+            StudentProfileSerializer, TeacherProfileSerializer,
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                queryset = serializer_class.Meta.model.objects.order_by('id')
+                expected = JSONRenderer().render(
+                    serializer_class(queryset, many=True, context={'request': request}).data
+                )
+                row_serializer = RowSerializer.for_serializer(serializer_class)
+                actual = ORJSONRenderer().render(
+                    row_serializer.to_representation(row_serializer.values(queryset), request)
+                )
+                self.assertEqual(actual, expected)
+
+    def test_serializers_with_nested_sources_are_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            RowSerializer(CourseRosterSerializer)
+
+    def test_renderer_falls_back_where_orjson_differs(self):
+        renderer, stdlib = ORJSONRenderer(), JSONRenderer()
+        for data in ({'big': 2 ** 70}, {1: 'int key', 'nested': [None, True, 1.5]}):
+            self.assertEqual(renderer.render(data), stdlib.render(data))
+        self.assertEqual(
+            renderer.render({'a': 1}, 'application/json; indent=2'),
+            stdlib.render({'a': 1}, 'application/json; indent=2'),
+        )
+
+
+class CompressedTextFieldTests(TestCase):
+
+    def test_codecs_round_trip(self):
+        long_text = 'Essay ' * 1000
+        for codec, header in (('gzip', b'\x01'), ('none', b'\x00')):
+            with self.subTest(codec=codec), override_settings(CONTENT_COMPRESSION=codec):
+                stored = compress_text(long_text)
+                self.assertEqual(stored[:1], header)
+                self.assertEqual(decompress_text(stored), long_text)
+        # Short texts are not worth compressing.
+        self.assertEqual(compress_text('Short ✓'), b'\x00' + 'Short ✓'.encode())
+
+    def test_summary_columns_follow_bulk_create(self):
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(username='teacher1'))
+        student = StudentProfile.objects.create(user=User.objects.create_user(username='student1'))
+        course = Course.objects.create(title='Art', description='.', teacher=teacher)
+        assignment = Assignment.objects.create(title='Sketch', description='.', due_date='2030-01-01T00:00:00Z', course=course)
+        Submission.objects.bulk_create([Submission(assignment=assignment, student=student, content='é' * 300)])
+        row = Submission.objects.values('content', 'content_length', 'content_excerpt', 'content_digest').get()
+        self.assertEqual(row['content'], 'é' * 300)
+        self.assertEqual(row['content_length'], 600)
+        self.assertEqual(row['content_excerpt'], 'é' * 200)
+        self.assertEqual(len(row['content_digest']), 32)
+
+
+class ByteRangeTests(SimpleTestCase):
+
+    def test_parse_byte_range(self):
+        for header, expected in (
+            ('bytes=0-4', (0, 4)), ('bytes=5-', (5, 9)), ('bytes=-3', (7, 9)), ('bytes=-30', (0, 9)),
+            ('bytes=0-99', (0, 9)), ('bytes=3-1', None), ('bytes=0-1,3-4', None), ('items=0-1', None), (None, None),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(parse_byte_range(header, 10), expected)
+        for header in ('bytes=10-', 'bytes=-0'):
+            with self.subTest(header=header), self.assertRaises(RangeNotSatisfiable):
+                parse_byte_range(header, 10)
+
+
+class PrecomputedOpenAPITests(TestCase):
+
+    def build(self, output_dir, **options):
+        call_command('build_openapi', output_dir=output_dir, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_built_schema_matches_the_live_one(self):
+        live = self.client.get('/swagger/?format=openapi').json()
+        with tempfile.TemporaryDirectory() as output_dir:
+            self.build(output_dir)
+            built = json.loads((Path(output_dir) / SCHEMA_FILES['json']).read_text())
+            self.assertTrue((Path(output_dir) / SCHEMA_FILES['yaml']).read_text().startswith("swagger: '2.0'"))
+
+        for key in ('host', 'schemes'):
+            live.pop(key, None)
+        self.assertEqual(built, live)
+
+    def test_check_detects_a_stale_schema(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            self.build(output_dir)
+            self.build(output_dir, check=True)
+
+            (Path(output_dir) / SCHEMA_FILES['json']).write_text('{}')
+            with self.assertRaisesMessage(CommandError, 'out of date'):
+                self.build(output_dir, check=True)
+
+    def test_swagger_ui_loads_the_static_schema(self):
+        view = PrecomputedSwaggerUIView.as_view()
+        factory = RequestFactory()
+
+        response = view(factory.get('/swagger/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'/static/openapi/schema.json', response.content)
+
+        response = view(factory.get('/swagger/', {'format': 'openapi'}))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], '/static/openapi/schema.json')
+
+
+class _Zeros:
+    """A readable file of ``size`` zero bytes that allocates nothing per read."""
+    block = bytes(64 * 1024)
+
+    def __init__(self, size):
+        self.remaining = size
+
+    def read(self, size):
+        size = min(size, self.remaining, len(self.block))
+        self.remaining -= size
+        return self.block if size == len(self.block) else self.block[:size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class _ArchiveTail(io.BytesIO):
+    """The last bytes of a ``total``-byte archive, at their real offsets: enough for ZipFile to
+    read the central directory without the members."""
+
+    def __init__(self, tail, total):
+        super().__init__(tail)
+        self.start = total - len(tail)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            offset -= self.start
+        return super().seek(offset, whence) + self.start
+
+    def tell(self):
+        return super().tell() + self.start
+
+
+class StreamZipTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        entries = [
+            ZipEntry('alice/notes.txt', 5, (2025, 3, 1, 12, 0, 0), lambda: io.BytesIO(b'hello')),
+            ZipEntry('bob/empty.bin', 0, (2025, 3, 2, 12, 0, 0), lambda: io.BytesIO(b'')),
+            ZipEntry('chloé/data.bin', 200_000, (2025, 3, 3, 12, 0, 0), lambda: io.BytesIO(b'x' * 200_000)),
+        ]
+        chunks = list(stream_zip(entries))
+        self.assertNotIn(b'', chunks)
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), ['alice/notes.txt', 'bob/empty.bin', 'chloé/data.bin'])
+            self.assertEqual(archive.read('alice/notes.txt'), b'hello')
+            self.assertEqual(archive.getinfo('bob/empty.bin').date_time, (2025, 3, 2, 12, 0, 0))
+
+    def test_multi_gigabyte_archive_streams_in_constant_memory(self):
+        gib = 1 << 30
+        sizes = {'big/video.bin': 4 * gib + 123, 'small/a.bin': gib // 2, 'small/b.bin': 1}
+        entries = [ZipEntry(name, size, (2025, 1, 1, 0, 0, 0), lambda size=size: _Zeros(size))
+                   for name, size in sizes.items()]
+
+        total, tail = 0, b''
+        tracemalloc.start()
+        try:
+            for chunk in stream_zip(entries):
+                total += len(chunk)
+                tail = (tail + chunk)[-64 * 1024:]
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertGreater(total, sum(sizes.values()))
+        self.assertLess(peak, 2 * 1024 * 1024)
+        # ZIP64 sizes and offsets past 4 GiB, read back from the central directory.
+        with zipfile.ZipFile(_ArchiveTail(tail, total)) as archive:
+            self.assertEqual({info.filename: info.file_size for info in archive.infolist()}, sizes)
+            self.assertGreater(archive.getinfo('small/b.bin').header_offset, 4 * gib)
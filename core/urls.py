@@ -14,31 +14,36 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
-from drf_yasg import openapi
 from dj_rest_auth.views import LoginView, LogoutView
 from dj_rest_auth.registration.views import RegisterView
+from core.openapi import API_INFO, PrecomputedSwaggerUIView
 
 
 schema_view = get_schema_view(
-    openapi.Info(
-        title="EduTrack API",
-        default_version='v1',
-        description="Test and document EduTrack API endpoints",
-    ),
+    API_INFO,
     public=True,
     permission_classes=[permissions.AllowAny],
 )
 
+if settings.OPENAPI_PRECOMPUTED:
+    swagger_view = PrecomputedSwaggerUIView.as_view()
+else:
+    swagger_view = schema_view.with_ui('swagger', cache_timeout=0)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+     path('swagger/', swagger_view, name='schema-swagger-ui'),
     path('api/accounts/', include('apps.accounts.urls')),
     path('api/', include('apps.courses.urls')),
     path('api/', include('apps.assignments.urls')),
+    path('api/', include('apps.search.urls')),
+    path('api/', include('apps.uploads.urls')),
+    path('api/', include('apps.jobs.urls')),
     path('api/auth/login/', LoginView.as_view(), name='rest_login'),
     path('api/auth/logout/', LogoutView.as_view(), name='rest_logout'),
     path('api/auth/register/', RegisterView.as_view(), name='rest_register'),
@@ -0,0 +1,146 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
+from rest_framework.response import Response
+
+
+class _Preauthenticated:
+    """
+    Stands in for an authenticator on the DRF request and replays the result it produced
+    asynchronously, so DRF's lazy ``request.user`` (permissions, throttles) never blocks.
+    """
+
+    def __init__(self, authenticator, result):
+        self.authenticator = authenticator
+        self.result = result
+
+    def authenticate(self, request):
+        return self.result
+
+    def authenticate_header(self, request):
+        return self.authenticator.authenticate_header(request)
+
+
+class AsyncAPIViewMixin:
+    """
+    Serves a DRF generic view from a coroutine under ASGI. Mixed in front of an existing view
+    class (see async_view()), it reuses that view's queryset, serializer, permissions, filters
+    and pagination, and mirrors ``APIView.dispatch``; only the I/O is different. Authenticators
+    with an ``aauthenticate`` coroutine are awaited directly, others run in a worker thread.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, '__await__'):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aperform_authentication(self, request):
+        resolved = []
+        for authenticator in request.authenticators:
+            if hasattr(authenticator, 'aauthenticate'):
+                result = await authenticator.aauthenticate(request)
+            else:
+                result = await sync_to_async(authenticator.authenticate)(request)
+            resolved.append(_Preauthenticated(authenticator, result))
+            if result is not None:
+                break
+        request.authenticators = tuple(resolved)
+
+    async def afilter_queryset(self, queryset):
+        # Filter backends may validate against the database (django-filter checks FK choices).
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+
+class AsyncListMixin(AsyncAPIViewMixin):
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset.aiterator()], many=True)
+        return Response(serializer.data)
+
+
+class AsyncRetrieveMixin(AsyncAPIViewMixin):
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+def async_view(view_class):
+    """
+    The async twin of a DRF list or retrieve view. Its ``get_queryset()`` must not touch the
+    database (build the queryset lazily), as it is called from the event loop.
+    """
+    if issubclass(view_class, ListModelMixin):
+        mixin = AsyncListMixin
+    elif issubclass(view_class, RetrieveModelMixin):
+        mixin = AsyncRetrieveMixin
+    else:
+        raise TypeError(f'{view_class.__name__} is not a list or retrieve view')
+
+    async def get(self, request, *args, **kwargs):
+        return await mixin.get(self, request, *args, **kwargs)
+
+    # Carries over the swagger_auto_schema metadata, so the API docs don't change.
+    update_wrapper(get, view_class.get, assigned=('__doc__',), updated=('__dict__',))
+    return type(f'Async{view_class.__name__}', (mixin, view_class), {
+        '__module__': view_class.__module__,
+        '__doc__': view_class.__doc__,
+        'get': get,
+    })
+
+
+def read_view(view_class):
+    """
+    URLconf helper for the hot read endpoints: the async twin of ``view_class`` when
+    ``ASYNC_VIEWS`` is on (deployments running under an ASGI server), the view itself otherwise.
+    """
+    if getattr(settings, 'ASYNC_VIEWS', False):
+        return async_view(view_class).as_view()
+    return view_class.as_view()
@@ -0,0 +1,35 @@
+import statistics
+import time
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a list of numbers (pct in 0-100).
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples_ms):
+    """
+    Collapse a list of millisecond timings into the figures we report in benchmarks.
+    """
+    return {
+        'runs': len(samples_ms),
+        'mean_ms': round(statistics.fmean(samples_ms), 3) if samples_ms else None,
+        'p50_ms': round(percentile(samples_ms, 50), 3) if samples_ms else None,
+        'p95_ms': round(percentile(samples_ms, 95), 3) if samples_ms else None,
+        'p99_ms': round(percentile(samples_ms, 99), 3) if samples_ms else None,
+    }
+
+
+def time_call(func, *args, **kwargs):
+    """
+    Run func once and return (result, elapsed milliseconds).
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
@@ -0,0 +1,66 @@
+import csv
+import io
+from itertools import islice
+
+from django.db import connections, router, transaction
+
+# NULL marker for COPY; csv.writer would otherwise write None and '' identically.
+COPY_NULL = r'\N'
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _copy_value(value):
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, bytes):
+        return '\\x' + value.hex()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def bulk_load(model, fields, rows, batch_size=10_000):
+    """
+    Insert ``rows`` (an iterable of tuples in ``fields`` order, using attnames such as
+    ``course_id``) into ``model``'s table as fast as the backend allows: ``COPY ... FROM STDIN``
+    on Postgres, ``bulk_create`` in batches elsewhere. Rows are consumed lazily, one batch in
+    memory at a time. Values go through each field's ``get_prep_value()``, as with the ORM, but
+    model ``save()``, signals and ``pre_save()`` (``auto_now``/``auto_now_add``, derived columns)
+    are bypassed on Postgres, so every column without a database default must be supplied.
+
+    Returns the number of rows inserted.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    total = 0
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            table = connection.ops.quote_name(model._meta.db_table)
+            model_fields = [model._meta.get_field(name) for name in fields]
+            columns = ', '.join(connection.ops.quote_name(field.column) for field in model_fields)
+            sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+            with connection.cursor() as cursor:
+                for batch in _batches(rows, batch_size):
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    writer.writerows(
+                        [_copy_value(field.get_prep_value(value)) for field, value in zip(model_fields, row)]
+                        for row in batch
+                    )
+                    buffer.seek(0)
+                    cursor.copy_expert(sql, buffer)
+                    total += len(batch)
+        else:
+            for batch in _batches(rows, batch_size):
+                model.objects.using(using).bulk_create(
+                    [model(**dict(zip(fields, row))) for row in batch], batch_size=batch_size
+                )
+                total += len(batch)
+    return total
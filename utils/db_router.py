@@ -0,0 +1,126 @@
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'primary_pin'
+PIN_HEADER = 'X-Primary-Pin'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# The replica alias reads should use for the current request, or None for the primary. Only
+# ReplicaRoutingMiddleware sets it, so management commands, shells and background work always
+# read from the primary.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'REPLICA_DATABASES', []))
+
+
+def pin_seconds():
+    return getattr(settings, 'PRIMARY_PIN_SECONDS', 10)
+
+
+class ReplicaRouter:
+    """
+    Sends ORM reads to a replica when the current request allows it (see
+    ReplicaRoutingMiddleware) and everything else to ``default``. Reads inside an open
+    transaction on the primary stay on the primary, so a view never reads around its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        return db not in replica_aliases()
+
+
+def _pinned_until(request):
+    for raw in (request.COOKIES.get(PIN_COOKIE), request.headers.get(PIN_HEADER)):
+        try:
+            until = float(raw)
+        except (TypeError, ValueError):
+            continue
+        # Ignore values further out than a pin window could be (plus a second for rounding), so a
+        # client can't pin itself forever.
+        now = time.time()
+        if now < until <= now + pin_seconds() + 1:
+            return until
+    return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serves safe-method requests from a randomly chosen replica, with read-your-writes
+    stickiness: after a successful unsafe-method request the client is pinned to the primary
+    for ``PRIMARY_PIN_SECONDS`` through the ``primary_pin`` cookie. Clients that don't keep
+    cookies can echo the ``X-Primary-Pin`` response header back as a request header instead.
+
+    A no-op when ``REPLICA_DATABASES`` is empty. Works in sync and async middleware chains; the
+    choice of database is a context variable, so async ORM calls made in worker threads see it.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        replicas = replica_aliases()
+        if not replicas:
+            return self.get_response(request)
+
+        token = _read_alias.set(self.read_alias(request, replicas))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        replicas = replica_aliases()
+        if not replicas:
+            return await self.get_response(request)
+
+        token = _read_alias.set(self.read_alias(request, replicas))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self.finish(request, response)
+
+    @staticmethod
+    def read_alias(request, replicas):
+        if request.method in SAFE_METHODS and _pinned_until(request) is None:
+            return random.choice(replicas)
+        return None
+
+    @staticmethod
+    def finish(request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            until = f'{time.time() + pin_seconds():.3f}'
+            response.set_cookie(PIN_COOKIE, until, max_age=pin_seconds(), httponly=True, samesite='Lax')
+            response[PIN_HEADER] = until
+        return response
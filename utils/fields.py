@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+
+# First byte of a stored value: how the rest of it is encoded.
+RAW, GZIP, ZSTD = b'\x00', b'\x01', b'\x02'
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImproperlyConfigured("CONTENT_COMPRESSION = 'zstd' requires the zstandard package.")
+    return zstandard
+
+
+def compress_text(text):
+    """
+    Encode ``text`` for a CompressedTextField: UTF-8, compressed with ``CONTENT_COMPRESSION``
+    (``gzip``, ``zstd`` or ``none``) when it is at least ``CONTENT_COMPRESSION_MIN_BYTES`` long and
+    compression actually saves space, behind a one-byte header naming the codec.
+    """
+    data = text.encode()
+    codec = getattr(settings, 'CONTENT_COMPRESSION', 'gzip')
+    if len(data) < getattr(settings, 'CONTENT_COMPRESSION_MIN_BYTES', 1024) or codec == 'none':
+        return RAW + data
+    if codec == 'gzip':
+        packed = GZIP + gzip.compress(data, mtime=0)
+    elif codec == 'zstd':
+        packed = ZSTD + _zstd().ZstdCompressor().compress(data)
+    else:
+        raise ImproperlyConfigured(f"Unknown CONTENT_COMPRESSION {codec!r}; use 'gzip', 'zstd' or 'none'.")
+    return packed if len(packed) < len(data) + 1 else RAW + data
+
+
+def decompress_text(value):
+    value = bytes(value)
+    header, data = value[:1], value[1:]
+    if header == GZIP:
+        data = gzip.decompress(data)
+    elif header == ZSTD:
+        data = _zstd().ZstdDecompressor().decompress(data)
+    elif header != RAW:
+        raise ValueError(f'Unknown compressed text header {header!r}')
+    return data.decode()
+
+
+class CompressedTextField(models.BinaryField):
+    """
+    A text field stored compressed (see compress_text()) and decompressed transparently on load,
+    including in ``.values()``. Reading it on every row of a list is what it is meant to avoid, so
+    it can keep summary columns on the same model up to date whenever the row is saved or
+    bulk-created, like ImageField's ``width_field``: ``length_field`` (UTF-8 byte length),
+    ``excerpt_field`` (the first ``max_length`` characters) and ``digest_field`` (a 32-character
+    hex digest, usable as an ETag). Declare the summary fields after this one; ``update()`` and
+    ``bulk_update()`` bypass them.
+    """
+    description = 'Compressed text'
+
+    def __init__(self, *args, length_field=None, excerpt_field=None, digest_field=None, **kwargs):
+        self.length_field = length_field
+        self.excerpt_field = excerpt_field
+        self.digest_field = digest_field
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        for option in ('length_field', 'excerpt_field', 'digest_field'):
+            if getattr(self, option):
+                kwargs[option] = getattr(self, option)
+        if kwargs.get('editable'):
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def get_default(self):
+        default = super().get_default()
+        return '' if default == b'' else default
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else decompress_text(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(value)
+        return value
+
+    def get_prep_value(self, value):
+        return None if value is None else compress_text(value)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{'form_class': forms.CharField, 'widget': forms.Textarea, **kwargs})
+
+    def summary(self, text):
+        """The summary column values for ``text``, by attname."""
+        values = {}
+        if self.length_field:
+            values[self.length_field] = len(text.encode())
+        if self.excerpt_field:
+            values[self.excerpt_field] = text[:self.model._meta.get_field(self.excerpt_field).max_length]
+        if self.digest_field:
+            values[self.digest_field] = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        return values
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        if value is not None:
+            for attname, summary in self.summary(value).items():
+                setattr(model_instance, attname, summary)
+        return value
@@ -0,0 +1,203 @@
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Prefetch
+from drf_yasg import openapi
+from rest_framework.exceptions import ValidationError
+
+# swagger_auto_schema(manual_parameters=...) for views using SparseFieldsetMixin.
+FIELDSET_PARAMETERS = [
+    openapi.Parameter(
+        'fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+        description="Comma-separated fields to return, e.g. `id,title,due_date`. Fields of an expanded "
+                    "relation are selected with dotted names, e.g. `course.title`.",
+    ),
+    openapi.Parameter(
+        'expand', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+        description="Comma-separated relations to return as nested objects instead of ids, "
+                    "e.g. `course,student.user`.",
+    ),
+]
+
+
+def parse_field_paths(value):
+    """``'id,course.title'`` -> ``{'id': {}, 'course': {'title': {}}}``; None when nothing is named."""
+    tree = {}
+    for path in value.split(','):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for name in path.split('.'):
+            node = node.setdefault(name, {})
+    return tree or None
+
+
+def _merge_errors(errors, more):
+    for key, messages in more.items():
+        errors.setdefault(key, []).extend(messages)
+
+
+class DynamicFieldsMixin:
+    """
+    ModelSerializer mixin for sparse fieldsets and expandable relations.
+
+    ``fields`` (a tree from parse_field_paths()) limits the output to the named fields, and
+    ``expand`` renders relations listed in ``Meta.expandable_fields`` (name -> serializer class) as
+    nested objects instead of primary keys; expanded relations are always output, including those
+    that are not part of the default fields. Both nest into the expanded serializers.
+    prepare_queryset() turns the same selection into ``only()``, ``select_related()`` and
+    ``prefetch_related()``, so the database reads no more than what is rendered.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self.only_fields = fields
+        self.expand_fields = expand or {}
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def get_expandable_fields(cls):
+        return getattr(cls.Meta, 'expandable_fields', {})
+
+    @classmethod
+    def _relation_kind(cls, name):
+        field = cls.Meta.model._meta.get_field(name)
+        if field.concrete and field.many_to_many:
+            return 'prefetch'
+        if field.concrete and (field.many_to_one or field.one_to_one):
+            return 'select'
+        raise ImproperlyConfigured(
+            f'{cls.__name__}.Meta.expandable_fields: {name} must be a forward foreign key, '
+            f'one-to-one or many-to-many field.'
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expandable = self.get_expandable_fields()
+        for name, expand in self.expand_fields.items():
+            fields[name] = expandable[name](
+                fields=(self.only_fields or {}).get(name) or None,
+                expand=expand,
+                many=self._relation_kind(name) == 'prefetch',
+                read_only=True,
+            )
+        if self.only_fields is not None:
+            fields = {
+                name: field for name, field in fields.items()
+                if name in self.only_fields or name in self.expand_fields
+            }
+        return fields
+
+    @classmethod
+    def fieldset_errors(cls, only, expand, prefix=''):
+        """Problems with a ``fields``/``expand`` selection, keyed by query parameter; empty if valid."""
+        errors = {}
+        expandable = cls.get_expandable_fields()
+        for name, nested in expand.items():
+            if name not in expandable:
+                errors.setdefault('expand', []).append(f'{prefix}{name} cannot be expanded.')
+            else:
+                nested_only = (only or {}).get(name) or None
+                _merge_errors(errors, expandable[name].fieldset_errors(nested_only, nested, f'{prefix}{name}.'))
+        if only is not None:
+            available = cls().fields
+            for name, nested in only.items():
+                if name not in available and name not in expand:
+                    errors.setdefault('fields', []).append(f'Unknown field: {prefix}{name}.')
+                elif nested and name not in expand:
+                    errors.setdefault('fields', []).append(f'Expand {prefix}{name} to select its fields.')
+        return errors
+
+    @classmethod
+    def prepare_queryset(cls, queryset, only=None, expand=None, extra=()):
+        """
+        ``queryset`` restricted to what this serializer renders for the selection: the columns
+        (plus ``extra`` ones, such as a pagination key), joins for expanded foreign keys and a
+        prefetch for expanded many-to-many relations.
+        """
+        columns, related, prefetches = cls.queryset_plan(only, expand or {})
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetches:
+            queryset = queryset.prefetch_related(
+                *(Prefetch(lookup, queryset=prefetch_queryset) for lookup, prefetch_queryset in prefetches)
+            )
+        if columns is not None:
+            queryset = queryset.only(*dict.fromkeys([*columns, *extra]))
+        return queryset
+
+    @classmethod
+    def queryset_plan(cls, only, expand, prefix=''):
+        """
+        ``(columns, select_related paths, (lookup, queryset) prefetches)`` for a selection, with
+        lookups relative to ``prefix``. ``columns`` is None when some rendered field is not a plain
+        model column, in which case nothing is deferred.
+        """
+        opts = cls.Meta.model._meta
+        expandable = cls.get_expandable_fields()
+        columns, related, prefetches = [prefix + opts.pk.name], [], []
+        for name, field in cls(fields=only, expand=expand).fields.items():
+            if name in expand:
+                nested_class, nested_only = expandable[name], (only or {}).get(name) or None
+                if cls._relation_kind(name) == 'prefetch':
+                    nested_queryset = nested_class.Meta.model._default_manager.order_by('pk')
+                    prefetches.append(
+                        (prefix + name, nested_class.prepare_queryset(nested_queryset, nested_only, expand[name]))
+                    )
+                    continue
+                nested_columns, nested_related, nested_prefetches = nested_class.queryset_plan(
+                    nested_only, expand[name], f'{prefix}{name}__',
+                )
+                if columns is not None:
+                    columns = None if nested_columns is None else [*columns, prefix + name, *nested_columns]
+                related += [prefix + name, *nested_related]
+                prefetches += nested_prefetches
+            elif columns is not None:
+                try:
+                    model_field = opts.get_field(field.source)
+                except FieldDoesNotExist:
+                    model_field = None
+                if model_field is None or not model_field.concrete or model_field.many_to_many:
+                    columns = None
+                else:
+                    columns.append(prefix + model_field.name)
+        return columns, related, prefetches
+
+
+class SparseFieldsetMixin:
+    """
+    View mixin for ``?fields=`` and ``?expand=`` on views whose serializer uses DynamicFieldsMixin.
+    The selection is validated (unknown names are a 400), passed to the serializer, and pushed down
+    into the queryset by filter_queryset(), which get_object() uses too.
+    """
+
+    def get_fieldset(self):
+        """The request's ``(fields, expand)`` selection trees."""
+        if not hasattr(self, '_fieldset'):
+            serializer_class = self.get_serializer_class()
+            if getattr(self, 'swagger_fake_view', False) or not issubclass(serializer_class, DynamicFieldsMixin):
+                self._fieldset = (None, {})
+                return self._fieldset
+            params = self.request.query_params
+            only = parse_field_paths(params.get('fields', ''))
+            expand = parse_field_paths(params.get('expand', '')) or {}
+            errors = serializer_class.fieldset_errors(only, expand)
+            if errors:
+                raise ValidationError(errors)
+            self._fieldset = (only, expand)
+        return self._fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        only, expand = self.get_fieldset()
+        if only is not None or expand:
+            kwargs.setdefault('fields', only)
+            kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, DynamicFieldsMixin):
+            return queryset
+        only, expand = self.get_fieldset()
+        # Keyset pagination reads its cursor from the page's last row.
+        keyset = [name.lstrip('-') for name in getattr(self, 'keyset_ordering', None) or ()]
+        return serializer_class.prepare_queryset(queryset, only, expand, extra=keyset)
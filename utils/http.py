@@ -0,0 +1,33 @@
+import re
+
+_BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_byte_range(header, length):
+    """
+    The inclusive ``(first, last)`` byte positions a ``Range`` header asks for in a body of
+    ``length`` bytes, or None when the whole body should be sent instead: no header, a syntax
+    error or several ranges (which servers may ignore, RFC 9110 14.2). Raises
+    RangeNotSatisfiable for a well-formed range that lies outside the body.
+    """
+    match = _BYTE_RANGE.match((header or '').replace(' ', ''))
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes.
+        suffix = int(last)
+        if suffix == 0 or length == 0:
+            raise RangeNotSatisfiable
+        return max(length - suffix, 0), length - 1
+    first = int(first)
+    if last != '' and int(last) < first:
+        return None
+    if first >= length:
+        raise RangeNotSatisfiable
+    last = length - 1 if last == '' else min(int(last), length - 1)
+    return first, last
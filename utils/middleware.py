@@ -0,0 +1,155 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+logger = logging.getLogger('edutrack.requests')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request runs more queries than its endpoint's budget."""
+
+
+class _QueryRecorder:
+    """``execute_wrapper`` hook counting queries and summing their wall time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def query_budget(url_name):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(url_name)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records the number of SQL queries, total DB time and total view time of every request.
+
+    The figures go out as a ``Server-Timing`` header (visible in browser dev tools) and as one
+    structured log record on the ``edutrack.requests`` logger, keyed by URL name. Requests to a
+    URL name listed in ``QUERY_BUDGETS`` that run more queries than budgeted are logged as a
+    warning, or raise QueryBudgetExceeded when ``QUERY_BUDGET_STRICT`` is on (the test runner
+    turns it on, so an endpoint going over budget fails the suite).
+
+    Queries issued while a streaming response is consumed happen after this middleware returns
+    and are not counted. Works in sync and async middleware chains.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        recorder = _QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        recorder = _QueryRecorder()
+        start = time.perf_counter()
+        # Async ORM calls run on the request's thread-sensitive worker thread, whose connections
+        # are the ones to hook.
+        await sync_to_async(self.add_wrapper)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(self.remove_wrapper)(recorder)
+        return self.finish(request, response, recorder, start)
+
+    @staticmethod
+    def add_wrapper(recorder):
+        for alias in connections:
+            connections[alias].execute_wrappers.append(recorder)
+
+    @staticmethod
+    def remove_wrapper(recorder):
+        for alias in connections:
+            connections[alias].execute_wrappers.remove(recorder)
+
+    def finish(self, request, response, recorder, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.duration * 1000
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", app;dur={total_ms:.1f}'
+        )
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match else None
+        budget = query_budget(url_name)
+        over_budget = budget is not None and recorder.count > budget
+        record = {
+            'url_name': url_name,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'query_budget': budget,
+        }
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            '%(method)s %(url_name)s %(status)s queries=%(queries)s db_ms=%(db_ms)s total_ms=%(total_ms)s',
+            record,
+            extra={'request_stats': record},
+        )
+
+        if over_budget and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(
+                f'{request.method} {request.path} ({url_name}) ran {recorder.count} queries; '
+                f'budget is {budget}.'
+            )
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that also runs natively in an async middleware chain. WhiteNoise itself
+    is sync-only, which would push every request under ASGI through a worker thread. Static
+    files are still read synchronously; put a CDN in front of them in production.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,224 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _item_value(item, field):
+    # Rows may be model instances or dicts from .values() querysets.
+    if isinstance(item, dict):
+        return item[field]
+    return getattr(item, field)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek-method pagination on a composite key such as ``('submitted_at', 'id')``.
+
+    The cursor is the key of the last (or first) row of the current page, so every page is a
+    ``WHERE (key) > (cursor) ORDER BY key LIMIT n`` index range scan: no COUNT(*) and no OFFSET,
+    and page 1000 costs the same as page 1. The view declares its key via ``keyset_ordering``;
+    prefix a field with ``-`` for descending order. The last field must be unique (usually ``id``).
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering, page_size):
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views: the page is fetched with the async ORM."""
+        return self.finish_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        # The (unevaluated) queryset for one page plus a look-ahead row.
+        self.base_url = request.build_absolute_uri()
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+        self.cursor = self.decode_cursor(request, queryset.model, self.fields)
+        reverse = self.cursor is not None and self.cursor['reverse']
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self._seek_filter(self.fields, self.cursor['values'], reverse))
+        ordering = [self._order_term(name, descending != reverse) for name, descending in self.fields]
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def finish_page(self, rows):
+        reverse = self.cursor is not None and self.cursor['reverse']
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        self.has_next = has_more if not reverse else True
+        self.has_previous = self.cursor is not None if not reverse else has_more
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, item, reverse):
+        values = [self._encode_value(_item_value(item, name)) for name, _ in self.fields]
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        token = urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model, fields):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            raw_values = payload['v']
+            if len(raw_values) != len(fields):
+                raise ValueError
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(fields, raw_values)
+            ]
+            return {'values': values, 'reverse': bool(payload.get('r'))}
+        except (BinasciiError, ValueError, TypeError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _encode_value(value):
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    @staticmethod
+    def _order_term(name, descending):
+        return f'-{name}' if descending else name
+
+    @staticmethod
+    def _seek_filter(fields, values, reverse):
+        # Expands (a, b, c) > (x, y, z) into
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z), per-field direction aware.
+        condition = Q()
+        for index, (name, descending) in enumerate(fields):
+            lookup = 'lt' if descending != reverse else 'gt'
+            term = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_index in range(index):
+                term &= Q(**{fields[prev_index][0]: values[prev_index]})
+            condition |= term
+        return condition
+
+
+class HybridPagination(PageNumberPagination):
+    """
+    Page-number pagination by default, with keyset pagination available per request on views that
+    declare ``keyset_ordering``: pass ``?cursor=<token>`` (from a previous ``next`` link) or
+    ``?pagination=cursor`` to start. ``?page_size=`` works in both modes up to ``MAX_PAGE_SIZE``.
+    """
+    page_size_query_param = 'page_size'
+    pagination_query_param = 'pagination'
+
+    keyset = None
+
+    @property
+    def max_page_size(self):
+        # Read per request rather than at import, so the setting can change at runtime.
+        return getattr(settings, 'MAX_PAGE_SIZE', 100)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering and self.wants_keyset(request):
+            self.keyset = KeysetPagination(ordering, self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views, with the count and the page fetched through the async
+        ORM. Produces the same pages, links and errors as the sync version.
+        """
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering and self.wants_keyset(request):
+            self.keyset = KeysetPagination(ordering, self.get_page_size(request))
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached property; prime it so the paginator never counts synchronously.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+    def wants_keyset(self, request):
+        return (
+            KeysetPagination.cursor_query_param in request.query_params
+            or request.query_params.get(self.pagination_query_param) == 'cursor'
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, 'keyset_ordering', None):
+            parameters += [
+                {
+                    'name': self.pagination_query_param,
+                    'required': False,
+                    'in': 'query',
+                    'description': 'Set to `cursor` to switch to keyset pagination (no count, constant-time deep pages).',
+                    'schema': {'type': 'string', 'enum': ['page', 'cursor']},
+                },
+                {
+                    'name': KeysetPagination.cursor_query_param,
+                    'required': False,
+                    'in': 'query',
+                    'description': 'Opaque cursor taken from a `next`/`previous` link.',
+                    'schema': {'type': 'string'},
+                },
+            ]
+        return parameters
@@ -0,0 +1,34 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# orjson leaves these raw in UTF-8; DRF escapes them so the output is also valid JavaScript.
+_LINE_SEPARATOR = '\u2028'.encode()
+_PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson, producing byte-identical output to DRF's renderer.
+
+    Dates, times and anything orjson does not encode natively go through DRF's JSONEncoder, so
+    they are formatted exactly as before. Output orjson cannot reproduce (indented output for the
+    browsable API or ``?indent=``, ``ensure_ascii``/non-compact settings, integers beyond 64 bits)
+    falls back to the stdlib encoder. Floats are written in shortest round-trip form by both
+    encoders; they differ only in exponent notation for magnitudes below 1e-4 or from 1e16 up,
+    which no endpoint emits.
+    """
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _LINE_SEPARATOR in ret or _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b'\\u2028').replace(_PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
@@ -0,0 +1,179 @@
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from utils.fieldsets import SparseFieldsetMixin
+
+# DRF fields whose to_representation() returns a database value of the right type unchanged.
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+
+
+def _unbound(convert):
+    return lambda request: convert
+
+
+def _file_converter(model_field, field):
+    # serializers.FileField.to_representation(), starting from the stored name instead of a FieldFile.
+    storage = model_field.storage
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def bind(request):
+        def convert(name):
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+    return bind
+
+
+def _datetime_converter(field):
+    # serializers.DateTimeField.to_representation() for ISO 8601 output, with the time zone
+    # looked up once per page instead of once per value.
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return _unbound(field.to_representation)
+
+    def bind(request):
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+        def convert(value):
+            if field_timezone is None or not timezone.is_aware(value):
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+    return bind
+
+
+class RowSerializer:
+    """
+    Read-only, compiled stand-in for a ModelSerializer over ``.values()`` rows.
+
+    The serializer's readable fields are resolved once into ``(output name, column, converter)``
+    triples, with converters bound to the request once per page, so rendering a row is a dict
+    lookup per field plus one function call for dates and files: no model instances and no
+    per-field attribute traversal. The output is identical to
+    ``serializer_class(instances, many=True).data``. Only fields backed directly by a concrete
+    model column are supported (no dotted sources, method fields or nested serializers); anything
+    else raises ImproperlyConfigured when the serializer is compiled. ``fields`` compiles a sparse
+    fieldset of a DynamicFieldsMixin serializer.
+    """
+    _compiled = {}
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class() if fields is None else serializer_class(fields=fields)
+        model = serializer.Meta.model
+        self.columns = []
+        self.plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            model_field = self._model_field(serializer_class, model, name, field)
+            if isinstance(field, serializers.FileField):
+                bind = _file_converter(model_field, field)
+            elif isinstance(field, serializers.DateTimeField):
+                bind = _datetime_converter(field)
+            elif isinstance(field, IDENTITY_FIELDS) and not isinstance(field, serializers.ChoiceField):
+                bind = None
+            else:
+                bind = _unbound(field.to_representation)
+            self.columns.append(model_field.name)
+            self.plan.append((name, model_field.name, bind))
+
+    @staticmethod
+    def _model_field(serializer_class, model, name, field):
+        unsupported = ImproperlyConfigured(
+            f'{serializer_class.__name__}.{name} is not a plain model column; it cannot be '
+            f'rendered from .values() rows.'
+        )
+        if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField,
+                              serializers.SerializerMethodField)) or '.' in field.source or field.source == '*':
+            raise unsupported
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise unsupported
+        if not model_field.concrete or model_field.many_to_many:
+            raise unsupported
+        return model_field
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None):
+        key = (serializer_class, None if fields is None else frozenset(fields))
+        row_serializer = cls._compiled.get(key)
+        if row_serializer is None:
+            row_serializer = cls._compiled[key] = cls(serializer_class, fields)
+        return row_serializer
+
+    def values(self, queryset, extra=()):
+        """``queryset.values()`` with the columns this serializer needs plus ``extra`` ones."""
+        return queryset.values(*dict.fromkeys([*self.columns, *extra]))
+
+    def to_representation(self, rows, request=None):
+        plan = [
+            (name, column, bind(request) if bind is not None else None)
+            for name, column, bind in self.plan
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in plan:
+                value = row[column]
+                item[name] = value if value is None or convert is None else convert(value)
+            data.append(item)
+        return data
+
+
+class RowListSerializer:
+    """What ValuesListMixin.get_serializer() returns for a page of rows: exposes ``.data``."""
+
+    def __init__(self, rows, row_serializer, request=None):
+        self.rows = rows
+        self.row_serializer = row_serializer
+        self.request = request
+
+    @property
+    def data(self):
+        return self.row_serializer.to_representation(self.rows, self.request)
+
+
+class ValuesListMixin(SparseFieldsetMixin):
+    """
+    Fast path for read-only list views: the list is fetched with ``.values()`` and rendered by a
+    RowSerializer compiled from ``serializer_class`` (and the ``?fields=`` selection), producing the
+    same JSON without building model instances or running ModelSerializer per row. Requests that
+    ``?expand=`` relations take the regular path. Works with both pagination styles and with the
+    async views. Only for views whose ``get_queryset()`` is used by ``list`` alone.
+    """
+
+    def get_row_serializer(self):
+        """The RowSerializer for this request, or None when it needs the regular path."""
+        only, expand = self.get_fieldset()
+        if expand:
+            return None
+        return RowSerializer.for_serializer(self.get_serializer_class(), only)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        row_serializer = self.get_row_serializer()
+        if row_serializer is None:
+            return queryset
+        # Keyset pagination reads its cursor from the row, so its key must be selected too.
+        keyset = [name.lstrip('-') for name in getattr(self, 'keyset_ordering', None) or ()]
+        return row_serializer.values(queryset, extra=keyset)
+
+    def get_serializer(self, *args, **kwargs):
+        row_serializer = self.get_row_serializer() if args and kwargs.get('many') else None
+        if row_serializer is not None:
+            return RowListSerializer(args[0], row_serializer, self.request)
+        return super().get_serializer(*args, **kwargs)
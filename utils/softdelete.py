@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class LiveManager(models.Manager):
+    """
+    Default manager for soft-deleted models: only rows matching ``live_filters``, so querysets and
+    reverse relations (``teacher.courses``, ``course.assignments``) no longer see rows whose
+    deletion is still being purged. The filters are a class attribute because Django builds
+    related managers by subclassing the default manager's class; models that need other filters
+    subclass LiveManager. Joins from other models (``course__title=...``) are not filtered by it.
+    Give the model a plain ``all_objects`` manager for the purge itself; cascades and forward
+    relations already use the unfiltered base manager.
+    """
+
+    live_filters = {'deleted_at__isnull': True}
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**self.live_filters)
@@ -0,0 +1,62 @@
+from contextlib import closing
+
+from django.utils.http import content_disposition_header
+
+
+def s3_bucket(storage):
+    """
+    The boto3 Bucket behind an S3-compatible storage (django-storages' S3Storage), which clients
+    can upload to and download from directly, or None for storages whose files have to pass
+    through the app, such as the filesystem.
+    """
+    return storage.bucket if hasattr(storage, 'bucket_name') else None
+
+
+def presigned_post(storage, name, content_type, size, expires_in):
+    """
+    A form (``{'url': ..., 'fields': {...}}``) that uploads exactly ``size`` bytes of
+    ``content_type`` to ``name`` in the storage's bucket: POST the fields plus a ``file`` part to
+    the URL. The bucket itself rejects other sizes and types.
+    """
+    return s3_bucket(storage).meta.client.generate_presigned_post(
+        storage.bucket_name, name,
+        Fields={'Content-Type': content_type},
+        Conditions=[{'Content-Type': content_type}, ['content-length-range', size, size]],
+        ExpiresIn=expires_in,
+    )
+
+
+def stored_object(storage, name):
+    """``(size, content_type)`` of an object in the storage's bucket, or None if it is not there."""
+    from botocore.exceptions import ClientError
+
+    try:
+        head = s3_bucket(storage).meta.client.head_object(Bucket=storage.bucket_name, Key=name)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+    return head['ContentLength'], head.get('ContentType', '')
+
+
+def download_url(storage, name, filename):
+    """
+    A presigned URL that downloads ``name`` as an attachment called ``filename``, or None when
+    the storage cannot hand one out and the file has to be streamed by the app.
+    """
+    if s3_bucket(storage) is None:
+        return None
+    return storage.url(name, parameters={
+        'ResponseContentDisposition': content_disposition_header(True, filename),
+    })
+
+
+def open_stream(storage, name):
+    """
+    Open ``name`` for one sequential read. S3 objects are streamed from the response body,
+    where ``storage.open()`` would first download them whole.
+    """
+    bucket = s3_bucket(storage)
+    if bucket is None:
+        return storage.open(name, 'rb')
+    return closing(bucket.Object(name).get()['Body'])
@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+from utils.middleware import query_budget
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    The project's test runner: turns on ``QUERY_BUDGET_STRICT`` so that any request made through
+    the test client that exceeds its ``QUERY_BUDGETS`` entry raises and fails the test.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._old_strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        settings.QUERY_BUDGET_STRICT = True
+
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_BUDGET_STRICT = self._old_strict
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryBudgetMixin:
+    """
+    Test case helpers for query budgets, for code paths the middleware does not see (management
+    commands, service functions) or to pin a tighter bound than the endpoint's budget.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using='default'):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context)
+        if executed > budget:
+            queries = '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, 1))
+            self.fail(f'{executed} queries executed, budget is {budget}\nCaptured queries were:\n{queries}')
+
+    def assertWithinBudget(self, response):
+        """Check a test client response against its endpoint's ``QUERY_BUDGETS`` entry."""
+        url_name = response.wsgi_request.resolver_match.view_name
+        budget = query_budget(url_name)
+        self.assertIsNotNone(budget, f'No QUERY_BUDGETS entry for {url_name!r}')
+        executed = server_timing_queries(response)
+        self.assertLessEqual(executed, budget, f'{url_name} ran {executed} queries; budget is {budget}')
+
+
+def server_timing_queries(response):
+    """Query count reported by QueryInstrumentationMiddleware in the ``Server-Timing`` header."""
+    for metric in response['Server-Timing'].split(','):
+        name, *params = (part.strip() for part in metric.split(';'))
+        if name == 'db':
+            for param in params:
+                if param.startswith('desc='):
+                    return int(param.split('=', 1)[1].strip('"').split()[0])
+    raise ValueError('Response has no db Server-Timing metric')
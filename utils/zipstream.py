@@ -0,0 +1,56 @@
+import zipfile
+from collections import namedtuple
+
+from django.core.files import File
+
+# One archive member: its path in the archive, its size in bytes, a (Y, M, D, h, m, s) modification
+# time and a callable returning a readable binary file (called only when the member is written).
+ZipEntry = namedtuple('ZipEntry', ['name', 'size', 'date_time', 'open'])
+
+
+class _Spool:
+    """Write-only sink that holds what ZipFile writes until it is drained. It cannot seek, so
+    ZipFile writes sizes and CRCs after each member (data descriptors) and never goes back."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(data)
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries, chunk_size=File.DEFAULT_CHUNK_SIZE):
+    """
+    Yield a ZIP archive of ``entries`` (ZipEntry) as it is built, one source chunk at a time, so
+    memory stays at about ``chunk_size`` however large the members or the archive get. Members
+    are stored uncompressed: uploads are mostly already-compressed formats, and it keeps the CPU
+    cost to a CRC. ZIP64 records are used where sizes or offsets need them.
+    """
+    spool = _Spool()
+    with zipfile.ZipFile(spool, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.name, date_time=entry.date_time)
+            # Lets ZipFile pick ZIP64 headers up front for members over 4 GiB.
+            info.file_size = entry.size
+            with entry.open() as source, archive.open(info, 'w') as member:
+                while chunk := source.read(chunk_size):
+                    member.write(chunk)
+                    yield spool.drain()
+            # The data descriptor written when the member closes.
+            yield spool.drain()
+    # The central directory.
+    yield spool.drain()